@@ -0,0 +1,243 @@
+import argparse
+import contextlib
+import os
+import sys
+
+# Shared modules (storage backends, ...) live in the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_import
+import export
+import transcripts
+import console_database
+import console_student
+import console_course
+import console_grade
+import console_report
+import console_table
+
+# Command-line interface for scheduled jobs (cron, Task Scheduler): one
+# command per run, no login or menus, results on stdout or in a file.
+#   python console_cli.py report top-performers
+#   python console_cli.py report grade-summary --output grades.csv.gz
+#   python console_cli.py export grades nightly/grades.parquet
+#   python console_cli.py import students new_students.csv
+#   python console_cli.py transcripts --out transcripts/ --status Active
+# Messages go to stderr, so stdout can be piped.
+
+# Exit status
+EXIT_OK = 0
+EXIT_ERROR = 1        # database / file error
+EXIT_USAGE = 2        # bad arguments (argparse uses 2 as well)
+EXIT_NOT_FOUND = 3    # nothing matched (search, transcript)
+EXIT_REJECTED = 4     # import finished but some rows were rejected
+
+REPORTS = {
+    "student-list": console_report.STUDENT_LIST,
+    "grade-summary": console_report.GRADE_SUMMARY,
+    "transcript": console_report.TRANSCRIPT,
+    "top-performers": console_report.TOP_PERFORMERS,
+    "course-stats": console_report.COURSE_STATS,
+    "at-risk": console_report.AT_RISK,
+}
+
+IMPORTS = {
+    "students": console_student.IMPORT_SPEC,
+    "courses": console_course.IMPORT_SPEC,
+    "grades": console_grade.IMPORT_SPEC,
+}
+
+# name -> (table, columns, primary key)
+LISTS = {
+    "students": ("tblStudent", "studentID, firstName, lastName, gender, dateOfbirth, address, department, status", "studentID"),
+    "courses": ("tblCourse", "*", "courseID"),
+    "grades": ("tblGrade", "*", "enrollmentID"),
+}
+
+SEARCHES = {
+    "students": ("SELECT studentID, firstName, lastName, gender, dateOfbirth, contact, address, department, status "
+                 "FROM tblStudent WHERE {match} ORDER BY lastName, firstName",
+                 "studentID = ?", "firstName LIKE ? OR lastName LIKE ?"),
+    "courses": ("SELECT * FROM tblCourse WHERE {match} ORDER BY courseName",
+                "courseID = ?", "courseName LIKE ?"),
+}
+
+
+def message(text): #STATUS MESSAGE (STDERR)
+    print(text, file=sys.stderr)
+
+def write_table(rows, headings, specs, dest): #TABLE TO STDOUT OR A TEXT FILE
+    with console_table.output(dest) if dest else contextlib.nullcontext(sys.stdout) as out:
+        return console_table.TableWriter(list(zip(headings, specs)), out).write(rows)
+
+def is_text(dest): #TABLE TEXT (STDOUT / .txt) RATHER THAN AN EXPORT FORMAT
+    return not dest or dest.lower().endswith(".txt")
+
+
+# ---------- commands ----------
+
+def cmd_report(db, args):
+    definition = REPORTS[args.name]
+    filters = {}
+    if args.name == "transcript":
+        if args.student_id is None:
+            message("transcript needs --student-id")
+            return EXIT_USAGE
+        filters["student_id"] = args.student_id
+    if args.name == "at-risk":
+        filters["threshold"] = args.threshold
+    result = definition.run(db, filters)
+
+    if args.name == "transcript":
+        if not result.summary["student"]:
+            message(f"Student {args.student_id} not found.")
+            return EXIT_NOT_FOUND
+        if is_text(args.output):
+            text = console_report.format_transcript(result.summary["student"]._asdict(), result.rows,
+                                                    result.generated.strftime('%Y-%m-%d %H:%M'))
+            with console_table.output(args.output) if args.output else contextlib.nullcontext(sys.stdout) as out:
+                out.write(text)
+            return EXIT_OK
+
+    if is_text(args.output):
+        count = write_table(result.rows, result.headings, result.definition.formats, args.output)
+    else:
+        count = export.write_rows(result.rows, args.output, description=result.description)
+        message(f"Exported {count} rows to {args.output}.")
+    return EXIT_OK
+
+def cmd_export(db, args):
+    count = export.export_query(db, console_report.EXPORT_QUERIES[args.table], args.output)
+    message(f"Exported {count} rows to {args.output}.")
+    return EXIT_OK
+
+def cmd_import(db, args):
+    result = bulk_import.import_csv(db, IMPORTS[args.table], args.file, rejects_path=args.rejects)
+    message(result.summary())
+    return EXIT_REJECTED if result.rejected else EXIT_OK
+
+def cmd_list(db, args):
+    table, columns, key = LISTS[args.table]
+    where, params = "", None
+    if args.after is not None:
+        where, params = f" WHERE {key} > ?", (args.after,)
+    query = f"SELECT {columns} FROM {table}{where} ORDER BY {key}"
+    if args.limit:
+        query = db.top_n(query, args.limit)
+    return list_rows(db, query, params, args.output)
+
+def cmd_search(db, args):
+    query, by_id, by_name = SEARCHES[args.table]
+    if args.text.isdigit():
+        query, params = query.format(match=by_id), (int(args.text),)
+    else:
+        pattern = f"%{args.text}%"
+        query, params = query.format(match=by_name), (pattern,) * by_name.count("?")
+    return list_rows(db, query, params, args.output, EXIT_NOT_FOUND)
+
+def list_rows(db, query, params, dest, empty=EXIT_OK): #STREAM A QUERY AS A TABLE OR AN EXPORT
+    if not is_text(dest):
+        count = export.export_query(db, query, dest, params)
+        message(f"Exported {count} rows to {dest}.")
+        return EXIT_OK if count else empty
+    rows = db.iter_rows(query, params)
+    first = next(rows, None)
+    if first is None:
+        message("No rows found.")
+        return empty
+    write_table(_chain(first, rows), first._fields, [None] * len(first), dest)
+    return EXIT_OK
+
+def _chain(first, rows):
+    yield first
+    yield from rows
+
+def cmd_transcripts(db, args):
+    cohort = {k: v for k, v in (("status", args.status), ("department", args.department)) if v}
+    job = transcripts.TranscriptBatch(db, args.out, combined=args.combined, format_fn=console_report.format_transcript,
+                                      students_query=console_report.BATCH_STUDENTS_QUERY,
+                                      grades_query=console_report.BATCH_GRADES_QUERY)
+    if args.restart: job.restart()
+    for done, total in job.run(cohort):
+        pass  # progress is only shown by the interactive console
+    message(f"Wrote {job.written} transcripts to {args.out}" + (f" ({job.skipped} from an earlier run)." if job.skipped else "."))
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="console_cli", description="Student Grade Management System - batch commands")
+    parser.add_argument("--db", help="database file (default: $GRADE_DB_PATH, then the backend default)")
+    parser.add_argument("--backend", choices=("access", "sqlite"), help="default: $GRADE_DB_BACKEND, then access")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("report", help="run a report")
+    p.add_argument("name", choices=sorted(REPORTS))
+    p.add_argument("--student-id", type=int, help="student for the transcript report")
+    p.add_argument("--threshold", type=float, default=2.0, help="at-risk GPA threshold (default 2.0)")
+    p.add_argument("-o", "--output", help="file: .txt for the table, or .csv/.jsonl/.parquet (+ .gz); default stdout")
+    p.set_defaults(run=cmd_report)
+
+    p = commands.add_parser("export", help="export a whole table")
+    p.add_argument("table", choices=sorted(console_report.EXPORT_QUERIES))
+    p.add_argument("output", help=".csv, .jsonl or .parquet (add .gz to compress)")
+    p.set_defaults(run=cmd_export)
+
+    p = commands.add_parser("import", help="import rows from a CSV file")
+    p.add_argument("table", choices=sorted(IMPORTS))
+    p.add_argument("file")
+    p.add_argument("--rejects", help="rejected rows file (default: <file>.rejects.csv)")
+    p.set_defaults(run=cmd_import)
+
+    p = commands.add_parser("list", help="list a table in primary key order")
+    p.add_argument("table", choices=sorted(LISTS))
+    p.add_argument("--after", type=int, help="start after this ID")
+    p.add_argument("--limit", type=int, help="at most this many rows")
+    p.add_argument("-o", "--output", help="file: .txt for the table, or an export format; default stdout")
+    p.set_defaults(run=cmd_list)
+
+    p = commands.add_parser("search", help="find students or courses by ID or name")
+    p.add_argument("table", choices=sorted(SEARCHES))
+    p.add_argument("text", help="an ID, or part of a name")
+    p.add_argument("-o", "--output", help="file: .txt for the table, or an export format; default stdout")
+    p.set_defaults(run=cmd_search)
+
+    p = commands.add_parser("transcripts", help="write the transcripts of a cohort")
+    p.add_argument("--out", required=True, help="output folder (a rerun resumes an unfinished batch)")
+    p.add_argument("--status", help="only students with this status")
+    p.add_argument("--department", help="only students of this department")
+    p.add_argument("--combined", action="store_true", help="one transcripts.txt instead of a file per student")
+    p.add_argument("--restart", action="store_true", help="ignore an unfinished batch in the folder")
+    p.set_defaults(run=cmd_transcripts)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not is_text(getattr(args, "output", None)) or args.command == "export":
+        try:
+            export.format_for(args.output)
+        except ValueError as e:
+            message(str(e))
+            return EXIT_USAGE
+
+    # The connection messages would end up in piped output
+    with contextlib.redirect_stdout(sys.stderr):
+        db = console_database.DatabaseConnection(args.db, args.backend)
+    if not db.pool:
+        message("Could not connect to the database.")
+        return EXIT_ERROR
+    try:
+        return args.run(db, args)
+    except BrokenPipeError:
+        # stdout piped into e.g. head, which stopped reading
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_OK
+    except Exception as e:
+        message(f"Error: {e}")
+        return EXIT_ERROR
+    finally:
+        with contextlib.redirect_stdout(sys.stderr):
+            db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,13 @@
+import bulk_import  # shared with the GUI (project root is on sys.path)
+import console_pager
+
+# CSV import: tblCourse columns (header names are matched loosely)
+IMPORT_SPEC = bulk_import.ImportSpec("tblCourse", [
+    bulk_import.Column("courseName", required=True, aliases=("Name", "Course")),
+    bulk_import.Column("credit", bulk_import.positive_integer, aliases=("Credits",)),
+    bulk_import.Column("department", aliases=("Dept",)),
+])
+
 class ConsoleCourseManager:
     """Manages course catalog operations including adding, updating, and viewing courses."""
     def __init__(self, db_connection):
@@ -11,7 +21,8 @@ class ConsoleCourseManager:
             print("3. Add Course")
             print("4. Update Course")
             print("5. Delete Course")
-            print("6. Back")
+            print("6. Import Courses from CSV")
+            print("7. Back")
             
             choice = input("Choice: ").strip()
             
@@ -20,15 +31,16 @@ class ConsoleCourseManager:
             elif choice == "3": self.add_course()
             elif choice == "4": self.update_course()
             elif choice == "5": self.delete_course()
-            elif choice == "6": break
+            elif choice == "6": self.import_csv()
+            elif choice == "7": break
             else: print("Invalid choice.")
     
-    def view_all_courses(self): #SHOW ALL COURSES
-        rows = self.db.fetch_all("SELECT * FROM tblCourse ORDER BY courseName")
-        if not rows:
+    def view_all_courses(self): #SHOW ALL COURSES (ONE PAGE AT A TIME, BY ID)
+        pager = console_pager.KeysetPager(self.db, "tblCourse", "*", "courseID")
+        if not console_pager.browse(pager, self.print_courses):
             print("No courses found.")
-            return
-        
+    
+    def print_courses(self, rows): #PRINT ONE PAGE OF COURSES
         print("\n" + "ID".ljust(5) + "Name".ljust(30) + "Credit".ljust(8) + "Dept".ljust(20))
         print("-" * 65)
         for r in rows:
@@ -103,6 +115,17 @@ class ConsoleCourseManager:
             self.db.execute_query(f"UPDATE tblCourse SET {', '.join(updates)} WHERE courseID=?", params)
             print("Updated.")
     
+    def import_csv(self): #IMPORT COURSES FROM CSV
+        # Bulk-load a CSV file; rows that fail validation go to a rejects file
+        path = input("CSV file: ").strip().strip('"')
+        if not path: return print("Cancelled.")
+        try:
+            result = bulk_import.import_csv(self.db, IMPORT_SPEC, path,
+                                            progress=lambda n: print(f"  {n} rows read...", end="\r"))
+            print(result.summary())
+        except Exception as e:  # file, CSV or database error
+            print(f"Import failed: {e}")
+    
     def delete_course(self):
         cid = input("Enter Course ID to delete: ")
         if input("Confirm? (y/n): ") == 'y':
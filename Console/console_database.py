@@ -1,30 +1,62 @@
-import pyodbc
 from datetime import date, datetime
-from types import SimpleNamespace
+import itertools
+import sys
+import storage  # shared with the GUI (project root is put on sys.path by console_main)
+
+# Tables for backends that manage their own schema (SQLite)
+SQLITE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS tblStudent (
+        studentID INTEGER PRIMARY KEY AUTOINCREMENT,
+        firstName TEXT NOT NULL,
+        lastName TEXT NOT NULL,
+        gender TEXT,
+        dateOfbirth DATE,
+        contact TEXT,
+        address TEXT,
+        department TEXT,
+        status TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS tblCourse (
+        courseID INTEGER PRIMARY KEY AUTOINCREMENT,
+        courseName TEXT NOT NULL,
+        credit INTEGER,
+        department TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS tblGrade (
+        enrollmentID INTEGER PRIMARY KEY AUTOINCREMENT,
+        studentID INTEGER NOT NULL,
+        courseID INTEGER NOT NULL,
+        firstSemester TEXT,
+        secondSemester TEXT,
+        gpa REAL,
+        status TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS idxStudentName ON tblStudent (lastName, firstName)",
+    "CREATE INDEX IF NOT EXISTS idxGradeStudent ON tblGrade (studentID)",
+    "CREATE INDEX IF NOT EXISTS idxGradeCourse ON tblGrade (courseID)",
+]
 
 class DatabaseConnection:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, backend=None, pool_size=4):
         # Initialize database connection
-        if db_path is None:
-            # Default path
-            self.db_path = r"D:\Documents\DBMS\Assignment-Python.accdb"
-        else:
-            self.db_path = db_path
-            
-        self.conn_string = (
-            r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
-            f"DBQ={self.db_path};"
-        )
-        self.conn = None
-        self.cursor = None
+        # backend is "access" or "sqlite" (default: $GRADE_DB_BACKEND, then "access")
+        # pool_size caps the number of connections shared by all threads
+        self.backend = storage.get_backend(backend, db_path, schema=SQLITE_SCHEMA)
+        self.db_path = self.backend.db_path
+        self.pool_size = pool_size
+        self.pool = None
+        self._writes = itertools.count(1)
+        self.data_version = 0  # changes after every write (report caches key on it)
         self.connect()
     
     def connect(self):
-        # Establish database connection
+        # Open the connection pool and make sure the schema exists
         try:
-            self.conn = pyodbc.connect(self.conn_string)
-            self.cursor = self.conn.cursor()
-            print("Database connected successfully.")
+            pool = storage.ConnectionPool(self.backend, size=self.pool_size)
+            with pool.connection() as conn:
+                self.backend.setup(conn)
+            self.pool = pool
+            print(f"Database connected successfully ({self.backend.name}).")
             return True
         except FileNotFoundError:
             print(f"Database file not found at: {self.db_path}")
@@ -34,6 +66,16 @@ class DatabaseConnection:
             print(f"Connection failed: {e}")
             return False
     
+    @property
+    def conn(self):
+        # Connection pinned to the calling thread (None when not connected)
+        return self.pool.pin() if self.pool else None
+    
+    @property
+    def cursor(self):
+        # Cursor owned by the calling thread (None when not connected)
+        return self.pool.thread_cursor() if self.pool else None
+    
     def format_date(self, d): #FORMAT DATE
         # Format date for display
         if isinstance(d, (date, datetime)):
@@ -42,70 +84,160 @@ class DatabaseConnection:
     
     def execute_query(self, query, params=None):
         # Execute a query and commit
+        def work(conn):
+            cursor = conn.statements.cursor(query)
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                # Inside transaction() the commit happens once at the end
+                if not self.pool.in_transaction():
+                    conn.commit()
+            except Exception:
+                conn.statements.discard(query)
+                if not self.pool.in_transaction():
+                    conn.rollback()
+                raise
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            self.conn.commit()
+            self.pool.run(work)
+            self.note_write()
             return True
         except Exception as e:
-            print(f"    Query error: {e}")
+            print(f"    Query error: {e}", file=sys.stderr)
             return False
     
+    def execute_many(self, query, rows, batch_size=1000):
+        # Execute one statement for many parameter rows with executemany,
+        # committing once per batch. Rows that fail are reported in the
+        # returned BatchResult instead of aborting the load.
+        result = storage.BatchResult()
+        in_transaction = self.pool.in_transaction()
+        try:
+            with self.pool.lease() as conn:
+                for number, chunk in enumerate(storage.chunked(rows, batch_size)):
+                    storage.write_batch(conn, query, chunk, number * batch_size, result,
+                                        commit=not in_transaction,
+                                        fast=self.backend.fast_executemany)
+        except Exception as e:
+            print(f"    Batch error: {e}", file=sys.stderr)
+            if in_transaction:
+                raise
+        finally:
+            if result.succeeded:
+                self.note_write()
+        return result
+    
+    def note_write(self):
+        # Bump data_version (cached report results become stale)
+        self.data_version = next(self._writes)
+    
+    def transaction(self):
+        # Group several statements into one commit:
+        #     with db.transaction():
+        #         db.execute_query(...)
+        #         db.execute_query(...)
+        # Everything is rolled back if the block raises.
+        return self.pool.transaction()
+    
     def fetch_one(self, query, params=None):
         # Fetch single row
-        try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            row = self.cursor.fetchone()
-            if not row:
-                return None
+        def work(conn):
+            cursor = conn.statements.cursor(query)
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                row = cursor.fetchone()
+                # Finish the statement so the cached cursor holds no open read
+                cursor.fetchall()
+                if not row:
+                    return None
 
-            # Convert the tuple row into a SimpleNamespace object
-            # This allows accessing columns by name (e.g., row.studentID instead of row[0])
-            cols = [c[0] for c in self.cursor.description] if self.cursor.description else []
-            data = {cols[i]: row[i] for i in range(len(cols))} if cols else dict(enumerate(row))
-            return SimpleNamespace(**data)
+                # Map the row to a record that allows accessing columns by name
+                # (e.g., row.studentID instead of row[0])
+                return storage.make_records(cursor.description, [row])[0]
+            except Exception:
+                conn.statements.discard(query)
+                raise
+        try:
+            return self.pool.run(work)
         except Exception as e:
-            print(f"Fetch error: {e}")
-            print(f"Query: {query[:100]}...")
+            print(f"Fetch error: {e}", file=sys.stderr)
+            print(f"Query: {query[:100]}...", file=sys.stderr)
             return None
     
     def fetch_all(self, query, params=None):
         # Fetch all rows
-        try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            rows = self.cursor.fetchall()
-            if not rows:
-                return []
-
-            # Convert all rows to SimpleNamespace objects for attribute access
-            cols = [c[0] for c in self.cursor.description] if self.cursor.description else []
-            out = []
-            for row in rows:
-                if cols:
-                    data = {cols[i]: row[i] for i in range(len(cols))}
+        def work(conn):
+            cursor = conn.statements.cursor(query)
+            try:
+                if params:
+                    cursor.execute(query, params)
                 else:
-                    data = dict(enumerate(row))
-                out.append(SimpleNamespace(**data))
-            return out
+                    cursor.execute(query)
+                rows = cursor.fetchall()
+                if not rows:
+                    return []
+
+                # One record class per result shape (cached by column names),
+                # so each row costs a single small tuple instead of a dict plus
+                # a SimpleNamespace
+                return storage.make_records(cursor.description, rows)
+            except Exception:
+                conn.statements.discard(query)
+                raise
+        try:
+            return self.pool.run(work)
         except Exception as e:
-            print(f"Fetch error: {e}")
-            print(f"Query: {query[:100]}...")
+            print(f"Fetch error: {e}", file=sys.stderr)
+            print(f"Query: {query[:100]}...", file=sys.stderr)
             return []
     
+    def iter_rows(self, query, params=None, batch_size=500, describe=None):
+        # Stream rows with fetchmany instead of loading the whole result:
+        #     for row in db.iter_rows("SELECT ..."):
+        # The generator holds a pooled connection until it is exhausted or closed;
+        # errors are raised to the caller (the connection is released first).
+        # describe(cursor.description) is called once the query has run, even with no rows.
+        lease = self.pool.lease() if self.pool.in_transaction() else self.pool.connection()
+        with lease as conn:
+            cursor = conn.cursor()
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                if describe:
+                    describe(cursor.description)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from storage.make_records(cursor.description, rows)
+            finally:
+                cursor.close()
+    
+    def top_n(self, query, n): #LIMIT A SELECT TO N ROWS
+        # TOP n for Access, LIMIT n for SQLite - end the query with an ORDER BY
+        # on a unique column so Access does not return extra tied rows
+        return self.backend.top_n(query, n)
+    
+    def statement_stats(self, limit=10):
+        # Busiest statements as (sql, cache hits, cache misses)
+        return self.pool.statement_stats.top(limit) if self.pool else []
+    
+    def release(self):
+        # Return the calling thread's connection to the pool (call when a worker thread finishes)
+        if self.pool:
+            self.pool.unpin()
+    
     def close(self): #CLOSE DATABASE
         """Close database connection"""
-        if self.cursor:
-            self.cursor.close()
-        if self.conn:
-            self.conn.close()
+        if self.pool:
+            self.pool.close()
+            self.pool = None
         print("Database connection closed.")
     
     def test_connection(self):
@@ -1,3 +1,20 @@
+import bulk_import  # shared with the GUI (project root is on sys.path)
+import console_pager
+import console_table
+
+# CSV import: tblGrade columns; students are given by ID, courses by ID or name
+IMPORT_SPEC = bulk_import.ImportSpec("tblGrade", [
+    bulk_import.Column("studentID", required=True, aliases=("Student",), lookup="student"),
+    bulk_import.Column("courseID", required=True, aliases=("Course", "courseName"), lookup="course"),
+    bulk_import.Column("firstSemester", aliases=("Sem1", "Sem 1")),
+    bulk_import.Column("secondSemester", aliases=("Sem2", "Sem 2")),
+    bulk_import.Column("gpa", bulk_import.number),
+    bulk_import.Column("status"),
+], lookups={
+    "student": "SELECT studentID FROM tblStudent",
+    "course": "SELECT courseID, courseName FROM tblCourse",
+})
+
 class ConsoleGradeManager:
     def __init__(self, db_connection):
         self.db = db_connection
@@ -11,7 +28,8 @@ class ConsoleGradeManager:
             print("4. Add Grade")
             print("5. Update Grade")
             print("6. Delete Grade")
-            print("7. Back")
+            print("7. Import Grades from CSV")
+            print("8. Back")
             
             choice = input("Choice: ").strip()
             
@@ -21,25 +39,21 @@ class ConsoleGradeManager:
             elif choice == "4": self.add_grade()
             elif choice == "5": self.update_grade()
             elif choice == "6": self.delete_grade()
-            elif choice == "7": break
+            elif choice == "7": self.import_csv()
+            elif choice == "8": break
             else: print("Invalid choice.")
     
-    def view_all_grades(self): #SHOW ALL GRADES
-        rows = self.db.fetch_all("SELECT * FROM tblGrade ORDER BY enrollmentID")
-        if not rows:
+    def view_all_grades(self): #SHOW ALL GRADES (ONE PAGE AT A TIME)
+        pager = console_pager.KeysetPager(self.db, "tblGrade", "*", "enrollmentID")
+        if not console_pager.browse(pager, self.print_grades):
             print("No grades found.")
-            return
-        
-        print("\n" + "ID".ljust(5) + "StuID".ljust(10) + "CrsID".ljust(10) + "Sem1".ljust(10) + "Sem2".ljust(10) + "GPA".ljust(6) + "Status".ljust(12))
-        print("-" * 70)
-        for r in rows:
-            print(str(r.enrollmentID).ljust(5) + 
-                  str(r.studentID).ljust(10) + 
-                  str(r.courseID).ljust(10) + 
-                  str(r.firstSemester or '-').ljust(10) + 
-                  str(r.secondSemester or '-').ljust(10) + 
-                  str(r.gpa or 0).ljust(6) + 
-                  str(getattr(r, 'status', getattr(r, 'Status', '')) or '').ljust(12))
+    
+    def print_grades(self, rows): #PRINT ONE PAGE OF GRADES
+        print()
+        table = console_table.TableWriter([("ID", None), ("StuID", None), ("CrsID", None), ("Sem1", None),
+                                           ("Sem2", None), ("GPA", None), ("Status", None)])
+        table.write((r.enrollmentID, r.studentID, r.courseID, r.firstSemester or '-', r.secondSemester or '-',
+                     r.gpa or 0, getattr(r, 'status', getattr(r, 'Status', '')) or '') for r in rows)
     
     def view_grades_by_student(self): #SHOW GRADES BY STUDENT
         sid = input("Enter Student ID: ")
@@ -121,6 +135,17 @@ class ConsoleGradeManager:
             self.db.execute_query(f"UPDATE tblGrade SET {', '.join(updates)} WHERE enrollmentID=?", params)
             print("Updated.")
     
+    def import_csv(self): #IMPORT GRADES FROM CSV
+        # Bulk-load a CSV file; rows that fail validation go to a rejects file
+        path = input("CSV file: ").strip().strip('"')
+        if not path: return print("Cancelled.")
+        try:
+            result = bulk_import.import_csv(self.db, IMPORT_SPEC, path,
+                                            progress=lambda n: print(f"  {n} rows read...", end="\r"))
+            print(result.summary())
+        except Exception as e:  # file, CSV or database error
+            print(f"Import failed: {e}")
+    
     def delete_grade(self): #REMOVE GRADE
         gid = input("Enrollment ID to delete: ")
         if input("Confirm? (y/n): ") == 'y':
@@ -1,3 +1,9 @@
+import os
+import sys
+
+# Shared modules (storage backends, ...) live in the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import console_database
 import console_student
 import console_course
@@ -0,0 +1,102 @@
+# Keyset pagination for the console listings: every page is one
+# "TOP n ... WHERE key > last key ORDER BY key" query on the primary key,
+# so the first screen comes back as quickly from a big table as from a small one
+
+PAGE_SIZE = 20
+
+class KeysetPager:
+    # One page of a table at a time, ordered by its (integer) primary key
+    def __init__(self, db, table, columns, key, page_size=PAGE_SIZE):
+        self.db = db
+        self.key = key
+        self.page_size = page_size
+        self.select = f"SELECT {columns} FROM {table}"
+        self.rows = []          # current page
+        self.has_next = False
+        self.has_prev = False
+
+    def first(self): #FIRST PAGE
+        return self._forward()
+
+    def last(self): #LAST PAGE
+        return self._backward()
+
+    def next(self): #PAGE AFTER THE CURRENT ONE
+        if not self.has_next: return self.rows
+        return self._forward(self._key(self.rows[-1]))
+
+    def prev(self): #PAGE BEFORE THE CURRENT ONE
+        if not self.has_prev: return self.rows
+        self._backward(self._key(self.rows[0]))
+        # Pages after a jump don't line up with the first page - show a full one
+        if not self.has_prev and len(self.rows) < self.page_size: return self.first()
+        return self.rows
+
+    def jump(self, key): #PAGE STARTING AT A KEY VALUE
+        self._forward(key, inclusive=True)
+        if self.rows:
+            before = self._fetch(f"WHERE {self.key} < ? ORDER BY {self.key} DESC", (self._key(self.rows[0]),), 1)
+            self.has_prev = bool(before)
+        return self.rows
+
+    def resize(self, page_size): #CHANGE PAGE SIZE (STAYS AT THE CURRENT FIRST ROW)
+        self.page_size = page_size
+        return self.jump(self._key(self.rows[0])) if self.rows else self.first()
+
+    def _forward(self, after=None, inclusive=False):
+        if after is None:
+            rows = self._fetch(f"ORDER BY {self.key}", None, self.page_size + 1)
+        else:
+            op = ">=" if inclusive else ">"
+            rows = self._fetch(f"WHERE {self.key} {op} ? ORDER BY {self.key}", (after,), self.page_size + 1)
+        # One extra row tells whether there is a next page without a COUNT(*)
+        self.has_next = len(rows) > self.page_size
+        self.has_prev = after is not None
+        self.rows = rows[:self.page_size]
+        return self.rows
+
+    def _backward(self, before=None):
+        if before is None:
+            rows = self._fetch(f"ORDER BY {self.key} DESC", None, self.page_size + 1)
+        else:
+            rows = self._fetch(f"WHERE {self.key} < ? ORDER BY {self.key} DESC", (before,), self.page_size + 1)
+        self.has_prev = len(rows) > self.page_size
+        self.has_next = before is not None
+        self.rows = rows[:self.page_size][::-1]
+        return self.rows
+
+    def _fetch(self, clause, params, n):
+        return self.db.fetch_all(self.db.top_n(f"{self.select} {clause}", n), params) or []
+
+    def _key(self, row):
+        return getattr(row, self.key)
+
+
+def browse(pager, show): #PAGE THROUGH A LISTING (FALSE WHEN IT IS EMPTY)
+    # show(rows) prints one page; commands: n p f l, j ID, s SIZE, q
+    if not pager.first(): return False
+    while True:
+        show(pager.rows)
+        if pager.rows:
+            print(f"-- {pager.key} {pager._key(pager.rows[0])}-{pager._key(pager.rows[-1])}"
+                  f"{'' if pager.has_next else ' (end)'} --")
+        cmd = input("[n]ext [p]rev [f]irst [l]ast [j] ID jump [s] N page size [q]uit: ").strip().lower()
+        if cmd == "" and not pager.has_next: return True  # Enter past the end leaves
+        if cmd in ("", "n"):
+            if not pager.has_next: print("Last page.")
+            pager.next()
+        elif cmd == "p":
+            if not pager.has_prev: print("First page.")
+            pager.prev()
+        elif cmd == "f": pager.first()
+        elif cmd == "l": pager.last()
+        elif cmd.startswith("j"):
+            value = cmd[1:].strip() or input("Jump to ID: ").strip()
+            if not value.isdigit(): print("Enter an ID."); continue
+            if not pager.jump(int(value)): print("No rows from that ID."); pager.last()
+        elif cmd.startswith("s"):
+            value = cmd[1:].strip() or input("Page size: ").strip()
+            if not value.isdigit() or int(value) < 1: print("Enter a number above 0."); continue
+            pager.resize(int(value))
+        elif cmd == "q": return True
+        else: print("Invalid choice.")
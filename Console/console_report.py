@@ -1,9 +1,159 @@
 from datetime import datetime
+import aggregation
+import export
+import gpa_engine
+import report_model
+import report_service
+import console_table
+import storage
+import transcripts
+
+# ---------- report definitions (query + computation, shared by the views and exports) ----------
+
+def student_names(db, ids): #NAMES FOR A LIST OF STUDENT IDS
+    names = {}
+    for chunk in storage.chunked(ids, 500):
+        marks = ", ".join("?" * len(chunk))
+        query = f"SELECT studentID, firstName, lastName FROM tblStudent WHERE studentID IN ({marks})"
+        for r in db.iter_rows(query, chunk):
+            names[r.studentID] = f"{r.firstName} {r.lastName}"
+    return names
+
+def gpa_value(r): #GPA AS FLOAT (NONE WHEN NOT GRADED)
+    # Same rule as before: empty and zero GPAs are left out of averages
+    return float(r.gpa) if r.gpa else None
+
+def compute_student_list(rows, filters, db):
+    students = [(r.studentID, f"{r.firstName} {r.lastName}", r.gender, r.department, r.status) for r in rows]
+    return students, {"total": len(students)}
+
+def compute_grade_summary(rows, filters, db):
+    grades = [(f"{r.firstName} {r.lastName}", r.courseName, r.gpa) for r in rows]
+    return grades, {"total": len(grades)}
+
+def compute_transcript(rows, filters, db):
+    # iter_rows rather than fetch_one: a query error must fail the report, not read as "not found"
+    found = list(db.iter_rows("SELECT * FROM tblStudent WHERE studentID=?", (filters["student_id"],)))
+    stu = found[0] if found else None
+    courses = [(g.courseName, float(g.credit or 0), g.firstSemester, g.secondSemester, float(g.gpa or 0)) for g in rows]
+    return courses, {"student": stu, "gpa": transcript_gpa(filters["student_id"], courses)}
+
+def transcript_gpa(student_id, courses): #CREDIT-WEIGHTED GPA OF TRANSCRIPT ROWS
+    cols = gpa_engine.Columns()
+    for name, cred, sem1, sem2, gpa in courses:
+        cols.append(student_id, float(gpa or 0), float(cred or 0))
+    overall = gpa_engine.compute(cols).get(student_id)
+    return overall[0] if overall and overall[1] else None
+
+def format_transcript(stu, courses, generated=None): #TRANSCRIPT TEXT (ALSO RUN IN BATCH WORKER PROCESSES)
+    # stu: dict of a tblStudent row, courses: (courseName, credit, sem1, sem2, gpa) rows
+    out = [f"TRANSCRIPT: {stu['firstName']} {stu['lastName']}", "-" * 60,
+           f"{'Course':<30} {'Credit':<8} {'Sem1':<6} {'Sem2':<6} {'GPA':<5}", "-" * 60]
+    for name, cred, sem1, sem2, gpa in courses:
+        out.append(f"{name:<30} {float(cred or 0):<8} {str(sem1 or '-'):<6} {str(sem2 or '-'):<6} {float(gpa or 0)}")
+    out.append("-" * 60)
+    gpa = transcript_gpa(stu["studentID"], courses)
+    if gpa is not None: out.append(f"Overall GPA: {gpa:.2f}")
+    if generated: out.append(f"Generated: {generated}")
+    out.append("-" * 60)
+    return "\n".join(out) + "\n"
+
+# Batch transcripts: the cohort and all of its grades in two queries ({where} filters on s)
+BATCH_STUDENTS_QUERY = """SELECT s.studentID, s.firstName, s.lastName, s.department, s.status
+    FROM tblStudent s{where} ORDER BY s.studentID"""
+BATCH_GRADES_QUERY = """SELECT g.studentID, c.courseName, c.credit, g.firstSemester, g.secondSemester, g.gpa
+    FROM (tblGrade g INNER JOIN tblCourse c ON g.courseID = c.courseID)
+    INNER JOIN tblStudent s ON g.studentID = s.studentID{where}
+    ORDER BY g.studentID, c.courseName"""
+
+def compute_top_performers(rows, filters, db):
+    # The database averages and ranks by student ID; only 10 rows come back
+    return [(i, f"{r.firstName} {r.lastName}", float(r.avgGpa)) for i, r in enumerate(rows, 1)], {}
+
+def compute_course_stats(rows, filters, db):
+    stats = aggregation.Aggregator().measure_by(
+        "course", lambda r: r.courseName, gpa_value).consume(rows).groups["course"]
+    return [(name, s.count, s.mean or 0) for name, s in stats.items()], {}
+
+def compute_at_risk(rows, filters, db):
+    at_risk = gpa_engine.student_gpas(rows).below(filters["threshold"])
+    names = student_names(db, [sid for sid, gpa, n in at_risk])
+    return [(sid, names.get(sid, sid), gpa) for sid, gpa, n in at_risk], {"threshold": filters["threshold"]}
+
+STUDENT_LIST = report_model.ReportDefinition(
+    "student_list", "STUDENT LIST",
+    [("studentID", "ID", None), ("name", "Name", None), ("gender", "Gender", None),
+     ("department", "Department", None), ("status", "Status", None)],
+    "SELECT * FROM tblStudent ORDER BY lastName", compute_student_list)
+
+GRADE_SUMMARY = report_model.ReportDefinition(
+    "grade_summary", "GRADE SUMMARY",
+    [("name", "Student Name", None), ("courseName", "Course Name", None), ("gpa", "GPA", None)],
+    """SELECT s.firstName, s.lastName, c.courseName, g.gpa 
+       FROM ((tblGrade g INNER JOIN tblStudent s ON g.studentID = s.studentID) 
+       INNER JOIN tblCourse c ON g.courseID = c.courseID)""", compute_grade_summary)
+
+TRANSCRIPT = report_model.ReportDefinition(
+    "student_transcript", "TRANSCRIPT",
+    [("courseName", "Course", None), ("credit", "Credit", None), ("firstSemester", "Sem1", None),
+     ("secondSemester", "Sem2", None), ("gpa", "GPA", None)],
+    """SELECT c.courseName, c.credit, g.gpa, g.firstSemester, g.secondSemester
+       FROM tblGrade g INNER JOIN tblCourse c ON g.courseID = c.courseID
+       WHERE g.studentID = ?""", compute_transcript, params=lambda f: (f["student_id"],))
+
+TOP_PERFORMERS = report_model.ReportDefinition(
+    "top_performers", "TOP PERFORMERS REPORT",
+    [("rank", "Rank", None), ("name", "Student Name", None), ("gpa", "GPA", ".2f")],
+    lambda db, f: db.top_n("""
+        SELECT s.studentID, s.firstName, s.lastName, AVG(g.gpa) AS avgGpa
+        FROM tblStudent s INNER JOIN tblGrade g ON s.studentID = g.studentID
+        WHERE g.gpa > 0
+        GROUP BY s.studentID, s.firstName, s.lastName
+        ORDER BY AVG(g.gpa) DESC, s.studentID
+    """, 10), compute_top_performers)
+
+COURSE_STATS = report_model.ReportDefinition(
+    "course_stats", "COURSE STATISTICS REPORT",
+    [("courseName", "Course Name", None), ("students", "Students", None), ("avgGpa", "Avg GPA", ".2f")],
+    "SELECT c.courseName, g.gpa FROM (tblCourse c LEFT JOIN tblGrade g ON c.courseID=g.courseID)",
+    compute_course_stats)
+
+AT_RISK = report_model.ReportDefinition(
+    "at_risk", "AT-RISK STUDENTS",
+    [("studentID", "ID", None), ("name", "Student Name", None), ("gpa", "GPA", ".2f")],
+    "SELECT g.studentID, g.gpa, 1 AS weight FROM (tblGrade g INNER JOIN tblStudent s ON s.studentID=g.studentID) WHERE s.status='Active' AND g.gpa > 0",
+    compute_at_risk)
+
+# Table exports (menu and command line)
+EXPORT_QUERIES = {
+    "students": "SELECT * FROM tblStudent ORDER BY studentID",
+    "grades": """SELECT g.*, s.firstName, s.lastName, c.courseName
+                 FROM ((tblGrade g INNER JOIN tblStudent s ON g.studentID = s.studentID)
+                 INNER JOIN tblCourse c ON g.courseID = c.courseID)
+                 ORDER BY g.enrollmentID""",
+    "courses": "SELECT * FROM tblCourse ORDER BY courseID",
+}
+
+REPORTS = {d.name: d for d in (STUDENT_LIST, GRADE_SUMMARY, TRANSCRIPT, TOP_PERFORMERS, COURSE_STATS, AT_RISK)}
 
 class ConsoleReportGenerator:
     # Generates various statistical reports and analytics from the database.
     def __init__(self, db_connection):
         self.db = db_connection
+        self.results = report_model.results(db_connection)  # shared, cached per data version
+
+    def heavy_report(self, definition): #RUN A REPORT IN THE WORKER PROCESSES (CTRL+C CANCELS)
+        print(f"Generating {definition.title.lower()}... (Ctrl+C to cancel)")
+        try:
+            return self.results.get(definition, run=report_service.service(self.db).run)
+        except KeyboardInterrupt: print("Cancelled.")
+        except report_service.ReportTimeout as e: print(f"{e}.")
+        except Exception as e: print(f"Report failed: {e}")
+
+    def light_report(self, definition, filters=None): #RUN A QUICK REPORT HERE (NONE ON ERROR)
+        try:
+            return self.results.get(definition, filters)
+        except Exception as e: print(f"Report failed: {e}")
 
     def menu(self): #LIST FOR CHOICE OF REPORTS
         while True:
@@ -15,7 +165,8 @@ class ConsoleReportGenerator:
             print("5. Course Stats")
             print("6. At-Risk")
             print("7. Export")
-            print("8. Back")
+            print("8. Batch Transcripts")
+            print("9. Back")
             choice = input("Choice: ").strip()
             
             if choice == "1": self.generate_student_list()
@@ -25,122 +176,121 @@ class ConsoleReportGenerator:
             elif choice == "5": self.generate_course_stats()
             elif choice == "6": self.generate_at_risk()
             elif choice == "7": self.export_report()
-            elif choice == "8": break
+            elif choice == "8": self.batch_transcripts()
+            elif choice == "9": break
             else: print("Invalid choice.")
     
     def generate_student_list(self): #SHOW ALL STUDENTS
-        # Print a simple list of all students
-        rows = self.db.fetch_all("SELECT * FROM tblStudent ORDER BY lastName")
-        print(f"\nSTUDENT LIST ({len(rows)} students)")
-        print("=" * 80)
-        print(f"{'ID':<8} {'Name':<25} {'Gender':<10} {'Department':<20} {'Status':<12}")
-        print("-" * 80)
-        for r in rows:
-            name = f"{r.firstName} {r.lastName}"
-            print(f"{str(r.studentID):<8} {name:<25} {str(r.gender or ''):<10} {str(r.department or ''):<20} {str(r.status or ''):<12}")
+        # Print a simple list of all students (screen, pager or file)
+        result = self.light_report(STUDENT_LIST)
+        if result is None: return
+        with console_table.output(console_table.ask_output()) as out:
+            out.write("\nSTUDENT LIST\n" + "=" * 80 + "\n")
+            table = console_table.TableWriter([("ID", None), ("Name", None), ("Gender", None),
+                                               ("Department", None), ("Status", None)], out)
+            table.write((r.studentID, r.name, r.gender, r.department, r.status) for r in result.rows)
+            out.write("-" * 80 + f"\nTotal: {result.summary['total']} students\n")
     
     def generate_grade_summary(self):
-        # Show a summary of grades joining student and course data
-        query = """SELECT s.firstName, s.lastName, c.courseName, g.gpa 
-                   FROM ((tblGrade g INNER JOIN tblStudent s ON g.studentID = s.studentID) 
-                   INNER JOIN tblCourse c ON g.courseID = c.courseID)"""
-        rows = self.db.fetch_all(query)
-        print(f"\nGRADE SUMMARY ({len(rows)} records)")
-        print("=" * 70)
-        print(f"{'Student Name':<25} {'Course Name':<30} {'GPA':<5}")
-        print("-" * 70)
-        for r in rows:
-            name = f"{r.firstName} {r.lastName}"
-            print(f"{name:<25} {r.courseName:<30} {r.gpa:<5}")
+        # Show a summary of grades joining student and course data (screen, pager or file)
+        result = self.heavy_report(GRADE_SUMMARY)
+        if result is None: return
+        with console_table.output(console_table.ask_output()) as out:
+            out.write("\nGRADE SUMMARY\n" + "=" * 70 + "\n")
+            table = console_table.TableWriter([("Student Name", None), ("Course Name", None), ("GPA", None)], out)
+            table.write((r.name, r.courseName, r.gpa) for r in result.rows)
+            out.write("-" * 70 + f"\nTotal: {result.summary['total']} records\n")
     
     def generate_student_transcript(self): #SHOW STUDENTS TRANSCRIPT
         print("--- TRANSCRIPT ---")
         print("-" * 60)
-        sid = input("Student ID: ")
-        stu = self.db.fetch_one("SELECT * FROM tblStudent WHERE studentID=?", (sid,))
+        sid = input("Student ID: ").strip()
+        if not sid.isdigit(): return print("Not found.")
+        result = self.light_report(TRANSCRIPT, {"student_id": int(sid)})
+        if result is None: return
+        stu = result.summary["student"]
         if not stu: return print("Not found.")
         
-        print(f"TRANSCRIPT: {stu.firstName} {stu.lastName}")
-        print("-" * 60)
-        query = """
-            SELECT c.courseName, c.credit, g.gpa, g.firstSemester, g.secondSemester
-            FROM tblGrade g INNER JOIN tblCourse c ON g.courseID = c.courseID
-            WHERE g.studentID = ?
-        """
-        grades = self.db.fetch_all(query, (sid,))
-        
-        print(f"{'Course':<30} {'Credit':<8} {'Sem1':<6} {'Sem2':<6} {'GPA':<5}")
-        print("-" * 60)
-        
-        total_pts, total_cred = 0, 0
-        # Calculate weighted GPA
-        for g in grades:
-            cred = float(g.credit or 0)
-            gpa = float(g.gpa or 0)
-            sem1 = str(g.firstSemester or '-')
-            sem2 = str(g.secondSemester or '-')
-            print(f"{g.courseName:<30} {cred:<8} {sem1:<6} {sem2:<6} {gpa}")
-            total_pts += gpa * cred
-            total_cred += cred
+        print(format_transcript(stu._asdict(), result.rows), end="")
 
-        print("-" * 60)
-        if total_cred: print(f"Overall GPA: {total_pts/total_cred:.2f}")
-        print("-" * 60)
+    def batch_transcripts(self): #WRITE TRANSCRIPTS FOR A WHOLE COHORT
+        print("--- BATCH TRANSCRIPTS ---")
+        folder = input("Output folder: ").strip()
+        if not folder: return print("Cancelled.")
+        cohort = {}
+        status = input("Status (blank = all): ").strip()
+        if status: cohort["status"] = status
+        dept = input("Department (blank = all): ").strip()
+        if dept: cohort["department"] = dept
+        combined = input("One combined file? (y/n): ").strip().lower() == "y"
+
+        job = transcripts.TranscriptBatch(self.db, folder, combined=combined, format_fn=format_transcript,
+                                          students_query=BATCH_STUDENTS_QUERY, grades_query=BATCH_GRADES_QUERY)
+        if job.has_previous_run():
+            if input("Unfinished batch in this folder. Resume? (y/n): ").strip().lower() != "y": job.restart()
+        try:
+            for done, total in job.run(cohort):
+                print(f"\r{done}/{total} transcripts", end="", flush=True)
+            print()
+            print(f"Wrote {job.written} transcripts to {folder}" + (f" ({job.skipped} from an earlier run)." if job.skipped else "."))
+        except KeyboardInterrupt:
+            print(f"\nStopped after {job.written}. Run again on {folder} to resume.")
+        except Exception as e:
+            print(f"\nBatch failed: {e}. Run again on {folder} to resume.")
 
     def generate_top_performers(self): #SHOW TOP PERFORMERS
-        # Calculate and display students with the highest average GPAs
-        rows = self.db.fetch_all("SELECT s.firstName, s.lastName, g.gpa FROM (tblStudent s INNER JOIN tblGrade g ON s.studentID=g.studentID)")
-        stats = {}
-        for r in rows:
-            name = f"{r.firstName} {r.lastName}"
-            if name not in stats: stats[name] = []
-            if r.gpa: stats[name].append(float(r.gpa))
-            
-        # Calculate average GPA for each student
-        avgs = [(name, sum(g)/len(g)) for name, g in stats.items() if g]
-        avgs.sort(key=lambda x: x[1], reverse=True)
-        
+        result = self.light_report(TOP_PERFORMERS)  # a TOP 10 query - not worth a worker process
+        if result is None: return
         print("\nTOP PERFORMERS REPORT")
         print("=" * 50)
         print(f"{'Rank':<6} {'Student Name':<30} {'GPA':<6}")
         print("-" * 50)
-        for i, (name, gpa) in enumerate(avgs[:10], 1):
-            print(f"{i:<6} {name:<30} {gpa:.2f}")
+        for r in result.rows:
+            print(f"{r.rank:<6} {r.name:<30} {r.gpa:.2f}")
     
     def generate_course_stats(self): #SHOW COURSE STATS AND AVERAGE
-        rows = self.db.fetch_all("SELECT c.courseName, g.gpa FROM (tblCourse c LEFT JOIN tblGrade g ON c.courseID=g.courseID)")
-        stats = {}
-        for r in rows:
-            if r.courseName not in stats: stats[r.courseName] = []
-            if r.gpa: stats[r.courseName].append(float(r.gpa))
-            
+        result = self.heavy_report(COURSE_STATS)
+        if result is None: return
         print("\nCOURSE STATISTICS REPORT")
         print("-" * 60)
         print(f"{'Course Name':<35} {'Students':<10} {'Avg GPA':<10}")
         print("-" * 60)
-        for name, gpas in stats.items():
-            avg = sum(gpas)/len(gpas) if gpas else 0
-            print(f"{name:<35} {len(gpas):<10} {avg:.2f}")
+        for r in result.rows:
+            print(f"{r.courseName:<35} {r.students:<10} {r.avgGpa:.2f}")
     
     def generate_at_risk(self): #SHOW AT-RISK OF FAILING STUDENTS
-        rows = self.db.fetch_all("SELECT s.firstName, s.lastName, g.gpa FROM (tblStudent s LEFT JOIN tblGrade g ON s.studentID=g.studentID) WHERE s.status='Active'")
-        stats = {}
-        for r in rows:
-            name = f"{r.firstName} {r.lastName}"
-            if name not in stats: stats[name] = []
-            if r.gpa: stats[name].append(float(r.gpa))
-            
+        result = self.light_report(AT_RISK, {"threshold": 2.0})
+        if result is None: return
         print("\nAT-RISK STUDENTS (GPA < 2.0)")
         print("=" * 50)
         print(f"{'Student Name':<35} {'GPA':<6}")
         print("-" * 50)
-        for name, gpas in stats.items():
-            if gpas:
-                avg = sum(gpas)/len(gpas)
-                if avg < 2.0: 
-                    print(f"{name:<35} {avg:.2f}")
+        for r in result.rows:
+            print(f"{r.name:<35} {r.gpa:.2f}")
     
     def export_report(self): #EXPORT REPORT(PRINT OUT)
+        # Stream a table straight from the database to CSV / JSON Lines / Parquet
+        print("1. Students")
+        print("2. Grades (full history)")
+        print("3. Courses")
+        print("4. Summary counts (.txt)")
+        print("5. Report results (rows as shown by a report)")
+        choice = input("Export: ").strip()
+        if choice == "4": return self.export_counts()
+        if choice == "5": return self.export_result()
+        tables = {"1": "students", "2": "grades", "3": "courses"}
+        if choice not in tables: return print("Invalid choice.")
+        
+        fname = input("Filename (.csv, .jsonl or .parquet, add .gz to compress): ").strip()
+        if not fname: return print("Cancelled.")
+        if "." not in fname: fname += ".csv"
+        try:
+            count = export.export_query(self.db, EXPORT_QUERIES[tables[choice]], fname)
+            print(f"Exported {count} rows to {fname}.")
+        except Exception as e:
+            print(f"Export failed: {e}")
+    
+    def export_counts(self): #EXPORT STUDENT/GRADE COUNTS
         # Export basic statistics to a text file
         fname = input("Filename: ")
         with open(f"{fname}.txt", "w") as f:
@@ -150,3 +300,25 @@ class ConsoleReportGenerator:
             f.write(f"Students: {stu_count}\n")
             f.write(f"Grades: {grade_count}\n")
         print("Exported.")
+    
+    def export_result(self): #EXPORT A REPORT'S RESULT ROWS
+        # Written from the cached report result - nothing is recomputed
+        reports = {"1": (STUDENT_LIST, None), "2": (GRADE_SUMMARY, None),
+                   "4": (TOP_PERFORMERS, None), "5": (COURSE_STATS, None),
+                   "6": (AT_RISK, {"threshold": 2.0})}
+        choice = input("Report (1 List, 2 Grades, 3 Transcript, 4 Top, 5 Courses, 6 At-Risk): ").strip()
+        if choice == "3":
+            sid = input("Student ID: ").strip()
+            if not sid.isdigit(): return print("Not found.")
+            reports["3"] = (TRANSCRIPT, {"student_id": int(sid)})
+        if choice not in reports: return print("Invalid choice.")
+        
+        fname = input("Filename (.csv, .jsonl or .parquet, add .gz to compress): ").strip()
+        if not fname: return print("Cancelled.")
+        if "." not in fname: fname += ".csv"
+        try:
+            result = self.results.get(*reports[choice])
+            count = export.write_rows(result.rows, fname, description=result.description)
+            print(f"Exported {count} rows to {fname}.")
+        except Exception as e:
+            print(f"Export failed: {e}")
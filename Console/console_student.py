@@ -1,3 +1,18 @@
+import bulk_import  # shared with the GUI (project root is on sys.path)
+import console_pager
+
+# CSV import: tblStudent columns (header names are matched loosely)
+IMPORT_SPEC = bulk_import.ImportSpec("tblStudent", [
+    bulk_import.Column("firstName", required=True),
+    bulk_import.Column("lastName", required=True),
+    bulk_import.Column("gender", bulk_import.gender),
+    bulk_import.Column("dateOfbirth", bulk_import.date_value, aliases=("DOB", "Birth Date")),
+    bulk_import.Column("contact", aliases=("Phone", "Email")),
+    bulk_import.Column("address"),
+    bulk_import.Column("department", aliases=("Dept",)),
+    bulk_import.Column("status", bulk_import.one_of("Active", "Inactive"), default="Active"),
+])
+
 class ConsoleStudentManager:
     # Manages student-related operations: creating, reading, updating, 
     # and deleting student records in the database.
@@ -16,10 +31,11 @@ class ConsoleStudentManager:
             print("3. Add Student")
             print("4. Update Student")
             print("5. Delete Student")
-            print("6. Back to Main Menu")
+            print("6. Import Students from CSV")
+            print("7. Back to Main Menu")
             print("-" * 60)
             
-            choice = input("Enter your choice (1-6): ").strip()
+            choice = input("Enter your choice (1-7): ").strip()
             
             if choice == "1":
                 self.view_all_students()
@@ -32,41 +48,38 @@ class ConsoleStudentManager:
             elif choice == "5":
                 self.delete_student()
             elif choice == "6":
+                self.import_csv()
+            elif choice == "7":
                 break
             else:
                 print("Invalid choice. Please try again.")
     
-    def view_all_students(self): #SHOW ALL STUDENTS
+    def view_all_students(self): #SHOW ALL STUDENTS (ONE PAGE AT A TIME)
         print("-" * 60)
         try:
             # Select specific columns to ensure display order
-            query = """
-                SELECT studentID, firstName, lastName, gender, dateOfbirth, address, department, status
-                FROM tblStudent
-            """
-            rows = self.db.fetch_all(query)
-            
-            if not rows:
+            pager = console_pager.KeysetPager(self.db, "tblStudent",
+                "studentID, firstName, lastName, gender, dateOfbirth, address, department, status", "studentID")
+            if not console_pager.browse(pager, self.print_students):
                 print("No students found.")
-                return
-
-            # Print table header with fixed-width formatting
-            print("ID".ljust(10), "First Name".ljust(15), "Last Name".ljust(15),
-                  "Gender".ljust(8), "Date of Birth".ljust(15), "Address".ljust(15), "Department".ljust(15), "Status".ljust(15))
-
-            # Iterate through rows and print formatted data
-            for p in rows:
-                print(str(p.studentID).ljust(10),
-                      str(p.firstName).ljust(15),
-                      str(p.lastName).ljust(15),
-                      str(p.gender).ljust(8),
-                      self.db.format_date(p.dateOfbirth).ljust(15),
-                      str(p.address).ljust(15),
-                      str(p.department).ljust(15),
-                      str(p.status).ljust(15))
-
         except Exception as e:
             print("Database error:", e)
+
+    def print_students(self, rows): #PRINT ONE PAGE OF STUDENTS
+        # Print table header with fixed-width formatting
+        print("ID".ljust(10), "First Name".ljust(15), "Last Name".ljust(15),
+              "Gender".ljust(8), "Date of Birth".ljust(15), "Address".ljust(15), "Department".ljust(15), "Status".ljust(15))
+
+        # Iterate through rows and print formatted data
+        for p in rows:
+            print(str(p.studentID).ljust(10),
+                  str(p.firstName).ljust(15),
+                  str(p.lastName).ljust(15),
+                  str(p.gender).ljust(8),
+                  self.db.format_date(p.dateOfbirth).ljust(15),
+                  str(p.address).ljust(15),
+                  str(p.department).ljust(15),
+                  str(p.status).ljust(15))
     
     def search_student(self): #CHOICES OF SEARCH STUDENTS
         """Search for a student"""
@@ -258,6 +271,17 @@ class ConsoleStudentManager:
         except Exception as e:
             print(f"Error: {e}")
     
+    def import_csv(self): #IMPORT STUDENTS FROM CSV
+        # Bulk-load a CSV file; rows that fail validation go to a rejects file
+        path = input("CSV file: ").strip().strip('"')
+        if not path: return print("Cancelled.")
+        try:
+            result = bulk_import.import_csv(self.db, IMPORT_SPEC, path,
+                                            progress=lambda n: print(f"  {n} rows read...", end="\r"))
+            print(result.summary())
+        except Exception as e:  # file, CSV or database error
+            print(f"Import failed: {e}")
+    
     def delete_student(self): #DELETE STUDENTS
         """Delete a student"""
         print("-" * 60)
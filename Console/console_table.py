@@ -0,0 +1,90 @@
+import contextlib
+import numbers
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+
+import storage  # shared with the GUI (project root is on sys.path)
+
+# Fixed-width tables for long console output: the column widths are worked
+# out once from the headings and a sample of the first rows, then rows are
+# formatted in batches and written with one write() per batch instead of a
+# print() per row
+
+SAMPLE_ROWS = 500
+BATCH_ROWS = 2000
+MAX_WIDTH = 40  # a wider value in the sample does not widen its column past this
+
+class TableWriter:
+    def __init__(self, columns, out=None, sample=SAMPLE_ROWS, batch_size=BATCH_ROWS):
+        # columns: (heading, format spec or None) - e.g. ("GPA", ".2f")
+        # out: any text stream (default: the screen)
+        self.headings = [c[0] for c in columns]
+        self.specs = [c[1] for c in columns]
+        self.out = out or sys.stdout
+        self.sample = sample
+        self.batch_size = batch_size
+        self.line = None   # format string for the cell texts, set from the first sample
+        self.raw = None    # same layout formatting the values directly (rows without None)
+        self.width = 0     # total width (for rules above / below the table)
+
+    def cells(self, row): #ROW VALUES AS TEXT (NONE IS EMPTY)
+        return [("" if v is None else format(v, spec) if spec else str(v))
+                for v, spec in zip(row, self.specs)]
+
+    def write(self, rows): #WRITE ROWS (ANY ITERABLE), RETURNS HOW MANY
+        count = 0
+        for batch in storage.chunked(rows, self.batch_size):
+            if self.line is None:
+                self._layout(batch[:self.sample])
+            line, raw, cells = self.line.format, self.raw.format, self.cells
+            self.out.write("".join(line(*cells(r)) if None in r else raw(*r) for r in batch))
+            count += len(batch)
+        if self.line is None:
+            self._layout([])  # no rows: still show the headings
+        return count
+
+    def _layout(self, sample):
+        texts = [self.cells(r) for r in sample]
+        widths, aligns = [], []
+        for i, heading in enumerate(self.headings):
+            width = max([len(heading)] + [min(len(t[i]), MAX_WIDTH) for t in texts])
+            values = [r[i] for r in sample if r[i] is not None]
+            numeric = bool(values) and all(isinstance(v, numbers.Number) and not isinstance(v, bool) for v in values)
+            widths.append(width)
+            aligns.append(">" if numeric else "<")
+        self.line = " ".join(f"{{:{a}{w}}}" for a, w in zip(aligns, widths)) + "\n"
+        self.raw = " ".join(f"{{:{a}{w}{spec}}}" if spec else f"{{!s:{a}{w}}}"
+                            for a, w, spec in zip(aligns, widths, self.specs)) + "\n"
+        self.width = sum(widths) + len(widths) - 1
+        self.out.write(self.line.format(*self.headings) + "-" * self.width + "\n")
+
+
+def ask_output(): #ASK WHERE A LONG LISTING GOES
+    return input("Output (Enter = screen, | = pager, or a file name): ").strip()
+
+@contextlib.contextmanager
+def output(dest=None): #TEXT STREAM FOR THE SCREEN (NONE), A PAGER ("|") OR A FILE
+    if dest == "|":
+        cmd = os.environ.get("PAGER") or ("more" if os.name == "nt" else "less -FRSX")
+        if shutil.which(shlex.split(cmd)[0]):
+            pager = subprocess.Popen(cmd, shell=True, stdin=subprocess.PIPE, text=True)
+            try:
+                yield pager.stdin
+            except BrokenPipeError:
+                pass  # the pager was closed before the end
+            finally:
+                with contextlib.suppress(BrokenPipeError):
+                    pager.stdin.close()
+                pager.wait()
+            return
+        print(f"No pager ({cmd}) found - showing on screen.", file=sys.stderr)
+    if dest and dest != "|":
+        with open(dest, "w", encoding="utf-8") as f:
+            yield f
+        print(f"Written to {dest}.", file=sys.stderr)
+        return
+    yield sys.stdout
+    sys.stdout.flush()
@@ -0,0 +1,112 @@
+import math
+
+
+class Stats:
+    """Running count, sum, (weighted) mean, min/max and optional percentiles"""
+    def __init__(self, keep_values=False):
+        self.count = 0
+        self.total = 0.0
+        self.weight = 0.0
+        self.weighted_total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.values = [] if keep_values else None
+
+    def add(self, value, weight=1):
+        self.count += 1
+        self.total += value
+        self.weight += weight
+        self.weighted_total += value * weight
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if self.values is not None:
+            self.values.append(value)
+
+    @property
+    def mean(self):
+        """Weighted mean (plain mean when no weights were given); None if empty"""
+        return self.weighted_total / self.weight if self.weight else None
+
+    def percentile(self, p):
+        """p-th percentile (0-100) by linear interpolation; needs keep_values"""
+        if not self.values:
+            return None
+        ordered = sorted(self.values)
+        position = (len(ordered) - 1) * p / 100
+        low = math.floor(position)
+        high = math.ceil(position)
+        return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+    @property
+    def median(self):
+        return self.percentile(50)
+
+
+class Aggregator:
+    """
+    Computes several group-by statistics in a single pass over rows:
+        agg = Aggregator().count_by("gender", lambda r: r.gender)
+        for row in agg.feed(db.iter_rows(query)):
+            ...display row...
+        agg.counts["gender"]
+    Value callables may return None to skip a row for that statistic.
+    """
+    def __init__(self):
+        self.rows = 0
+        self.counts = {}   # name -> {group: count}
+        self.stats = {}    # name -> Stats over all rows
+        self.groups = {}   # name -> {group: Stats}
+        self._counters = []
+        self._totals = []
+        self._grouped = []
+
+    def count_by(self, name, key):
+        """Count rows per key(row)"""
+        self.counts[name] = {}
+        self._counters.append((self.counts[name], key))
+        return self
+
+    def measure(self, name, value, weight=None, keep_values=False):
+        """Statistics of value(row) over all rows (weighted by weight(row))"""
+        self.stats[name] = Stats(keep_values)
+        self._totals.append((self.stats[name], value, weight, keep_values))
+        return self
+
+    def measure_by(self, name, key, value, weight=None, keep_values=False):
+        """Statistics of value(row) per key(row); every key gets a group, even without values"""
+        self.groups[name] = {}
+        self._grouped.append((self.groups[name], key, value, weight, keep_values))
+        return self
+
+    def add(self, row):
+        """Fold one row into every statistic"""
+        self.rows += 1
+        for counts, key in self._counters:
+            group = key(row)
+            counts[group] = counts.get(group, 0) + 1
+        for stats, value, weight, keep in self._totals:
+            v = value(row)
+            if v is not None:
+                stats.add(v, weight(row) if weight else 1)
+        for groups, key, value, weight, keep in self._grouped:
+            group = key(row)
+            stats = groups.get(group)
+            if stats is None:
+                stats = groups[group] = Stats(keep)
+            v = value(row)
+            if v is not None:
+                stats.add(v, weight(row) if weight else 1)
+
+    def feed(self, rows):
+        """Pass rows through unchanged while aggregating them"""
+        for row in rows:
+            self.add(row)
+            yield row
+
+    def consume(self, rows):
+        """Aggregate rows that are not needed otherwise"""
+        for row in rows:
+            self.add(row)
+        return self
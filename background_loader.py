@@ -0,0 +1,133 @@
+import queue
+import threading
+import tkinter as tk
+
+
+class BackgroundLoader:
+    """
+    Runs database work for a widget on a worker thread and hands the results
+    back to the Tk main loop with after(), so slow queries never block the UI.
+    Starting a new job cancels the one in flight; its results are dropped.
+    """
+    def __init__(self, widget, db, chunk_size=500, poll_ms=30):
+        """
+        :param widget: Widget whose after() schedules the main-loop callbacks
+        :param db: DatabaseConnection (the worker returns its connection when done)
+        :param chunk_size: Rows handed to the main loop per callback
+        :param poll_ms: Delay between checks for new results
+        """
+        self.widget = widget
+        self.db = db
+        self.chunk_size = chunk_size
+        self.poll_ms = poll_ms
+        self.generation = 0
+        self.results = queue.Queue(maxsize=8)
+        self._poll_job = None
+        self._handlers = None
+
+    @property
+    def busy(self):
+        return self._handlers is not None
+
+    def stream(self, produce, on_chunk, on_done=None, on_error=None):
+        """
+        Iterate produce() on a worker thread; rows arrive on the main loop as
+        on_chunk(rows) in chunks, then on_done(count) or on_error(exception).
+        """
+        self.cancel()
+        self.generation += 1
+        self._handlers = (on_chunk, on_done, on_error)
+        threading.Thread(target=self._work, args=(self.generation, produce),
+                         daemon=True).start()
+        self._schedule()
+
+    def run(self, work, on_done, on_error=None):
+        """Call work() on a worker thread and pass its result to on_done on the main loop"""
+        result = []
+        self.stream(lambda: [work()], result.extend,
+                    lambda count: on_done(result[0]), on_error)
+
+    def cancel(self):
+        """Drop the job in flight (the worker stops at its next row)"""
+        self.generation += 1
+        self._handlers = None
+        if self._poll_job is not None:
+            try:
+                self.widget.after_cancel(self._poll_job)
+            except tk.TclError:
+                pass
+            self._poll_job = None
+
+    # ---------- worker thread ----------
+
+    def _work(self, generation, produce):
+        try:
+            chunk = []
+            count = 0
+            for row in produce():
+                if generation != self.generation:
+                    return
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    count += len(chunk)
+                    if not self._put(generation, "chunk", chunk):
+                        return
+                    chunk = []
+            count += len(chunk)
+            if chunk and not self._put(generation, "chunk", chunk):
+                return
+            self._put(generation, "done", count)
+        except Exception as e:
+            self._put(generation, "error", e)
+        finally:
+            self.db.release()
+
+    def _put(self, generation, kind, payload):
+        # The queue is bounded so a fast query cannot run far ahead of the UI;
+        # keep checking for cancellation while waiting for room
+        while generation == self.generation:
+            try:
+                self.results.put((generation, kind, payload), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # ---------- main loop ----------
+
+    def _schedule(self, delay=None):
+        try:
+            self._poll_job = self.widget.after(
+                self.poll_ms if delay is None else delay, self._poll)
+        except tk.TclError:  # widget destroyed
+            self.cancel()
+
+    def _poll(self):
+        self._poll_job = None
+        if self._handlers is None:
+            return
+        on_chunk, on_done, on_error = self._handlers
+        try:
+            while True:
+                generation, kind, payload = self.results.get_nowait()
+                if generation == self.generation:
+                    break
+        except queue.Empty:
+            self._schedule()
+            return
+
+        try:
+            if kind == "chunk":
+                on_chunk(payload)
+                # More may be waiting - yield to the UI, then come straight back
+                if self._handlers is not None:
+                    self._schedule(1)
+                return
+            self._handlers = None
+            if kind == "done":
+                if on_done:
+                    on_done(payload)
+            elif on_error:
+                on_error(payload)
+        except tk.TclError:  # widget destroyed while loading
+            self.cancel()
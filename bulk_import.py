@@ -0,0 +1,273 @@
+import csv
+import os
+import re
+from datetime import datetime
+
+import gpa_engine
+
+# Rows inserted (and committed) per executemany batch
+BATCH_SIZE = 2000
+
+# Date layouts accepted in import files (the last one is how the tables show dates)
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%Y-%b-%d")
+
+
+# ========== VALUE COERCION ==========
+# Each converter takes the raw CSV text and returns the value to store,
+# None for an empty field, or raises ValueError with the reason
+
+def text(value):
+    value = value.strip()
+    return value or None
+
+def integer(value):
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"'{value}' is not a whole number")
+    if not number.is_integer():
+        raise ValueError(f"'{value}' is not a whole number")
+    return int(number)
+
+def positive_integer(value):
+    number = integer(value)
+    if number is not None and number <= 0:
+        raise ValueError(f"'{value.strip()}' must be greater than 0")
+    return number
+
+def number(value):
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"'{value}' is not a number")
+
+def date_value(value):
+    value = value.strip()
+    if not value:
+        return None
+    for layout in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, layout).date()
+        except ValueError:
+            pass
+    raise ValueError(f"'{value}' is not a date (use YYYY-MM-DD)")
+
+def gender(value):
+    value = value.strip().upper()
+    if not value:
+        return None
+    value = {"MALE": "M", "FEMALE": "F"}.get(value, value)
+    if value not in ("M", "F"):
+        raise ValueError(f"'{value}' is not a gender (M/F)")
+    return value
+
+def grade_letter(value):
+    value = value.strip().upper()
+    if not value:
+        return None  # not graded yet
+    if value not in gpa_engine.GRADE_POINTS:
+        raise ValueError(f"'{value}' is not a letter grade")
+    return value
+
+def one_of(*choices):
+    """Converter accepting only the given values (any case), stored as written here"""
+    canonical = {c.upper(): c for c in choices}
+    def convert(value):
+        value = value.strip()
+        if not value:
+            return None
+        if value.upper() not in canonical:
+            raise ValueError(f"'{value}' is not one of {', '.join(choices)}")
+        return canonical[value.upper()]
+    return convert
+
+
+# ========== IMPORT SPECIFICATION ==========
+
+def header_key(name):
+    """Compare headers loosely: 'First Name', 'first_name' and 'firstName' match"""
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+def lookup_key(value):
+    return str(value).strip().upper()
+
+
+class Column:
+    """One table column filled from a CSV field"""
+    def __init__(self, name, convert=text, required=False, default=None, aliases=(), lookup=None):
+        """
+        :param name: Column in the table (also its CSV header)
+        :param convert: Converter from the CSV text to the stored value
+        :param required: Reject rows without a value
+        :param default: Stored when the field is empty or missing
+        :param aliases: Other CSV headers for this column
+        :param lookup: Name of the ImportSpec lookup that turns the value into an ID
+        """
+        self.name = name
+        self.convert = convert
+        self.required = required
+        self.default = default
+        self.headers = [header_key(h) for h in (name,) + tuple(aliases)]
+        self.lookup = lookup
+
+
+class ImportSpec:
+    """How a CSV file maps onto one table"""
+    def __init__(self, table, columns, lookups=None, complete=None):
+        """
+        :param table: Table the rows are inserted into
+        :param columns: Column definitions, in insert order
+        :param lookups: name -> query whose first column is an ID; the ID and
+                        every other column (e.g. a course code) resolve to it
+        :param complete: Optional function(values dict) filling derived columns
+        """
+        self.table = table
+        self.columns = columns
+        self.lookups = lookups or {}
+        self.complete = complete
+        names = ", ".join(c.name for c in columns)
+        marks = ", ".join("?" for _ in columns)
+        self.insert = f"INSERT INTO {table} ({names}) VALUES ({marks})"
+
+
+class ImportResult:
+    """Rows imported and rejected by one import_csv run"""
+    def __init__(self, path, rejects_path):
+        self.path = path
+        self.rejects_path = rejects_path
+        self.imported = 0
+        self.rejected = 0
+
+    def summary(self):
+        message = f"Imported {self.imported} row(s) from {os.path.basename(self.path)}"
+        if self.rejected:
+            message += f"\n{self.rejected} row(s) rejected - see {self.rejects_path}"
+        return message
+
+    def __repr__(self):
+        return f"<ImportResult {self.imported} imported, {self.rejected} rejected>"
+
+
+# ========== IMPORT ==========
+
+def load_lookups(db, spec):
+    """Read every lookup map once (natural key -> ID), before the first row"""
+    maps = {}
+    for name, query in spec.lookups.items():
+        ids, keys = {}, {}
+        for row in db.iter_rows(query, batch_size=5000):
+            ids[lookup_key(row[0])] = row[0]
+            for key in row[1:]:
+                if key is not None:
+                    keys[lookup_key(key)] = row[0]
+        keys.update(ids)  # an ID wins over a code that looks like one
+        maps[name] = keys
+    return maps
+
+
+def convert_row(spec, fields, raw, maps):
+    """Values tuple for one CSV row (raises ValueError with the reason)"""
+    values = {}
+    for column in spec.columns:
+        header = fields.get(column.name)
+        source = raw.get(header) if header else None
+        try:
+            value = column.convert(source or "")
+        except ValueError as e:
+            raise ValueError(f"{column.name}: {e}")
+        if value is not None and column.lookup:
+            resolved = maps[column.lookup].get(lookup_key(value))
+            if resolved is None:
+                raise ValueError(f"{column.name}: unknown {column.lookup} '{value}'")
+            value = resolved
+        values[column.name] = column.default if value is None else value
+    if spec.complete:
+        spec.complete(values)
+    for column in spec.columns:
+        if column.required and values[column.name] is None:
+            raise ValueError(f"{column.name} is required")
+    return tuple(values[column.name] for column in spec.columns)
+
+
+def import_csv(db, spec, path, rejects_path=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Stream a CSV file into spec.table: rows are validated and converted one
+    at a time and inserted in batches of batch_size (one commit each).
+    Rejected rows are written to the rejects file with their line and reason.
+    :param db: DatabaseConnection (GUI or console)
+    :param spec: ImportSpec for the table
+    :param path: CSV file with a header row
+    :param rejects_path: Defaults to <file>.rejects.csv next to the input
+    :param progress: Optional function(rows read) called after each batch
+    :return: ImportResult
+    """
+    if rejects_path is None:
+        rejects_path = os.path.splitext(path)[0] + ".rejects.csv"
+    result = ImportResult(path, rejects_path)
+    rejects = None
+    rejects_file = None
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        headers = {header_key(h): h for h in reader.fieldnames or [] if h}
+        fields = {}
+        for column in spec.columns:
+            fields[column.name] = next((headers[h] for h in column.headers if h in headers), None)
+        missing = [c.name for c in spec.columns
+                   if c.required and c.default is None and fields[c.name] is None]
+        if missing:
+            raise ValueError(f"{os.path.basename(path)} has no column for: {', '.join(missing)}")
+
+        maps = load_lookups(db, spec)
+
+        def reject(line, raw, reason):
+            nonlocal rejects, rejects_file
+            if rejects is None:
+                rejects_file = open(rejects_path, "w", newline="", encoding="utf-8")
+                rejects = csv.writer(rejects_file)
+                rejects.writerow(["line", "error"] + reader.fieldnames)
+            rejects.writerow([line, reason] + [raw.get(h, "") for h in reader.fieldnames])
+            result.rejected += 1
+
+        def flush(batch):
+            written = db.execute_many(spec.insert, [values for _, _, values in batch],
+                                      batch_size=len(batch))
+            result.imported += written.succeeded
+            failed = {offset: error for offset, _, error in written.failed}
+            # Rows neither written nor rejected: the batch itself could not run
+            for offset in range(written.total, len(batch)):
+                failed[offset] = "batch was not written"
+            for offset, error in sorted(failed.items()):
+                line, raw, _ = batch[offset]
+                reject(line, raw, error)
+
+        try:
+            batch = []
+            read = 0
+            for raw in reader:
+                read += 1
+                if not any((v or "").strip() for v in raw.values() if isinstance(v, str)):
+                    continue  # blank line
+                try:
+                    batch.append((reader.line_num, raw, convert_row(spec, fields, raw, maps)))
+                except ValueError as e:
+                    reject(reader.line_num, raw, str(e))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+                    if progress:
+                        progress(read)
+            if batch:
+                flush(batch)
+            if progress:
+                progress(read)
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
+    return result
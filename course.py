@@ -1,11 +1,49 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from tkinter import font
+import background_loader
+import bulk_import
+import entity_cache
+import grade_summary
+import gpa_engine
+import table_sort
+
+# CSV import: tblCourse columns (the table headings work as CSV headers too)
+COURSE_IMPORT_SPEC = bulk_import.ImportSpec("tblCourse", [
+    bulk_import.Column("courseCode", required=True, aliases=("Code",)),
+    bulk_import.Column("courseName", required=True, aliases=("Name", "Title")),
+    bulk_import.Column("credits", bulk_import.positive_integer, default=3, aliases=("Credit",)),
+    bulk_import.Column("department", aliases=("Dept",)),
+    bulk_import.Column("academicYear", aliases=("Year",)),
+    bulk_import.Column("description"),
+])
+
+def complete_grade(values):
+    """Grade points follow the letter grade unless the file gives them"""
+    if values["gradePoints"] is None and values["grade"] is not None:
+        values["gradePoints"] = gpa_engine.grade_points(values["grade"])
+
+# CSV import: tblGrade columns; students are given by ID, courses by ID or code
+GRADE_IMPORT_SPEC = bulk_import.ImportSpec("tblGrade", [
+    bulk_import.Column("studentID", required=True, aliases=("Student", "Student ID"), lookup="student"),
+    bulk_import.Column("courseID", required=True, aliases=("Course", "courseCode", "Code"), lookup="course"),
+    bulk_import.Column("grade", bulk_import.grade_letter, aliases=("Letter",)),
+    bulk_import.Column("gradePoints", bulk_import.number, aliases=("Points",)),
+    bulk_import.Column("semester"),
+    bulk_import.Column("enrollmentDate", bulk_import.date_value),
+    bulk_import.Column("completionDate", bulk_import.date_value),
+    bulk_import.Column("status", bulk_import.one_of("Enrolled", "Completed", "Dropped")),
+], lookups={
+    "student": "SELECT studentID FROM tblStudent",
+    "course": "SELECT courseID, courseCode FROM tblCourse",
+}, complete=complete_grade)
 
 class CourseManager:
     def __init__(self, parent_frame, db_connection):
         self.parent = parent_frame
         self.db = db_connection
+        self.courses = entity_cache.courses(db_connection)  # Shared course records
+        self.summary = grade_summary.GradeSummary(db_connection)
         self.all_items_cache = []
         self.create_widgets()
     
@@ -38,8 +76,10 @@ class CourseManager:
                  bg="#e74c3c", fg="white", **btn_style).grid(row=0, column=2, padx=2)
         tk.Button(btn_frame, text="Sort ID", command=self.sort_by_id,
                  bg="#9b59b6", fg="white", **btn_style).grid(row=0, column=3, padx=2)
-        tk.Button(btn_frame, text="Refresh", command=self.load_all_courses,
+        tk.Button(btn_frame, text="Refresh", command=self.refresh,
                  bg="#3498db", fg="white", **btn_style).grid(row=0, column=4, padx=2)
+        tk.Button(btn_frame, text="Import CSV", command=self.import_csv,
+                 bg="#16a085", fg="white", **btn_style).grid(row=0, column=5, padx=2)
         
         # Search entry
         search_frame = tk.Frame(self.parent)
@@ -95,6 +135,10 @@ class CourseManager:
             self.tree.column(col, width=column_widths[col], minwidth=50)
             self.tree.heading(col, text=col, anchor="center")
         
+        # Click a heading to sort by that column
+        self.sorter = table_sort.TableSorter(self.tree, on_sorted=self.on_sorted,
+                                             command=self.sort_column)
+        
         self.tree.pack(fill="both", expand=True)
         self.tree.bind("<Double-1>", self.on_tree_double_click)
         
@@ -108,33 +152,23 @@ class CourseManager:
         self.status_label.pack(side="left", padx=10)
         
         # ========== LOAD INITIAL DATA ==========
+        self.loader = background_loader.BackgroundLoader(self.parent, self.db)
         self.load_all_courses()
     
     def load_all_courses(self):
-        """Load all courses into the Treeview"""
+        """Load all courses into the Treeview (query runs on a worker thread)"""
+        self.loader.cancel()
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         self.all_items_cache = []
+        self.sorter.clear()
         self.tree.selection_remove(self.tree.selection())
         
-        try:
-            query = """
-                SELECT courseID, courseCode, courseName, credits, 
-                    department, academicYear, description
-                FROM tblCourse
-                ORDER BY courseCode
-            """
-            rows = self.db.fetch_all(query)
-            
-            if not rows:
-                self.tree.insert("", "end", values=("No data", "", "", "", "", "", ""))
-                self.all_items_cache.append(self.tree.get_children()[-1])
-                self.update_status("No courses found")
-                return
-            
+        def produce():
+            rows = sorted(self.courses.all(), key=lambda r: r.courseCode or "")
             for row in rows:
-                item_id = self.tree.insert("", "end", values=(
+                yield (
                     row.courseID,
                     row.courseCode or "",
                     row.courseName or "",
@@ -142,14 +176,35 @@ class CourseManager:
                     row.department or "",
                     row.academicYear or "",
                     row.description or ""
-                ))
+                )
+        
+        def on_chunk(rows):
+            for values in rows:
+                item_id = self.tree.insert("", "end", values=values)
                 self.all_items_cache.append(item_id)
-            
-            self.update_status(f"Loaded {len(rows)} course(s)")
-            
-        except Exception as e:
+                self.sorter.add(item_id, values)
+            self.update_status(f"Loading courses... {len(self.all_items_cache)}")
+        
+        def on_done(total):
+            if not total:
+                self.tree.insert("", "end", values=("No data", "", "", "", "", "", ""))
+                self.all_items_cache.append(self.tree.get_children()[-1])
+                self.update_status("No courses found")
+                return
+            self.update_status(f"Loaded {total} course(s)")
+            self.sorter.resort()
+        
+        def on_error(e):
             messagebox.showerror("Database Error", f"Failed to load courses:\n{str(e)}")
             self.update_status("Error loading courses", error=True)
+        
+        self.update_status("Loading courses...")
+        self.loader.stream(produce, on_chunk, on_done, on_error)
+    
+    def refresh(self):
+        """Reload courses from the database, bypassing the cache"""
+        self.courses.invalidate()
+        self.load_all_courses()
     
     def update_status(self, message, error=False):
         """Update status bar"""
@@ -158,29 +213,23 @@ class CourseManager:
     
     def sort_by_id(self):
         """Sort courses by ID (small to big)"""
+        self.sort_column("ID")
+    
+    def sort_column(self, column, descending=False):
+        """Sort the table by a column"""
         try:
-            items_data = []
-            for item_id in self.all_items_cache:
-                values = self.tree.item(item_id)["values"]
-                if values and values[0] != "No data":
-                    try:
-                        course_id = int(values[0])
-                        items_data.append((course_id, item_id, values))
-                    except ValueError:
-                        pass
-            
-            items_data.sort(key=lambda x: x[0])
-            
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            for _, item_id, values in items_data:
-                self.tree.insert("", "end", values=values)
-            
-            self.update_status("Sorted by ID (ascending)")
+            if not self.sorter.values:  # nothing loaded
+                return
+            self.sorter.sort_by(column, descending)
+            direction = "descending" if descending else "ascending"
+            self.update_status(f"Sorted by {column} ({direction})")
         except Exception as e:
             messagebox.showerror("Sort Error", f"Failed to sort: {str(e)}")
     
+    def on_sorted(self, order):
+        """Keep the item list in the new sort order (search reattaches in this order)"""
+        self.all_items_cache = order
+    
     def on_search_change(self, *args):
         """Handle search as user types"""
         search_term = self.search_var.get().lower()
@@ -332,6 +381,7 @@ class CourseManager:
             )
             
             if self.db.execute_query(query, values):
+                self.courses.note_insert()
                 messagebox.showinfo("Success", "Course added successfully!")
                 self.update_status("Course added successfully")
             else:
@@ -375,7 +425,12 @@ class CourseManager:
                 course_id
             )
             
+            old = self.courses.get(course_id)
             if self.db.execute_query(query, values):
+                self.courses.refresh(course_id)
+                if old is None or old.credits != credits:
+                    # Student GPAs are weighted by credits - recompute them
+                    self.summary.rebuild()
                 messagebox.showinfo("Success", "Course updated successfully!")
                 self.update_status("Course updated successfully")
             else:
@@ -384,11 +439,36 @@ class CourseManager:
         except Exception as e:
             messagebox.showerror("Database Error", str(e))
     
+    def import_csv(self):
+        """Bulk-load courses from a CSV file (bad rows go to a rejects file)"""
+        path = filedialog.askopenfilename(title="Import Courses",
+                                          filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        
+        def work():
+            result = bulk_import.import_csv(self.db, COURSE_IMPORT_SPEC, path)
+            self.courses.note_insert()
+            return result
+        
+        def on_done(result):
+            messagebox.showinfo("Import Finished", result.summary())
+            self.load_all_courses()
+        
+        def on_error(e):
+            messagebox.showerror("Import Error", f"Failed to import courses:\n{str(e)}")
+            self.update_status("Import failed", error=True)
+        
+        self.update_status("Importing courses...")
+        self.loader.run(work, on_done, on_error)
+    
     def delete_course(self, course_id):
         """Delete a course"""
         try:
             query = "DELETE FROM tblCourse WHERE courseID=?"
             if self.db.execute_query(query, (course_id,)):
+                self.courses.invalidate(course_id)
+                self.summary.rebuild()  # its grades no longer count
                 messagebox.showinfo("Success", "Course deleted successfully!")
                 self.update_status("Course deleted successfully")
             else:
@@ -402,6 +482,7 @@ class GradeManager:
     def __init__(self, parent_frame, db_connection):
         self.parent = parent_frame
         self.db = db_connection
+        self.summary = grade_summary.GradeSummary(db_connection)  # Course / student GPA totals
         self.all_items_cache = []
         self.create_widgets()
     
@@ -435,6 +516,8 @@ class GradeManager:
                  bg="#9b59b6", fg="white", **btn_style).grid(row=0, column=3, padx=2)
         tk.Button(btn_frame, text="Refresh", command=self.load_all_grades,
                  bg="#3498db", fg="white", **btn_style).grid(row=0, column=4, padx=2)
+        tk.Button(btn_frame, text="Import CSV", command=self.import_csv,
+                 bg="#16a085", fg="white", **btn_style).grid(row=0, column=5, padx=2)
         
         # Search entry
         search_frame = tk.Frame(self.parent)
@@ -486,6 +569,10 @@ class GradeManager:
             self.tree.column(col, width=column_widths[col], minwidth=50)
             self.tree.heading(col, text=col, anchor="center")
         
+        # Click a heading to sort by that column
+        self.sorter = table_sort.TableSorter(self.tree, on_sorted=self.on_sorted,
+                                             command=self.sort_column)
+        
         self.tree.pack(fill="both", expand=True)
         self.tree.bind("<Double-1>", self.on_tree_double_click)
         
@@ -498,33 +585,28 @@ class GradeManager:
                                     bg="#ecf0f1", fg="#2c3e50")
         self.status_label.pack(side="left", padx=10)
         
+        self.loader = background_loader.BackgroundLoader(self.parent, self.db)
         self.load_all_grades()
     
     def load_all_grades(self):
-        """Load all grades into the Treeview"""
+        """Load all grades into the Treeview (query runs on a worker thread)"""
+        self.loader.cancel()
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         self.all_items_cache = []
+        self.sorter.clear()
         self.tree.selection_remove(self.tree.selection())
         
-        try:
+        def produce():
             query = """
                 SELECT gradeID, studentID, courseID, grade, gradePoints, 
                     semester, status
                 FROM tblGrade
                 ORDER BY studentID
             """
-            rows = self.db.fetch_all(query)
-            
-            if not rows:
-                self.tree.insert("", "end", values=("No data", "", "", "", "", "", ""))
-                self.all_items_cache.append(self.tree.get_children()[-1])
-                self.update_status("No grades found")
-                return
-            
-            for row in rows:
-                item_id = self.tree.insert("", "end", values=(
+            for row in self.db.iter_rows(query):
+                yield (
                     row.gradeID,
                     row.studentID or "",
                     row.courseID or "",
@@ -532,14 +614,30 @@ class GradeManager:
                     row.gradePoints or "",
                     row.semester or "",
                     row.status or ""
-                ))
+                )
+        
+        def on_chunk(rows):
+            for values in rows:
+                item_id = self.tree.insert("", "end", values=values)
                 self.all_items_cache.append(item_id)
-            
-            self.update_status(f"Loaded {len(rows)} grade(s)")
-            
-        except Exception as e:
+                self.sorter.add(item_id, values)
+            self.update_status(f"Loading grades... {len(self.all_items_cache)}")
+        
+        def on_done(total):
+            if not total:
+                self.tree.insert("", "end", values=("No data", "", "", "", "", "", ""))
+                self.all_items_cache.append(self.tree.get_children()[-1])
+                self.update_status("No grades found")
+                return
+            self.update_status(f"Loaded {total} grade(s)")
+            self.sorter.resort()
+        
+        def on_error(e):
             messagebox.showerror("Database Error", f"Failed to load grades:\n{str(e)}")
             self.update_status("Error loading grades", error=True)
+        
+        self.update_status("Loading grades...")
+        self.loader.stream(produce, on_chunk, on_done, on_error)
     
     def update_status(self, message, error=False):
         color = "#e74c3c" if error else "#27ae60"
@@ -547,29 +645,23 @@ class GradeManager:
     
     def sort_by_id(self):
         """Sort grades by ID (small to big)"""
+        self.sort_column("ID")
+    
+    def sort_column(self, column, descending=False):
+        """Sort the table by a column"""
         try:
-            items_data = []
-            for item_id in self.all_items_cache:
-                values = self.tree.item(item_id)["values"]
-                if values and values[0] != "No data":
-                    try:
-                        grade_id = int(values[0])
-                        items_data.append((grade_id, item_id, values))
-                    except ValueError:
-                        pass
-            
-            items_data.sort(key=lambda x: x[0])
-            
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            for _, item_id, values in items_data:
-                self.tree.insert("", "end", values=values)
-            
-            self.update_status("Sorted by ID (ascending)")
+            if not self.sorter.values:  # nothing loaded
+                return
+            self.sorter.sort_by(column, descending)
+            direction = "descending" if descending else "ascending"
+            self.update_status(f"Sorted by {column} ({direction})")
         except Exception as e:
             messagebox.showerror("Sort Error", f"Failed to sort: {str(e)}")
     
+    def on_sorted(self, order):
+        """Keep the item list in the new sort order (search reattaches in this order)"""
+        self.all_items_cache = order
+    
     def on_search_change(self, *args):
         search_term = self.search_var.get().lower()
         
@@ -642,11 +734,11 @@ class GradeManager:
         
         # Load students and courses for dropdowns
         try:
-            students = self.db.fetch_all("SELECT studentID, firstName, lastName FROM tblStudent ORDER BY lastName")
-            student_options = [f"{s[0]} - {s[1]} {s[2]}" for s in students]
+            students = sorted(entity_cache.students(self.db).all(), key=lambda s: s.lastName or "")
+            student_options = [f"{s.studentID} - {s.firstName} {s.lastName}" for s in students]
             
-            courses = self.db.fetch_all("SELECT courseID, courseCode, courseName FROM tblCourse ORDER BY courseCode")
-            course_options = [f"{c[0]} - {c[1]} {c[2]}" for c in courses]
+            courses = sorted(entity_cache.courses(self.db).all(), key=lambda c: c.courseCode or "")
+            course_options = [f"{c.courseID} - {c.courseCode} {c.courseName}" for c in courses]
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load students/courses:\n{str(e)}")
             form_window.destroy()
@@ -750,7 +842,13 @@ class GradeManager:
                 entries["status"].get().strip()
             )
             
-            if self.db.execute_query(query, values):
+            # The summary tables change in the same transaction as the grade
+            with self.db.transaction():
+                saved = self.db.execute_query(query, values)
+                if saved:
+                    self.summary.changed(None, (student_id, course_id, values[2]))
+            
+            if saved:
                 messagebox.showinfo("Success", "Grade added successfully!")
                 self.update_status("Grade added successfully")
             else:
@@ -785,7 +883,13 @@ class GradeManager:
                 grade_id
             )
             
-            if self.db.execute_query(query, values):
+            with self.db.transaction():
+                old = self.summary.grade_row(grade_id)
+                saved = self.db.execute_query(query, values)
+                if saved:
+                    self.summary.changed(old, (student_id, course_id, values[2]))
+            
+            if saved:
                 messagebox.showinfo("Success", "Grade updated successfully!")
                 self.update_status("Grade updated successfully")
             else:
@@ -794,10 +898,41 @@ class GradeManager:
         except Exception as e:
             messagebox.showerror("Database Error", str(e))
     
+    def import_csv(self):
+        """Bulk-load grades from a CSV file (bad rows go to a rejects file)"""
+        path = filedialog.askopenfilename(title="Import Grades",
+                                          filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        
+        def work():
+            result = bulk_import.import_csv(self.db, GRADE_IMPORT_SPEC, path)
+            if result.imported:
+                # One set-based pass instead of a summary update per row
+                self.summary.rebuild()
+            return result
+        
+        def on_done(result):
+            messagebox.showinfo("Import Finished", result.summary())
+            self.load_all_grades()
+        
+        def on_error(e):
+            messagebox.showerror("Import Error", f"Failed to import grades:\n{str(e)}")
+            self.update_status("Import failed", error=True)
+        
+        self.update_status("Importing grades...")
+        self.loader.run(work, on_done, on_error)
+    
     def delete_grade(self, grade_id):
         try:
             query = "DELETE FROM tblGrade WHERE gradeID=?"
-            if self.db.execute_query(query, (grade_id,)):
+            with self.db.transaction():
+                old = self.summary.grade_row(grade_id)
+                saved = self.db.execute_query(query, (grade_id,))
+                if saved:
+                    self.summary.changed(old, None)
+            
+            if saved:
                 messagebox.showinfo("Success", "Grade deleted successfully!")
                 self.update_status("Grade deleted successfully")
             else:
@@ -0,0 +1,58 @@
+import threading
+import time
+import weakref
+
+STATUS_QUERY = "SELECT status, COUNT(*) AS studentCount FROM tblStudent GROUP BY status"
+
+
+class DashboardSnapshot:
+    """Student counters for the reports dashboard, from one query, cached briefly"""
+    def __init__(self, db, ttl=60):
+        """
+        :param db: DatabaseConnection used to load the counters
+        :param ttl: Seconds before the counters are reloaded
+        """
+        self.db = db
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = None
+        self._loaded_at = 0
+
+    def get(self):
+        """
+        Counters as a dict: total, active, inactive and by_status
+        (list of (status, count)); loads them when stale or invalidated
+        """
+        with self._lock:
+            if self._data is None or time.monotonic() - self._loaded_at > self.ttl:
+                self._data = self._load()
+                self._loaded_at = time.monotonic()
+            return self._data
+
+    def invalidate(self):
+        """Students were written - reload on next use"""
+        with self._lock:
+            self._data = None
+
+    def _load(self):
+        # One GROUP BY gives every counter (the totals are sums of the groups)
+        by_status = [(row[0], row[1]) for row in self.db.fetch_all(STATUS_QUERY)]
+        counts = {status: count for status, count in by_status}
+        return {
+            "total": sum(counts.values()),
+            "active": counts.get("Active", 0),
+            "inactive": counts.get("Inactive", 0),
+            "by_status": by_status,
+        }
+
+
+# One snapshot per database connection, shared by main and StudentManager
+_snapshots = weakref.WeakKeyDictionary()
+_snapshots_lock = threading.Lock()
+
+def snapshot(db):
+    """Shared dashboard snapshot for this database connection"""
+    with _snapshots_lock:
+        if db not in _snapshots:
+            _snapshots[db] = DashboardSnapshot(db)
+        return _snapshots[db]
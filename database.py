@@ -1,14 +1,62 @@
-import pyodbc
 from datetime import date, datetime
+import itertools
+import gpa_engine
+import storage
+
+# Tables for backends that manage their own schema (SQLite)
+SQLITE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS tblStudent (
+        studentID INTEGER PRIMARY KEY AUTOINCREMENT,
+        firstName TEXT NOT NULL,
+        lastName TEXT NOT NULL,
+        gender TEXT,
+        dateOfbirth DATE,
+        contact TEXT,
+        address TEXT,
+        major TEXT,
+        status TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS tblCourse (
+        courseID INTEGER PRIMARY KEY AUTOINCREMENT,
+        courseCode TEXT NOT NULL,
+        courseName TEXT NOT NULL,
+        credits INTEGER,
+        department TEXT,
+        description TEXT,
+        academicYear TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS tblGrade (
+        gradeID INTEGER PRIMARY KEY AUTOINCREMENT,
+        studentID INTEGER NOT NULL,
+        courseID INTEGER NOT NULL,
+        grade TEXT,
+        gradePoints REAL,
+        semester TEXT,
+        enrollmentDate DATETIME,
+        completionDate DATETIME,
+        status TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS tblUsers (
+        userID INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL,
+        fullName TEXT,
+        email TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS idxStudentName ON tblStudent (lastName, firstName)",
+    "CREATE INDEX IF NOT EXISTS idxGradeStudent ON tblGrade (studentID)",
+    "CREATE INDEX IF NOT EXISTS idxGradeCourse ON tblGrade (courseID)",
+]
 
 class DatabaseConnection:
     def setup_users_table(self):
-        """Create Users table if it doesn't exist"""
+        """Create Users table if it doesn't exist and seed the default accounts into an empty one"""
         try:
             # Check if table exists using a different approach
+            # (SQLite creates it with SQLITE_SCHEMA, so it is seeded while still empty)
             try:
                 self.cursor.execute("SELECT * FROM tblUsers WHERE 1=0")
-                return
             except:
                 self.cursor.execute("""
                     CREATE TABLE tblUsers (
@@ -20,53 +68,92 @@ class DatabaseConnection:
                         email TEXT(100)
                     )
                 """)
+            
+            self.cursor.execute("SELECT COUNT(*) FROM tblUsers")
+            if self.cursor.fetchone()[0]:
+                return
+            
+            # Default users
+            import hashlib
+            default_users = [
+                ('admin', hashlib.sha256('admin123'.encode()).hexdigest(), 'Administrator', 'System Admin'),
+                ('teacher', hashlib.sha256('teacher123'.encode()).hexdigest(), 'Teacher', 'John Doe'),
+                ('student', hashlib.sha256('student123'.encode()).hexdigest(), 'Student', 'Jane Smith')
+            ]
+            
+            for user in default_users:
+                self.cursor.execute("""
+                    INSERT INTO tblUsers (username, password_hash, role, fullName)
+                    VALUES (?, ?, ?, ?)
+                """, user)
+            
+            self.conn.commit()
+            print("Users table created with default accounts")
                 
-                # Default users
-                import hashlib
-                default_users = [
-                    ('admin', hashlib.sha256('admin123'.encode()).hexdigest(), 'Administrator', 'System Admin'),
-                    ('teacher', hashlib.sha256('teacher123'.encode()).hexdigest(), 'Teacher', 'John Doe'),
-                    ('student', hashlib.sha256('student123'.encode()).hexdigest(), 'Student', 'Jane Smith')
-                ]
-                
-                for user in default_users:
-                    self.cursor.execute("""
-                        INSERT INTO tblUsers (username, password_hash, role, fullName)
-                        VALUES (?, ?, ?, ?)
-                    """, user)
+        except Exception as e:
+            print(f"Note: Could not setup users table: {e}")
+            print("This is OK - the table may already exist or permissions may be restricted")
+    def setup_grade_points_table(self):
+        """Create the letter grade -> grade points lookup table if it doesn't exist"""
+        try:
+            try:
+                self.cursor.execute("SELECT * FROM tblGradePoints WHERE 1=0")
+                return
+            except:
+                self.cursor.execute("""
+                    CREATE TABLE tblGradePoints (
+                        grade TEXT(2) PRIMARY KEY,
+                        points DOUBLE NOT NULL
+                    )
+                """)
+                for grade, points in gpa_engine.GRADE_POINTS.items():
+                    self.cursor.execute(
+                        "INSERT INTO tblGradePoints (grade, points) VALUES (?, ?)",
+                        (grade, points))
                 
                 self.conn.commit()
-                print("Users table created with default accounts")
+                print("Grade points table created")
                 
         except Exception as e:
-            print(f"Note: Could not setup users table: {e}")
-            print("This is OK - the table may already exist or permissions may be restricted")
-    def __init__(self, db_path=None):
-        if db_path is None:
-            # Default path
-            self.db_path = r"D:\Documents\DBMS\Assignment-Python.accdb"
-        else:
-            self.db_path = db_path
-            
-        self.conn_string = (
-            r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
-            f"DBQ={self.db_path};"
-        )
-        self.conn = None
-        self.cursor = None
+            print(f"Note: Could not setup grade points table: {e}")
+    def __init__(self, db_path=None, backend=None, pool_size=4):
+        """
+        Initialize database connection
+        :param db_path: Database file (default depends on the backend)
+        :param backend: "access" or "sqlite" (default: $GRADE_DB_BACKEND, then "access")
+        :param pool_size: Maximum number of connections shared by all threads
+        """
+        self.backend = storage.get_backend(backend, db_path, schema=SQLITE_SCHEMA)
+        self.db_path = self.backend.db_path
+        self.pool_size = pool_size
+        self.pool = None
+        self._writes = itertools.count(1)
+        self.data_version = 0  # changes after every write (report caches key on it)
         self.connect()
     
     def connect(self):
-        """Establish connection"""
+        """Open the connection pool and make sure the schema exists"""
         try:
-            self.conn = pyodbc.connect(self.conn_string)
-            self.cursor = self.conn.cursor()
-            print("Database connected successfully.")
+            pool = storage.ConnectionPool(self.backend, size=self.pool_size)
+            with pool.connection() as conn:
+                self.backend.setup(conn)
+            self.pool = pool
+            print(f"Database connected successfully ({self.backend.name}).")
             return True
         except Exception as e:
             print(f"Connection failed: {e}")
             return False
     
+    @property
+    def conn(self):
+        """Connection pinned to the calling thread (None when not connected)"""
+        return self.pool.pin() if self.pool else None
+    
+    @property
+    def cursor(self):
+        """Cursor owned by the calling thread (None when not connected)"""
+        return self.pool.thread_cursor() if self.pool else None
+    
     def format_date(self, d):
         """Format date for display"""
         if isinstance(d, (date, datetime)):
@@ -75,45 +162,154 @@ class DatabaseConnection:
     
     def execute_query(self, query, params=None):
         """Execute a query and commit"""
+        def work(conn):
+            cursor = conn.statements.cursor(query)
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                # Inside transaction() the commit happens once at the end
+                if not self.pool.in_transaction():
+                    conn.commit()
+            except Exception:
+                conn.statements.discard(query)
+                if not self.pool.in_transaction():
+                    conn.rollback()
+                raise
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            self.conn.commit()
+            self.pool.run(work)
+            self.note_write()
             return True
         except Exception as e:
             print(f"Query error: {e}")
             return False
     
+    def execute_many(self, query, rows, batch_size=1000):
+        """
+        Execute one statement for many parameter rows with executemany,
+        committing once per batch. Rows that fail are reported in the
+        returned BatchResult instead of aborting the load.
+        """
+        result = storage.BatchResult()
+        in_transaction = self.pool.in_transaction()
+        try:
+            with self.pool.lease() as conn:
+                for number, chunk in enumerate(storage.chunked(rows, batch_size)):
+                    storage.write_batch(conn, query, chunk, number * batch_size, result,
+                                        commit=not in_transaction,
+                                        fast=self.backend.fast_executemany)
+        except Exception as e:
+            print(f"Batch error: {e}")
+            if in_transaction:
+                raise
+        finally:
+            if result.succeeded:
+                self.note_write()
+        return result
+    
+    def note_write(self):
+        """Bump data_version (cached report results become stale)"""
+        self.data_version = next(self._writes)
+    
+    def transaction(self):
+        """
+        Group several statements into one commit:
+            with db.transaction():
+                db.execute_query(...)
+                db.execute_query(...)
+        Everything is rolled back if the block raises.
+        """
+        return self.pool.transaction()
+    
     def fetch_one(self, query, params=None):
         """Fetch single row"""
+        def work(conn):
+            cursor = conn.statements.cursor(query)
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                row = cursor.fetchone()
+                # Finish the statement so the cached cursor holds no open read
+                cursor.fetchall()
+                return row
+            except Exception:
+                conn.statements.discard(query)
+                raise
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            return self.cursor.fetchone()
+            return self.pool.run(work)
         except Exception as e:
             print(f"Fetch error: {e}")
             return None
     
     def fetch_all(self, query, params=None):
         """Fetch all rows"""
+        def work(conn):
+            cursor = conn.statements.cursor(query)
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                return cursor.fetchall()
+            except Exception:
+                conn.statements.discard(query)
+                raise
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            return self.cursor.fetchall()
+            return self.pool.run(work)
         except Exception as e:
             print(f"Fetch error: {e}")
             return []
     
+    def iter_rows(self, query, params=None, batch_size=500, describe=None):
+        """
+        Stream rows with fetchmany instead of loading the whole result:
+            for row in db.iter_rows("SELECT ..."):
+        The generator holds a pooled connection until it is exhausted or closed.
+        Errors are raised to the caller (the connection is released first).
+        :param describe: Optional function called with cursor.description
+                         once the query has run (also when it returns no rows)
+        """
+        lease = self.pool.lease() if self.pool.in_transaction() else self.pool.connection()
+        with lease as conn:
+            cursor = conn.cursor()
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                if describe:
+                    describe(cursor.description)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+    
+    def top_n(self, query, n):
+        """
+        Limit a SELECT to n rows in this backend's dialect (TOP n / LIMIT n).
+        End the query with an ORDER BY on a unique column: Access returns
+        every row tied with the last one.
+        """
+        return self.backend.top_n(query, n)
+    
+    def statement_stats(self, limit=10):
+        """Busiest statements as (sql, cache hits, cache misses)"""
+        return self.pool.statement_stats.top(limit) if self.pool else []
+    
+    def release(self):
+        """Return the calling thread's connection to the pool (call when a worker thread finishes)"""
+        if self.pool:
+            self.pool.unpin()
+    
     def close(self):
         """Close connection"""
-        if self.cursor:
-            self.cursor.close()
-        if self.conn:
-            self.conn.close()
+        if self.pool:
+            self.pool.close()
+            self.pool = None
         print("Database connection closed.")
@@ -0,0 +1,145 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+STUDENT_QUERY = """
+    SELECT studentID, firstName, lastName, gender, dateOfbirth,
+           contact, address, major, status
+    FROM tblStudent
+"""
+
+COURSE_QUERY = """
+    SELECT courseID, courseCode, courseName, credits,
+           department, academicYear, description
+    FROM tblCourse
+"""
+
+
+class EntityCache:
+    """Read-through cache of table rows keyed by their primary key"""
+    def __init__(self, db, query, key, ttl=300, max_size=100000):
+        """
+        :param db: DatabaseConnection used to load rows
+        :param query: SELECT ... FROM <table> without WHERE/ORDER BY
+        :param key: Primary key column (integer, auto-increment)
+        :param ttl: Seconds before cached rows are reloaded
+        :param max_size: Maximum rows kept in memory
+        """
+        self.db = db
+        self.query = query
+        self.key = key
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.RLock()
+        self._rows = OrderedDict()  # key -> (row, loaded_at), least recently used first
+        self._ordered = None        # rows sorted by key, rebuilt after changes
+        self._complete = False      # True when _rows holds the whole table
+        self._loaded_at = 0
+        self._new_rows = False      # rows were inserted since the last load
+
+    def all(self):
+        """Every row of the table, ordered by key"""
+        with self._lock:
+            if not self._complete or time.monotonic() - self._loaded_at > self.ttl:
+                return self._load_all()
+            if self._new_rows:
+                self._load_new()
+            if self._ordered is None:
+                self._ordered = [self._rows[k][0] for k in sorted(self._rows)]
+            return self._ordered
+
+    def get(self, key):
+        """One row by key (None if it does not exist)"""
+        key = self._normalize(key)
+        with self._lock:
+            entry = self._rows.get(key)
+            if entry and time.monotonic() - entry[1] <= self.ttl:
+                self._rows.move_to_end(key)
+                return entry[0]
+        return self.refresh(key)
+
+    def refresh(self, key):
+        """Reload one row after it was updated"""
+        key = self._normalize(key)
+        row = self.db.fetch_one(f"{self.query} WHERE {self.key} = ?", (key,))
+        with self._lock:
+            if row is None:
+                self._rows.pop(key, None)
+            else:
+                self._store(key, row)
+            self._ordered = None
+        return row
+
+    def note_insert(self):
+        """A row was inserted - fetch rows above the highest cached key on next use"""
+        with self._lock:
+            self._new_rows = True
+
+    def invalidate(self, key=None):
+        """Drop one row (after a delete) or everything (key=None)"""
+        with self._lock:
+            if key is None:
+                self._rows.clear()
+                self._complete = False
+            else:
+                self._rows.pop(self._normalize(key), None)
+            self._ordered = None
+
+    def _load_all(self):
+        rows = self.db.fetch_all(f"{self.query} ORDER BY {self.key}")
+        self._rows.clear()
+        self._new_rows = False
+        if len(rows) > self.max_size:
+            # Too big to hold - serve straight from the database
+            self._complete = False
+            self._ordered = None
+            return rows
+        now = time.monotonic()
+        for row in rows:
+            self._rows[getattr(row, self.key)] = (row, now)
+        self._ordered = list(rows)
+        self._complete = True
+        self._loaded_at = now
+        return self._ordered
+
+    def _load_new(self):
+        highest = max(self._rows) if self._rows else 0
+        rows = self.db.fetch_all(
+            f"{self.query} WHERE {self.key} > ? ORDER BY {self.key}", (highest,))
+        for row in rows:
+            self._store(getattr(row, self.key), row)
+        self._new_rows = False
+        self._ordered = None
+
+    def _store(self, key, row):
+        self._rows[key] = (row, time.monotonic())
+        self._rows.move_to_end(key)
+        while len(self._rows) > self.max_size:
+            self._rows.popitem(last=False)
+            self._complete = False
+
+    def _normalize(self, key):
+        if isinstance(key, str) and key.strip().isdigit():
+            return int(key)
+        return key
+
+
+# One cache per table per database connection, shared by every manager
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+def _shared(db, name, query, key):
+    with _caches_lock:
+        caches = _caches.setdefault(db, {})
+        if name not in caches:
+            caches[name] = EntityCache(db, query, key)
+        return caches[name]
+
+def students(db):
+    """Shared student cache for this database connection"""
+    return _shared(db, "student", STUDENT_QUERY, "studentID")
+
+def courses(db):
+    """Shared course cache for this database connection"""
+    return _shared(db, "course", COURSE_QUERY, "courseID")
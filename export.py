@@ -0,0 +1,252 @@
+import csv
+import gzip
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Only Parquet export needs pyarrow
+    pa = None
+    pq = None
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+
+def format_for(path):
+    """(format, gzip) from a file name such as grades.csv.gz or grades.parquet"""
+    name = path.lower()
+    compress = name.endswith(".gz")
+    if compress:
+        name = name[:-3]
+    for fmt in FORMATS:
+        if name.endswith("." + fmt):
+            return fmt, compress
+    if name.endswith(".json"):
+        return "jsonl", compress
+    raise ValueError(f"Unknown export format for {path} (use .csv, .jsonl or .parquet, optionally .gz)")
+
+
+def column_names(row):
+    """Column names of a record (namedtuple) or pyodbc row"""
+    if hasattr(row, "_fields"):
+        return list(row._fields)
+    return [c[0] for c in row.cursor_description]
+
+
+def export_query(db, query, path, params=None, fmt=None, compress=None, chunk_size=5000):
+    """
+    Stream the rows of a query into a file without holding them in memory
+    :param db: DatabaseConnection (rows are read with iter_rows)
+    :param path: Output file; the format is taken from its extension unless given
+    :param fmt: "csv", "jsonl" or "parquet"
+    :param compress: gzip the output (Parquet uses gzip column compression instead)
+    :param chunk_size: Rows fetched and written per batch
+    :return: Number of rows written
+    """
+    description = []  # filled by iter_rows once the query has run
+    rows = db.iter_rows(query, params, batch_size=chunk_size, describe=description.extend)
+    return write_rows(rows, path, fmt, compress, chunk_size, description)
+
+
+def write_rows(rows, path, fmt=None, compress=None, chunk_size=5000, description=None):
+    """
+    Write an iterable of records to CSV / JSON Lines / Parquet; returns the row count
+    :param description: Cursor description ((name, type code, ...) per column) for
+                        the CSV header and Parquet schema when there are no rows;
+                        only read once the rows are exhausted
+    """
+    if fmt is None or compress is None:
+        detected, gz = format_for(path)
+        fmt = fmt or detected
+        compress = gz if compress is None else compress
+    if fmt == "csv":
+        return _write_csv(rows, path, compress, description)
+    if fmt == "jsonl":
+        return _write_jsonl(rows, path, compress)
+    if fmt == "parquet":
+        return _write_parquet(rows, path, compress, chunk_size, description)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def _open_text(path, compress):
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+# ========== CSV / JSON LINES ==========
+
+def _write_csv(rows, path, compress, description):
+    count = 0
+    with _open_text(path, compress) as f:
+        writer = csv.writer(f)
+        for row in rows:
+            if count == 0:
+                writer.writerow(column_names(row))
+            writer.writerow(["" if v is None else v for v in row])
+            count += 1
+        if count == 0 and description:
+            writer.writerow([c[0] for c in description])  # header only
+    return count
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def _write_jsonl(rows, path, compress):
+    count = 0
+    columns = None
+    with _open_text(path, compress) as f:
+        for row in rows:
+            if columns is None:
+                columns = column_names(row)
+            f.write(json.dumps(dict(zip(columns, row)), default=_json_value))
+            f.write("\n")
+            count += 1
+    return count
+
+
+# ========== PARQUET ==========
+
+def _arrow_type(values):
+    """Column type from the first chunk's values (text when types are mixed)"""
+    kinds = {type(v) for v in values if v is not None}
+    if kinds == {bool}:
+        return pa.bool_()
+    if kinds and kinds <= {int}:
+        return pa.int64()
+    if kinds and kinds <= {int, float, Decimal}:
+        return pa.float64()
+    if kinds == {datetime}:
+        return pa.timestamp("us")
+    if kinds == {date}:
+        return pa.date32()
+    if kinds == {bytes}:
+        return pa.binary()
+    return pa.string()
+
+
+# Column type from a cursor description's type code (pyodbc reports Python
+# types; SQLite reports None, which is exported as text)
+_DESCRIPTION_TYPES = {bool: "bool_", int: "int64", float: "float64", Decimal: "float64",
+                      datetime: "timestamp", date: "date32", bytes: "binary",
+                      bytearray: "binary", str: "string"}
+
+
+def _description_type(type_code):
+    name = _DESCRIPTION_TYPES.get(type_code, "string")
+    return pa.timestamp("us") if name == "timestamp" else getattr(pa, name)()
+
+
+def _widen(schema, data):
+    """
+    schema with int64 columns changed to float64 where data (one chunk's
+    column values) holds a float - never truncate 3.7 to 3
+    """
+    for i, (field, values) in enumerate(zip(schema, data)):
+        if field.type == pa.int64() and any(isinstance(v, (float, Decimal)) for v in values):
+            schema = schema.set(i, pa.field(field.name, pa.float64()))
+    return schema
+
+
+def _rewrite(path, schema, compression):
+    """
+    Copy the Parquet file written so far into a new writer with a widened
+    schema, one row group at a time; returns the new (open) writer
+    """
+    old_path = path + ".tmp"
+    os.replace(path, old_path)
+    writer = pq.ParquetWriter(path, schema, compression=compression)
+    try:
+        old = pq.ParquetFile(old_path)
+        for group in range(old.num_row_groups):
+            writer.write_table(old.read_row_group(group).cast(schema))
+        old.close()
+    except BaseException:
+        writer.close()
+        raise
+    os.remove(old_path)
+    return writer
+
+
+def _coerce(value, kind):
+    # Make later chunks fit the schema chosen from the first one
+    if value is None:
+        return None
+    if kind == pa.string():
+        return value.isoformat() if isinstance(value, (date, datetime)) else str(value)
+    if kind == pa.float64():
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if kind == pa.int64():
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if kind == pa.date32() and not isinstance(value, date):
+        return None
+    if kind == pa.timestamp("us") and not isinstance(value, datetime):
+        return None
+    return value
+
+
+def _write_parquet(rows, path, compress, chunk_size, description):
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed - Parquet export is unavailable")
+    compression = "gzip" if compress else "snappy"
+    writer = None
+    count = 0
+    columns = None
+    schema = None
+    chunk = []
+
+    def flush():
+        nonlocal writer, schema
+        data = list(zip(*chunk))
+        if schema is None:
+            schema = pa.schema([(name, _arrow_type(values)) for name, values in zip(columns, data)])
+        widened = _widen(schema, data)
+        if not widened.equals(schema):
+            # A float in a column typed int64 from the earlier rows
+            schema = widened
+            if writer is not None:
+                writer.close()
+                writer = None
+                writer = _rewrite(path, schema, compression)
+        if writer is None:
+            writer = pq.ParquetWriter(path, schema, compression=compression)
+        arrays = [pa.array([_coerce(v, field.type) for v in values], type=field.type)
+                  for field, values in zip(schema, data)]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    try:
+        for row in rows:
+            if columns is None:
+                columns = column_names(row)
+            chunk.append(tuple(row))
+            count += 1
+            if len(chunk) >= chunk_size:
+                flush()
+                chunk = []
+        if chunk:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        # No rows: still a readable file, with the query's columns if known
+        schema = pa.schema([(c[0], _description_type(c[1])) for c in description or ()])
+        pq.write_table(schema.empty_table(), path, compression=compression)
+    return count
@@ -0,0 +1,136 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback below
+    np = None
+
+# Letter grade -> grade points (4.0 scale)
+GRADE_POINTS = {
+    'A': 4.0, 'A-': 3.7, 'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7, 'D+': 1.3, 'D': 1.0,
+    'F': 0.0
+}
+
+
+def grade_points(grade):
+    """Grade points for one letter grade (0.0 when unknown)"""
+    return GRADE_POINTS.get(str(grade).strip().upper(), 0.0)
+
+
+class Columns:
+    """Column buffers (key, points, weight) filled from a row stream"""
+    def __init__(self):
+        self.keys = array("q")
+        self.points = array("d")
+        self.weights = array("d")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def append(self, key, value, weight):
+        self.keys.append(key)
+        self.points.append(float(value or 0))
+        self.weights.append(float(weight or 0))
+
+    def extend(self, rows):
+        """Append (key, points, weight) tuples; None points/weights count as 0"""
+        keys, points, weights = self.keys, self.points, self.weights
+        for key, value, weight in rows:
+            keys.append(key)
+            points.append(float(value or 0))
+            weights.append(float(weight or 0))
+        return self
+
+
+class GPAResult:
+    """Per-key GPA (weighted mean of grade points), total weight and row count"""
+    def __init__(self, keys, gpa, weight, count):
+        self.keys = keys
+        self.gpa = gpa
+        self.weight = weight
+        self.count = count
+        self._index = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get(self, key):
+        """(gpa, weight, count) for one key, or None"""
+        if self._index is None:
+            self._index = {int(k): i for i, k in enumerate(self.keys)}
+        i = self._index.get(key)
+        if i is None:
+            return None
+        return float(self.gpa[i]), float(self.weight[i]), int(self.count[i])
+
+    def top(self, n):
+        """n best (key, gpa, count), highest GPA first"""
+        if n <= 0:
+            return []
+        if np is not None:
+            graded = np.flatnonzero(self.weight > 0)
+            if len(graded) > n:
+                # Partial selection, then sort only the n winners
+                graded = graded[np.argpartition(-self.gpa[graded], n - 1)[:n]]
+            order = graded[np.argsort(-self.gpa[graded], kind="stable")]
+        else:
+            order = sorted((i for i in range(len(self.keys)) if self.weight[i] > 0),
+                           key=lambda i: -self.gpa[i])[:n]
+        return self._rows(order)
+
+    def below(self, threshold):
+        """(key, gpa, count) with GPA under threshold, lowest first"""
+        if np is not None:
+            hits = np.flatnonzero((self.weight > 0) & (self.gpa < threshold))
+            order = hits[np.argsort(self.gpa[hits], kind="stable")]
+        else:
+            order = sorted((i for i in range(len(self.keys))
+                            if self.weight[i] > 0 and self.gpa[i] < threshold),
+                           key=lambda i: self.gpa[i])
+        return self._rows(order)
+
+    def _rows(self, order):
+        return [(int(self.keys[i]), float(self.gpa[i]), int(self.count[i])) for i in order]
+
+
+def compute(columns):
+    """GPA for every key in the columns at once"""
+    if np is None:
+        return _compute_python(columns)
+    keys = np.frombuffer(columns.keys, dtype=np.int64) if len(columns) else np.zeros(0, np.int64)
+    points = np.frombuffer(columns.points, dtype=float) if len(columns) else np.zeros(0)
+    weights = np.frombuffer(columns.weights, dtype=float) if len(columns) else np.zeros(0)
+
+    unique, group = np.unique(keys, return_inverse=True)
+    size = len(unique)
+    weight = np.bincount(group, weights=weights, minlength=size)
+    total = np.bincount(group, weights=points * weights, minlength=size)
+    count = np.bincount(group, minlength=size)
+    gpa = np.divide(total, weight, out=np.zeros(size), where=weight > 0)
+    return GPAResult(unique, gpa, weight, count)
+
+
+def _compute_python(columns):
+    sums = {}
+    for key, value, weight in zip(columns.keys, columns.points, columns.weights):
+        entry = sums.get(key)
+        if entry is None:
+            entry = sums[key] = [0.0, 0.0, 0]
+        entry[0] += value * weight
+        entry[1] += weight
+        entry[2] += 1
+    keys = sorted(sums)
+    weight = [sums[k][1] for k in keys]
+    gpa = [sums[k][0] / sums[k][1] if sums[k][1] else 0.0 for k in keys]
+    count = [sums[k][2] for k in keys]
+    return GPAResult(keys, gpa, weight, count)
+
+
+def student_gpas(rows):
+    """
+    GPA of every student from (studentID, grade points, credits) rows:
+        result = student_gpas(db.iter_rows("SELECT studentID, gpa, credit ..."))
+        result.top(10)
+    """
+    return compute(Columns().extend(rows))
@@ -54,6 +54,11 @@ def create_database_tables():
         """)
         print("Created tblGrade")
         
+        # Index the foreign keys used by every grade lookup and report join
+        cursor.execute("CREATE INDEX idxGradeStudent ON tblGrade (studentID)")
+        cursor.execute("CREATE INDEX idxGradeCourse ON tblGrade (courseID)")
+        print("Created tblGrade indexes")
+        
         # ===== ADD SAMPLE COURSES =====
         sample_courses = [
             ("CS101", "Introduction to Programming", 3, "Computer Science"),
@@ -68,11 +73,11 @@ def create_database_tables():
             ("ART101", "Art Appreciation", 3, "Arts")
         ]
         
-        for course in sample_courses:
-            cursor.execute("""
-                INSERT INTO tblCourse (courseCode, courseName, credits, department)
-                VALUES (?, ?, ?, ?)
-            """, course)
+        # One prepared statement for all rows, committed once below
+        cursor.executemany("""
+            INSERT INTO tblCourse (courseCode, courseName, credits, department)
+            VALUES (?, ?, ?, ?)
+        """, sample_courses)
         print(f"Added {len(sample_courses)} sample courses")
         
         conn.commit()
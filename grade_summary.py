@@ -0,0 +1,147 @@
+import entity_cache
+import gpa_engine
+
+# Summary tables kept up to date by every grade write, so the course
+# statistics and at-risk reports read one row per course / student instead
+# of scanning tblGrade
+COURSE_STATS_TABLE = """
+    CREATE TABLE tblCourseStats (
+        courseID INTEGER PRIMARY KEY,
+        gradeCount INTEGER NOT NULL,
+        pointsSum DOUBLE NOT NULL,
+        pointsSquares DOUBLE NOT NULL
+    )
+"""
+
+STUDENT_GPA_TABLE = """
+    CREATE TABLE tblStudentGPA (
+        studentID INTEGER PRIMARY KEY,
+        courseCount INTEGER NOT NULL,
+        credits DOUBLE,
+        weightedPoints DOUBLE,
+        gpa DOUBLE
+    )
+"""
+
+STUDENT_GPA_INDEX = "CREATE INDEX idxStudentGPA ON tblStudentGPA (gpa)"
+
+# Points of a grade joined to tblGradePoints as p: 0 when it has no entry
+# (IIf rather than COALESCE, which Access lacks)
+POINTS = "IIf(p.points IS NULL, 0, p.points)"
+
+
+class GradeSummary:
+    """
+    Incrementally maintained per-course and per-student grade totals.
+    Every grade is counted; one without an entry in gpa_engine.GRADE_POINTS
+    (or none at all) scores 0 points. The student GPA is weighted by course
+    credits.
+    """
+    def __init__(self, db):
+        """
+        :param db: DatabaseConnection (GUI schema)
+        """
+        self.db = db
+
+    def setup(self):
+        """Create the summary tables if they don't exist (and fill them)"""
+        try:
+            try:
+                self.db.cursor.execute("SELECT * FROM tblStudentGPA WHERE 1=0")
+                return
+            except:
+                self.db.cursor.execute(COURSE_STATS_TABLE)
+                self.db.cursor.execute(STUDENT_GPA_TABLE)
+                self.db.cursor.execute(STUDENT_GPA_INDEX)
+                self.db.conn.commit()
+                self.rebuild()
+                print("Grade summary tables created")
+        except Exception as e:
+            print(f"Note: Could not setup grade summary tables: {e}")
+
+    def rebuild(self):
+        """Recompute both tables from tblGrade (e.g. after course credits change)"""
+        with self.db.transaction():
+            self._execute("DELETE FROM tblCourseStats")
+            self._execute("""
+                INSERT INTO tblCourseStats (courseID, gradeCount, pointsSum, pointsSquares)
+                SELECT g.courseID, COUNT(*), SUM({points}), SUM({points} * {points})
+                FROM tblGrade g LEFT JOIN tblGradePoints p ON g.grade = p.grade
+                GROUP BY g.courseID
+            """.format(points=POINTS))
+            self._execute("DELETE FROM tblStudentGPA")
+            self._execute("""
+                INSERT INTO tblStudentGPA (studentID, courseCount, credits, weightedPoints)
+                SELECT g.studentID, COUNT(*), SUM(c.credits), SUM({points} * c.credits)
+                FROM (tblGrade g LEFT JOIN tblGradePoints p ON g.grade = p.grade)
+                     INNER JOIN tblCourse c ON g.courseID = c.courseID
+                GROUP BY g.studentID
+            """.format(points=POINTS))
+            self._execute("UPDATE tblStudentGPA SET credits = 0 WHERE credits IS NULL")
+            self._execute("UPDATE tblStudentGPA SET weightedPoints = 0 WHERE weightedPoints IS NULL")
+            self._execute("UPDATE tblStudentGPA SET gpa = weightedPoints / credits WHERE credits > 0")
+
+    # ---------- incremental updates ----------
+
+    def grade_row(self, grade_id):
+        """(studentID, courseID, grade) of a stored grade, or None"""
+        row = self.db.fetch_one(
+            "SELECT studentID, courseID, grade FROM tblGrade WHERE gradeID=?", (grade_id,))
+        return (row.studentID, row.courseID, row.grade) if row else None
+
+    def changed(self, old, new):
+        """
+        Apply a grade write: old/new are (studentID, courseID, grade) before
+        and after (None for an insert/delete). Call inside the same
+        db.transaction() as the write so both commit together.
+        """
+        if old:
+            self._apply(*old, sign=-1)
+        if new:
+            self._apply(*new, sign=1)
+
+    def _apply(self, student_id, course_id, grade, sign):
+        # Exact match, like the join on tblGradePoints in rebuild()
+        points = gpa_engine.GRADE_POINTS.get(grade, 0.0)
+        student_id, course_id = int(student_id), int(course_id)
+
+        row = self.db.fetch_one(
+            "SELECT gradeCount, pointsSum, pointsSquares FROM tblCourseStats WHERE courseID=?",
+            (course_id,))
+        if row is None:
+            self._execute(
+                "INSERT INTO tblCourseStats (courseID, gradeCount, pointsSum, pointsSquares) "
+                "VALUES (?, ?, ?, ?)", (course_id, sign, sign * points, sign * points * points))
+        else:
+            self._execute(
+                "UPDATE tblCourseStats SET gradeCount=?, pointsSum=?, pointsSquares=? WHERE courseID=?",
+                (row.gradeCount + sign, row.pointsSum + sign * points,
+                 row.pointsSquares + sign * points * points, course_id))
+
+        # Like the join on tblCourse in rebuild(): no course, no part in the GPA
+        course = entity_cache.courses(self.db).get(course_id)
+        if course is None:
+            return
+        credits = float(course.credits or 0)
+        row = self.db.fetch_one(
+            "SELECT courseCount, credits, weightedPoints FROM tblStudentGPA WHERE studentID=?",
+            (student_id,))
+        count, total, weighted = (row.courseCount, row.credits, row.weightedPoints) if row else (0, 0.0, 0.0)
+        count += sign
+        total += sign * credits
+        weighted += sign * points * credits
+        gpa = weighted / total if total > 1e-9 else None
+        if row is None:
+            self._execute(
+                "INSERT INTO tblStudentGPA (studentID, courseCount, credits, weightedPoints, gpa) "
+                "VALUES (?, ?, ?, ?, ?)", (student_id, count, total, weighted, gpa))
+        else:
+            self._execute(
+                "UPDATE tblStudentGPA SET courseCount=?, credits=?, weightedPoints=?, gpa=? "
+                "WHERE studentID=?", (count, total, weighted, gpa, student_id))
+
+    def _execute(self, query, params=None):
+        # execute_query reports failure by returning False; raise so the
+        # surrounding transaction rolls the grade write back as well
+        if not self.db.execute_query(query, params):
+            raise RuntimeError("Could not update the grade summary tables")
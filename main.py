@@ -6,6 +6,8 @@ import database  # database module
 import student  # student module
 import login  # login module
 import course  # course module
+import dashboard  # cached dashboard counters
+import grade_summary  # course / student GPA summary tables
 
 class GradeManagementSystem:
     def __init__(self):
@@ -17,6 +19,8 @@ class GradeManagementSystem:
             # Initialize database connection
             self.db = database.DatabaseConnection()
             self.db.setup_users_table()
+            self.db.setup_grade_points_table()
+            grade_summary.GradeSummary(self.db).setup()
             
             # Initialize user info
             self.current_user = None
@@ -205,18 +209,11 @@ class GradeManagementSystem:
         reports_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         try:
-            # Get statistics from database
-            query = "SELECT COUNT(*) FROM tblStudent"
-            result = self.db.fetch_one(query)
-            total_students = result[0] if result else 0
-            
-            query = "SELECT COUNT(*) FROM tblStudent WHERE status='Active'"
-            result = self.db.fetch_one(query)
-            active_students = result[0] if result else 0
-            
-            query = "SELECT COUNT(*) FROM tblStudent WHERE status='Inactive'"
-            result = self.db.fetch_one(query)
-            inactive_students = result[0] if result else 0
+            # Get statistics (one query, cached until students change)
+            stats = dashboard.snapshot(self.db).get()
+            total_students = stats["total"]
+            active_students = stats["active"]
+            inactive_students = stats["inactive"]
             
             # Display statistics in cards
             stats_frame = tk.Frame(reports_frame, bg="white")
@@ -250,9 +247,8 @@ class GradeManagementSystem:
             tk.Label(reports_frame, text="Student Distribution by Status", 
                     font=("Arial", 14, "bold"), bg="white").pack(pady=(20, 10), anchor="w")
             
-            # Fetch all statuses
-            query = "SELECT status, COUNT(*) as count FROM tblStudent GROUP BY status"
-            rows = self.db.fetch_all(query)
+            # All statuses (from the same snapshot)
+            rows = stats["by_status"]
             
             if rows:
                 for row in rows:
@@ -1,7 +1,230 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import itertools
 import os
 from datetime import datetime
+import aggregation
+import background_loader
+import entity_cache
+import export
+import gpa_engine
+import report_model
+import report_service
+import text_view
+import transcripts
+
+# Long text reports show this many lines first (with links to load more)
+PREVIEW_LINES = 1000
+
+# ========== REPORT QUERIES ==========
+# Shared by the report views and the data export
+
+STUDENT_LIST_QUERY = """
+    SELECT studentID, firstName, lastName, gender, 
+           dateOfbirth, contact, major, status
+    FROM tblStudent
+    ORDER BY lastName, firstName
+"""
+
+GRADE_SUMMARY_QUERY = """
+    SELECT s.studentID, s.firstName, s.lastName, 
+           g.courseID, c.courseCode, c.courseName,
+           g.grade, g.semester
+    FROM (tblStudent s
+          INNER JOIN tblGrade g ON s.studentID = g.studentID)
+          INNER JOIN tblCourse c ON g.courseID = c.courseID
+    ORDER BY s.lastName, s.firstName, g.semester
+"""
+
+TRANSCRIPT_QUERY = """
+    SELECT c.courseCode, c.courseName, c.credits,
+           g.grade, g.semester
+    FROM tblGrade g
+    INNER JOIN tblCourse c ON g.courseID = c.courseID
+    WHERE g.studentID=?
+    ORDER BY g.semester, c.courseCode
+"""
+
+# Missing or unmapped grades score 0 points (IIf: Access has no COALESCE)
+TOP_PERFORMERS_QUERY = """
+    SELECT s.studentID, s.firstName, s.lastName, s.major,
+           AVG(IIf(p.points IS NULL, 0, p.points)) AS avg_gpa,
+           COUNT(g.gradeID) AS courses_taken
+    FROM (tblStudent s
+          INNER JOIN tblGrade g ON s.studentID = g.studentID)
+          LEFT JOIN tblGradePoints p ON g.grade = p.grade
+    WHERE s.status = 'Active'
+    GROUP BY s.studentID, s.firstName, s.lastName, s.major
+    ORDER BY AVG(IIf(p.points IS NULL, 0, p.points)) DESC, s.studentID
+"""
+
+COURSE_STATS_QUERY = """
+    SELECT c.courseID, c.courseCode, c.courseName, c.credits,
+           cs.gradeCount, cs.pointsSum, cs.pointsSquares
+    FROM tblCourse c
+    LEFT JOIN tblCourseStats cs ON c.courseID = cs.courseID
+    ORDER BY c.courseCode
+"""
+
+AT_RISK_QUERY = """
+    SELECT s.studentID, s.firstName, s.lastName, s.major,
+           sg.gpa, sg.credits, sg.courseCount
+    FROM tblStudentGPA sg
+    INNER JOIN tblStudent s ON sg.studentID = s.studentID
+    WHERE sg.gpa < ? AND s.status = 'Active'
+    ORDER BY sg.gpa, s.studentID
+"""
+
+TRANSCRIPT_STUDENT_QUERY = """
+    SELECT firstName, lastName, major, status 
+    FROM tblStudent WHERE studentID=?
+"""
+
+COHORT_QUERY = """
+    SELECT s.studentID, s.firstName, s.lastName, s.major, g.gradeID,
+           c.courseCode, c.courseName, c.credits, g.grade, g.semester
+    FROM (tblStudent s
+          LEFT JOIN tblGrade g ON s.studentID = g.studentID)
+          LEFT JOIN tblCourse c ON g.courseID = c.courseID
+    WHERE s.status = ?
+    ORDER BY s.studentID, g.semester, c.courseCode
+"""
+
+# Students below this GPA are listed as at risk
+AT_RISK_THRESHOLD = 2.0
+
+
+# ========== REPORT DEFINITIONS ==========
+# Query + computation of every report; ReportGenerator only renders the
+# results (and report_model caches them while the data is unchanged)
+
+def normalize_gender(gender):
+    """MALE/FEMALE for the common spellings, otherwise the value upper-cased"""
+    gender = str(gender).upper()
+    if gender in ("MALE", "M"):
+        return "MALE"
+    if gender in ("FEMALE", "F"):
+        return "FEMALE"
+    return gender
+
+def compute_student_list(rows, filters, db):
+    # Count by gender / status / major in the same pass as the rows
+    agg = (aggregation.Aggregator()
+           .count_by("gender", lambda r: normalize_gender(r.gender))
+           .count_by("status", lambda r: str(r.status).upper())
+           .count_by("major", lambda r: r.major or "Undeclared"))
+    students = [(r.studentID, r.firstName, r.lastName, r.gender, r.dateOfbirth,
+                 r.contact, r.major, r.status) for r in agg.feed(rows)]
+    return students, {"total": agg.rows, "gender": agg.counts["gender"],
+                      "status": agg.counts["status"], "major": agg.counts["major"]}
+
+def compute_grade_summary(rows, filters, db):
+    agg = aggregation.Aggregator().count_by("grade", lambda r: r.grade or "No Grade")
+    grades = [(r.studentID, f"{r.firstName} {r.lastName}",
+               f"{r.courseCode} - {r.courseName}", r.grade, r.semester)
+              for r in agg.feed(rows)]
+    return grades, {"total": agg.rows, "grades": agg.counts["grade"]}
+
+def compute_transcript(rows, filters, db):
+    # iter_rows rather than fetch_one: a query error must fail the report, not read as "not found"
+    found = list(db.iter_rows(TRANSCRIPT_STUDENT_QUERY, (filters["student_id"],)))
+    student = found[0] if found else None
+    # Credits, GPA and the grade distribution are gathered in one pass
+    courses = [tuple(g) for g in rows]
+    return courses, dict(transcripts.summarize(courses), student=student)
+
+def compute_cohort_transcripts(rows, filters, db):
+    # Rows come ordered by student: one transcript summary per group
+    students = []
+    for student_id, group in itertools.groupby(rows, key=lambda r: r.studentID):
+        group = list(group)
+        first = group[0]
+        s = transcripts.summarize([(r.courseCode, r.courseName, r.credits, r.grade, r.semester)
+                                   for r in group if r.gradeID is not None])
+        students.append((student_id, f"{first.firstName} {first.lastName}", first.major,
+                         s["courses"], s["attempted"], s["earned"], s["gpa"] if s["courses"] else None))
+    graded = [st[6] for st in students if st[6] is not None]
+    return students, {"students": len(students), "graded": len(graded),
+                      "gpa": sum(graded) / len(graded) if graded else 0}
+
+def compute_top_performers(rows, filters, db):
+    # Already ranked by the database (grade letters mapped through tblGradePoints)
+    return [(i, r.studentID, f"{r.firstName} {r.lastName}", r.major, r.avg_gpa, r.courses_taken)
+            for i, r in enumerate(rows, 1)], {}
+
+def compute_course_stats(rows, filters, db):
+    courses = []
+    for row in rows:
+        count = row.gradeCount or 0
+        mean = sd = None
+        if count > 0:
+            mean = row.pointsSum / count
+            # Population standard deviation from the running sums
+            sd = max(row.pointsSquares / count - mean * mean, 0) ** 0.5
+        courses.append((row.courseCode, row.courseName, row.credits, count, mean, sd))
+    return courses, {"courses": len(courses),
+                     "graded": sum(c[3] for c in courses),
+                     "ungraded": sum(1 for c in courses if not c[3])}
+
+def compute_at_risk(rows, filters, db):
+    return [(r.studentID, f"{r.firstName} {r.lastName}", r.major, r.gpa, r.credits, r.courseCount)
+            for r in rows], {"threshold": filters["threshold"]}
+
+STUDENT_LIST = report_model.ReportDefinition(
+    "student_list", "STUDENT LIST REPORT",
+    [("studentID", "ID", None), ("firstName", "First Name", None),
+     ("lastName", "Last Name", None), ("gender", "Gender", None),
+     ("dateOfbirth", "DOB", "%Y-%b-%d"), ("contact", "Contact", None),
+     ("major", "Major", None), ("status", "Status", None)],
+    STUDENT_LIST_QUERY, compute_student_list)
+
+GRADE_SUMMARY = report_model.ReportDefinition(
+    "grade_summary", "GRADE SUMMARY REPORT",
+    [("studentID", "Student ID", None), ("studentName", "Student Name", None),
+     ("course", "Course", None), ("grade", "Grade", None), ("semester", "Semester", None)],
+    GRADE_SUMMARY_QUERY, compute_grade_summary)
+
+TRANSCRIPT = report_model.ReportDefinition(
+    "student_transcript", "OFFICIAL TRANSCRIPT",
+    [("courseCode", "Course Code", None), ("courseName", "Course Name", None),
+     ("credits", "Credits", None), ("grade", "Grade", None), ("semester", "Semester", None)],
+    TRANSCRIPT_QUERY, compute_transcript, params=lambda f: (f["student_id"],))
+
+TOP_PERFORMERS = report_model.ReportDefinition(
+    "top_performers", "TOP PERFORMERS",
+    [("rank", "Rank", None), ("studentID", "Student ID", None), ("name", "Name", None),
+     ("major", "Major", None), ("gpa", "GPA", ".2f"), ("courses", "Courses", None)],
+    lambda db, f: db.top_n(TOP_PERFORMERS_QUERY, 10), compute_top_performers)
+
+COURSE_STATS = report_model.ReportDefinition(
+    "course_stats", "COURSE STATISTICS REPORT",
+    [("courseCode", "Course Code", None), ("courseName", "Course Name", None),
+     ("credits", "Credits", None), ("graded", "Graded", None),
+     ("average", "Average", ".2f"), ("stdDev", "Std Dev", ".2f")],
+    COURSE_STATS_QUERY, compute_course_stats)
+
+AT_RISK = report_model.ReportDefinition(
+    "at_risk", "AT-RISK STUDENTS",
+    [("studentID", "Student ID", None), ("name", "Name", None), ("major", "Major", None),
+     ("gpa", "GPA", ".2f"), ("credits", "Credits", None), ("courses", "Courses", None)],
+    AT_RISK_QUERY, compute_at_risk, params=lambda f: (f["threshold"],))
+
+COHORT_TRANSCRIPTS = report_model.ReportDefinition(
+    "cohort_transcripts", "COHORT TRANSCRIPTS",
+    [("studentID", "Student ID", None), ("name", "Name", None), ("major", "Major", None),
+     ("courses", "Courses", None), ("attempted", "Attempted", None), ("earned", "Earned", None),
+     ("gpa", "GPA", ".2f")],
+    COHORT_QUERY, compute_cohort_transcripts, params=lambda f: (f["status"],))
+
+REPORTS = {d.name: d for d in (STUDENT_LIST, GRADE_SUMMARY, TRANSCRIPT,
+                               TOP_PERFORMERS, COURSE_STATS, AT_RISK, COHORT_TRANSCRIPTS)}
+
+# Computed by the report service's worker processes (the rest are quick enough to run here)
+HEAVY_REPORTS = {"grade_summary", "course_stats", "cohort_transcripts"}
+
+# Notebook tabs
+TABLE_TAB, TEXT_TAB, STATS_TAB = 0, 1, 2
+
 
 class ReportGenerator:
     def init(self, parent_frame, db_connection):
@@ -34,7 +257,8 @@ class ReportGenerator:
             ("Student Transcript", "student_transcript"),
             ("Top Performers", "top_performers"),
             ("Course Statistics", "course_stats"),
-            ("At-Risk Students", "at_risk")
+            ("At-Risk Students", "at_risk"),
+            ("Cohort Transcripts", "cohort_transcripts")
         ]
         
         for i, (text, value) in enumerate(reports):
@@ -71,6 +295,11 @@ class ReportGenerator:
         self.to_date.insert(0, datetime.now().strftime("%Y-%m-%d"))
         self.to_date.grid(row=1, column=3, padx=5, pady=5)
         
+        # Long reports: render the first lines only, the rest on request
+        self.preview_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(filter_frame, text=f"Text view: show first {PREVIEW_LINES} lines",
+                       variable=self.preview_var).grid(row=2, column=0, columnspan=4, sticky="w", pady=5)
+        
         # ========== ACTION BUTTONS ==========
         btn_frame = tk.Frame(self.parent)
         btn_frame.pack(pady=10)
@@ -79,14 +308,28 @@ class ReportGenerator:
                  bg="#27ae60", fg="white", width=15).pack(side="left", padx=5)
         tk.Button(btn_frame, text="Export to Text", command=self.export_to_text,
                  bg="#3498db", fg="white", width=15).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="Export Data", command=self.export_data,
+                 bg="#16a085", fg="white", width=15).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="Batch Transcripts", command=self.batch_transcripts,
+                 bg="#d35400", fg="white", width=15).pack(side="left", padx=5)
         tk.Button(btn_frame, text="Print Preview", command=self.print_preview,
                  bg="#9b59b6", fg="white", width=15).pack(side="left", padx=5)
         tk.Button(btn_frame, text="Clear Results", command=self.clear_results,bg="#e74c3c", fg="white", width=15).pack(side="left", padx=5)
         
+        # Progress of a batch transcript run / a report computed by the service
+        self.batch_status = tk.Label(self.parent, text="", fg="#7f8c8d", font=("Arial", 9))
+        self.batch_status.pack()
+        self.report_status = tk.Label(self.parent, text="", fg="#7f8c8d", font=("Arial", 9))
+        self.report_status.pack()
+        self.report_job = None  # ReportJob running in the report service
+        
         # ========== RESULTS AREA ==========
         # Notebook for different views
         self.notebook = ttk.Notebook(self.parent)
         self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.result = None  # ReportResult shown in the tabs
+        self.rendered = set()  # tabs already filled from it
         
         # Tab 1: Table View
         self.table_frame = tk.Frame(self.notebook)
@@ -114,6 +357,7 @@ class ReportGenerator:
         
         text_scroll.pack(side="right", fill="y")
         self.text_widget.pack(fill="both", expand=True)
+        self.report_text = text_view.TextRenderer(self.text_widget)
         
         # Tab 3: Statistics
         self.stats_frame = tk.Frame(self.notebook)
@@ -126,6 +370,13 @@ class ReportGenerator:
         stats_scroll.pack(side="right", fill="y")
         self.stats_text.pack(fill="both", expand=True)
         
+        # Exports run on a worker thread
+        self.loader = background_loader.BackgroundLoader(self.parent, self.db)
+        # Waits for reports computed by the report service
+        self.report_loader = background_loader.BackgroundLoader(self.parent, self.db)
+        # Batch transcripts report every chunk as it finishes
+        self.batch_loader = background_loader.BackgroundLoader(self.parent, self.db, chunk_size=1)
+        
         # Load dropdown data
         self.load_dropdown_data()
     
@@ -133,16 +384,16 @@ class ReportGenerator:
         """Load students and courses for dropdowns"""
         try:
             # Load students
-            students = self.db.fetch_all("SELECT studentID, firstName, lastName FROM tblStudent ORDER BY lastName")
-            student_list = ["All Students"] + [f"{s[0]} - {s[1]} {s[2]}" for s in students]
+            students = sorted(entity_cache.students(self.db).all(), key=lambda s: s.lastName or "")
+            student_list = ["All Students"] + [f"{s.studentID} - {s.firstName} {s.lastName}" for s in students]
             
             student_combo = self.parent.winfo_children()[2].winfo_children()[1].winfo_children()[1]  # Get the combobox
             student_combo['values'] = student_list
             student_combo.current(0)
             
             # Load courses
-            courses = self.db.fetch_all("SELECT courseID, courseCode, courseName FROM tblCourse ORDER BY courseCode")
-            course_list = ["All Courses"] + [f"{c[0]} - {c[1]} {c[2]}" for c in courses]
+            courses = sorted(entity_cache.courses(self.db).all(), key=lambda c: c.courseCode or "")
+            course_list = ["All Courses"] + [f"{c.courseID} - {c.courseCode} {c.courseName}" for c in courses]
             
             course_combo = self.parent.winfo_children()[2].winfo_children()[1].winfo_children()[3]  # Get the combobox
             course_combo['values'] = course_list
@@ -152,341 +403,279 @@ class ReportGenerator:
             print(f"Error loading dropdown data: {e}")
     
     def generate_report(self):
-        """Generate the selected report"""
+        """Generate the selected report (reused from the cache while the data is unchanged)"""
         report_type = self.report_var.get()
+        filters = self.report_filters(report_type)
+        if filters is None:
+            return
+        
+        self.cancel_report()
+        if report_type in HEAVY_REPORTS:
+            self.run_in_service(REPORTS[report_type], filters)
+            return
+        try:
+            result = report_model.results(self.db).get(REPORTS[report_type], filters)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to generate report:\n{str(e)}")
+            return
+        self.show_result(result)
+    
+    def run_in_service(self, definition, filters):
+        """Compute a heavy report in a worker process; the window stays responsive"""
+        cache = report_model.results(self.db)
+        result = cache.peek(definition, filters)
+        if result is not None:
+            self.show_result(result)
+            return
+        job = report_service.service(self.db).submit(definition, filters)
+        self.report_job = job
+        
+        def on_done(result):
+            self.report_job = None
+            self.report_status.config(text="")
+            self.show_result(result)
+        
+        def on_error(e):
+            self.report_job = None
+            self.report_status.config(text="")
+            if isinstance(e, report_service.ReportTimeout):
+                messagebox.showerror("Error", f"{e}.\nTry again when the database is less busy.")
+            else:
+                messagebox.showerror("Error", f"Failed to generate report:\n{str(e)}")
+        
+        self.report_status.config(text=f"Generating {definition.title.lower()}... (Clear Results cancels)")
+        # The worker thread only waits for the process (and caches the result)
+        self.report_loader.run(lambda: cache.get(definition, filters, run=lambda d, f: job.result()),
+                               on_done, on_error)
+    
+    def cancel_report(self):
+        """Stop the report being computed by the service, if any"""
+        job, self.report_job = self.report_job, None
+        if job is not None:
+            self.report_loader.cancel()
+            job.cancel()
+            self.report_status.config(text="")
+    
+    def report_filters(self, report_type):
+        """Filters used by a report type (None if a required one is not selected)"""
+        if report_type == "student_transcript":
+            student_selection = self.student_var.get()
+            if student_selection == "All Students" or not student_selection:
+                messagebox.showwarning("Selection Needed", "Please select a specific student for transcript.")
+                return None
+            return {"student_id": int(student_selection.split(" - ")[0])}
+        if report_type == "at_risk":
+            return {"threshold": AT_RISK_THRESHOLD}
+        if report_type == "cohort_transcripts":
+            return {"status": "Active"}
+        return {}
+    
+    def show_result(self, result):
+        """Show a report result; each tab is rendered the first time it is viewed"""
+        report_type = result.definition.name
+        if report_type == "student_transcript" and result.summary["student"] is None:
+            messagebox.showerror("Error", "Student not found.")
+            return
+        
+        self.clear_results()
+        if report_type == "grade_summary" and not result.rows:
+            messagebox.showinfo("No Data", "No grade records found.")
+            return
+        
+        self.result = result
+        self.render_tab(self.notebook.index("current"))
+        
+        if report_type == "at_risk" and not result.rows:
+            messagebox.showinfo("No Data", "No active students are below the GPA threshold.")
+    
+    def on_tab_changed(self, event=None):
+        """Render the newly selected tab from the current result (no recomputation)"""
+        self.render_tab(self.notebook.index("current"))
+    
+    def render_tab(self, tab):
+        """Fill one tab from self.result, once per result"""
+        if self.result is None or tab in self.rendered:
+            return
+        self.rendered.add(tab)
+        try:
+            if tab == TABLE_TAB:
+                self.render_table(self.result)
+            elif tab == TEXT_TAB:
+                self.show_text(self.report_lines(self.result))
+            else:
+                self.stats_text.insert(1.0, self.report_stats(self.result))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to show report:\n{str(e)}")
+    
+    def render_table(self, result):
+        """Table view: one tree row per result row"""
+        self.tree["columns"] = result.headings
+        for col in result.headings:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        
+        for row in result.rows:
+            self.tree.insert("", "end", values=result.display(row))
+    
+    def report_lines(self, result):
+        """Text view of a result as a list of lines"""
+        report_type = result.definition.name
+        s = result.summary
+        generated = result.generated.strftime('%Y-%m-%d %H:%M')
+        out = []
         
         if report_type == "student_list":
-            self.generate_student_list()
+            out = [f"{result.title}\n", "="*50 + "\n", f"Generated: {generated}\n",
+                   f"Total Students: {s['total']}\n", "\n",
+                   f"{'ID':<6} {'Name':<25} {'Gender':<8} {'Major':<15} {'Status':<10}\n",
+                   "-"*70 + "\n"]
+            for row in result.rows:
+                out.append(f"{row.studentID:<6} {row.firstName} {row.lastName or '':<20} "
+                           f"{row.gender or '':<8} {row.major or '':<15} {row.status or '':<10}\n")
+        
         elif report_type == "grade_summary":
-            self.generate_grade_summary()
+            out = [f"{result.title}\n", "="*50 + "\n"]
+        
         elif report_type == "student_transcript":
-            self.generate_student_transcript()
+            student = s["student"]
+            out.append(transcripts.format_transcript(
+                {"studentID": result.filters["student_id"], "firstName": student.firstName,
+                 "lastName": student.lastName, "major": student.major, "status": student.status},
+                result.rows, generated, s))
+        
         elif report_type == "top_performers":
-            self.generate_top_performers()
+            out = [f"{result.title}\n", "="*50 + "\n",
+                   f"{'Rank':<6} {'Name':<30} {'GPA':>6} {'Courses':>8}\n", "-"*53 + "\n"]
+            for row in result.rows:
+                out.append(f"{row.rank:<6} {row.name:<30} {row.gpa:>6.2f} {row.courses:>8}\n")
+        
         elif report_type == "course_stats":
-            self.generate_course_stats()
+            out = [f"{result.title}\n", "="*50 + "\n",
+                   f"{'Code':<10} {'Course':<30} {'Graded':>7} {'Avg':>6} {'SD':>6}\n",
+                   "-"*65 + "\n"]
+            for row in result.rows:
+                avg_text, sd_text = result.display(row)[4:6]
+                out.append(f"{row.courseCode or '':<10} {row.courseName or '':<30} {row.graded:>7} "
+                           f"{avg_text or '-':>6} {sd_text or '-':>6}\n")
+        
         elif report_type == "at_risk":
-            self.generate_at_risk_students()
+            out = [f"{result.title} (GPA < {s['threshold']:.1f})\n", "="*50 + "\n"]
+            for row in result.rows:
+                out.append(f"{row.studentID:<6} {row.name:<30} {row.gpa:.2f}\n")
+        
+        elif report_type == "cohort_transcripts":
+            out = [f"{result.title} ({result.filters['status']} students)\n", "="*50 + "\n",
+                   f"{'ID':<6} {'Name':<30} {'Courses':>7} {'Earned':>7} {'GPA':>6}\n", "-"*60 + "\n"]
+            for row in result.rows:
+                gpa_text = result.display(row)[6]
+                out.append(f"{row.studentID:<6} {row.name:<30} {row.courses:>7} "
+                           f"{row.earned:>7} {gpa_text or '-':>6}\n")
+        
+        return out
     
-    def generate_student_list(self):
-        """Generate list of all students"""
-        try:
-            query = """
-                SELECT studentID, firstName, lastName, gender, 
-                       dateOfbirth, contact, major, status
-                FROM tblStudent
-                ORDER BY lastName, firstName
-            """
-            rows = self.db.fetch_all(query)
-            
-            # Clear previous results
-            self.clear_treeview()
-            self.text_widget.delete(1.0, tk.END)
-            self.stats_text.delete(1.0, tk.END)
-            
-            # Configure treeview columns
-            self.tree["columns"] = ("ID", "First Name", "Last Name", "Gender", 
-                                   "DOB", "Contact", "Major", "Status")
-            for col in self.tree["columns"]:
-                self.tree.heading(col, text=col)
-                self.tree.column(col, width=100)
-            
-            # Add data to treeview
-            for row in rows:
-                dob = self.db.format_date(row.dateOfbirth) if row.dateOfbirth else ""
-                self.tree.insert("", "end", values=(
-                    row.studentID, row.firstName, row.lastName, row.gender,
-                    dob, row.contact, row.major, row.status
-                ))
-            
-            # Text view
-            self.text_widget.insert(1.0, "STUDENT LIST REPORT\n")
-            self.text_widget.insert(2.0, "="*50 + "\n")
-            self.text_widget.insert(3.0, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
-            self.text_widget.insert(4.0, f"Total Students: {len(rows)}\n\n")
-            
-            header = f"{'ID':<6} {'Name':<25} {'Gender':<8} {'Major':<15} {'Status':<10}\n"
-            self.text_widget.insert(tk.END, header)
-            self.text_widget.insert(tk.END, "-"*70 + "\n")
-            
-            for row in rows:
-                line = f"{row.studentID:<6} {row.firstName} {row.lastName:<20} {row.gender:<8} {row.major:<15} {row.status:<10}\n"
-                self.text_widget.insert(tk.END, line)
-            
-            # Statistics
+    def report_stats(self, result):
+        """Statistics view of a result"""
+        report_type = result.definition.name
+        s = result.summary
+        
+        if report_type == "student_list":
+            genders = s["gender"]
+            statuses = s["status"]
             stats = f"""
             STUDENT STATISTICS
             ==================
-            Total Students: {len(rows)}
+            Total Students: {s['total']}
             
             By Gender:
-            - Male: {sum(1 for r in rows if str(r.gender).upper() == 'MALE' or r.gender == 'M')}
-            - Female: {sum(1 for r in rows if str(r.gender).upper() == 'FEMALE' or r.gender == 'F')}
+            - Male: {genders.get("MALE", 0)}
+            - Female: {genders.get("FEMALE", 0)}
             
             By Status:
-            - Active: {sum(1 for r in rows if str(r.status).upper() == 'ACTIVE')}
-            - Inactive: {sum(1 for r in rows if str(r.status).upper() == 'INACTIVE')}
-            - Graduated: {sum(1 for r in rows if str(r.status).upper() == 'GRADUATED')}
+            - Active: {statuses.get("ACTIVE", 0)}
+            - Inactive: {statuses.get("INACTIVE", 0)}
+            - Graduated: {statuses.get("GRADUATED", 0)}
             
             By Major:
             """
-            self.stats_text.insert(1.0, stats)
-            
-            # Count by major
-            majors = {}
-            for row in rows:
-                major = row.major or "Undeclared"
-                majors[major] = majors.get(major, 0) + 1
-            
-            for major, count in sorted(majors.items()):
-                self.stats_text.insert(tk.END, f"- {major}: {count}\n")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate report:\n{str(e)}")
-    
-    def generate_grade_summary(self):
-        """Generate grade summary report"""
-        try:
-            query = """
-                SELECT s.studentID, s.firstName, s.lastName, 
-                       g.courseID, c.courseCode, c.courseName,
-                       g.grade, g.semester
-                FROM tblStudent s
-                JOIN tblGrade g ON s.studentID = g.studentID
-                JOIN tblCourse c ON g.courseID = c.courseIDORDER BY s.lastName, s.firstName, g.semester
-            """
-            rows = self.db.fetch_all(query)
-            
-            if not rows:
-                messagebox.showinfo("No Data", "No grade records found.")
-                return
-            
-            # Clear and setup treeview
-            self.clear_treeview()
-            self.text_widget.delete(1.0, tk.END)
-            self.stats_text.delete(1.0, tk.END)
-            
-            self.tree["columns"] = ("Student ID", "Student Name", "Course", 
-                                   "Grade", "Semester")
-            for col in self.tree["columns"]:
-                self.tree.heading(col, text=col)
-            
-            # Add data
-            for row in rows:
-                self.tree.insert("", "end", values=(
-                    row.studentID, f"{row.firstName} {row.lastName}",
-                    f"{row.courseCode} - {row.courseName}",
-                    row.grade, row.semester
-                ))
-            
-            # Text view
-            self.text_widget.insert(1.0, "GRADE SUMMARY REPORT\n")
-            self.text_widget.insert(2.0, "="*50 + "\n")
-            
-            # Statistics
-            total_grades = len(rows)
-            grade_counts = {}
-            for row in rows:
-                grade = row.grade or "No Grade"
-                grade_counts[grade] = grade_counts.get(grade, 0) + 1
-            
+            for major, count in sorted(s["major"].items()):
+                stats += f"- {major}: {count}\n"
+            return stats
+        
+        if report_type == "grade_summary":
             stats = f"""
             GRADE DISTRIBUTION
             ==================
-            Total Grade Records: {total_grades}
+            Total Grade Records: {s['total']}
             
             Grade Breakdown:
             """
-            for grade, count in sorted(grade_counts.items()):
-                percentage = (count / total_grades) * 100
+            for grade, count in sorted(s["grades"].items()):
+                percentage = (count / s["total"]) * 100
                 stats += f"- {grade}: {count} ({percentage:.1f}%)\n"
-            
-            self.stats_text.insert(1.0, stats)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate grade report:\n{str(e)}")
-    
-    def generate_student_transcript(self):
-        """Generate transcript for a specific student"""
-        student_selection = self.student_var.get()
-        if student_selection == "All Students" or not student_selection:
-            messagebox.showwarning("Selection Needed", "Please select a specific student for transcript.")
-            return
+            return stats
         
-        try:
-            # Extract student ID from selection
-            student_id = int(student_selection.split(" - ")[0])
-            
-            # Get student info
-            student_query = """
-                SELECT firstName, lastName, major, status 
-                FROM tblStudent WHERE studentID=?
-            """
-            student_info = self.db.fetch_one(student_query, (student_id,))
-            
-            if not student_info:
-                messagebox.showerror("Error", "Student not found.")
-                return
-            
-            # Get grades
-            grades_query = """
-                SELECT c.courseCode, c.courseName, c.credits,
-                       g.grade, g.semester
-                FROM tblGrade g
-                JOIN tblCourse c ON g.courseID = c.courseID
-                WHERE g.studentID=?
-                ORDER BY g.semester, c.courseCode
-            """
-            grades = self.db.fetch_all(grades_query, (student_id,))
-            
-            # Clear displays
-            self.clear_treeview()
-            self.text_widget.delete(1.0, tk.END)
-            self.stats_text.delete(1.0, tk.END)
-            
-            # Setup treeview
-            self.tree["columns"] = ("Course Code", "Course Name", "Credits", 
-                                   "Grade", "Semester")
-            for col in self.tree["columns"]:
-                self.tree.heading(col, text=col)
-            
-            # Add grades to treeview
-            total_credits = 0
-            earned_credits = 0
-            grade_points = 0
-            
-            for grade in grades:
-                credits = float(grade.credits or 0)
-                total_credits += credits
-                
-                # Calculate GPA (simple version)
-                grade_value = self.grade_to_points(grade.grade)
-                if grade_value > 0:
-                    earned_credits += credits
-                    grade_points += grade_value * credits
-                
-                self.tree.insert("", "end", values=grade)
-            
-            # Calculate GPA
-            gpa = grade_points / total_credits if total_credits > 0 else 0
-            
-            # Text view (official transcript look)
-            transcript = f"""
-            OFFICIAL TRANSCRIPT
-            {'='*50}
-            Student: {student_info.firstName} {student_info.lastName}
-            Student ID: {student_id}
-            Major: {student_info.major}
-            Status: {student_info.status}
-            
-            {'='*50}
-            COURSE HISTORY
-            {'='*50}
-            """
-            self.text_widget.insert(1.0, transcript)
-            
-            for grade in grades:
-                course_line = f"{grade.courseCode:10} {grade.courseName:30} {grade.credits:3} credits  {grade.grade:5}  {grade.semester}\n"
-                self.text_widget.insert(tk.END, course_line)
-            
-            summary = f"""
-            {'='*50}
-            ACADEMIC SUMMARY
-            {'='*50}
-            Total Courses: {len(grades)}
-            Total Credits Attempted: {total_credits}
-            Total Credits Earned: {earned_credits}
-            Grade Point Average (GPA): {gpa:.2f}
-            
-            Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-            """
-            self.text_widget.insert(tk.END, summary)
-            
-            # Statistics
+        if report_type == "student_transcript":
+            student = s["student"]
             stats = f"""
             TRANSCRIPT ANALYSIS
             ===================
-            Student: {student_info.firstName} {student_info.lastName}
-            GPA: {gpa:.2f}
+            Student: {student.firstName} {student.lastName}
+            GPA: {s['gpa']:.2f}
             
             Grade Distribution:
             """
-            
-            grade_dist = {}
-            for grade in grades:
-                g = grade.grade or "No Grade"
-                grade_dist[g] = grade_dist.get(g, 0) + 1
-            
-            for g, count in sorted(grade_dist.items()):
+            for g, count in sorted(s["grades"].items()):
                 stats += f"- {g}: {count}\n"
             
-            stats += f"\nCompletion Rate: {(earned_credits/total_credits*100):.1f}%"
-            self.stats_text.insert(1.0, stats)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate transcript:\n{str(e)}")
+            rate = s["earned"] / s["attempted"] * 100 if s["attempted"] else 0
+            stats += f"\nCompletion Rate: {rate:.1f}%"
+            return stats
+        
+        if report_type == "course_stats":
+            return f"""
+            COURSE STATISTICS
+            =================
+            Courses: {s['courses']}
+            Graded Enrollments: {s['graded']}
+            Courses Without Grades: {s['ungraded']}
+            """
+        
+        if report_type == "at_risk":
+            return f"""
+            AT-RISK SUMMARY
+            ===============
+            Active students below {s['threshold']:.1f} GPA: {len(result.rows)}
+            """
+        
+        if report_type == "cohort_transcripts":
+            return f"""
+            COHORT SUMMARY
+            ==============
+            Students: {s['students']}
+            Students With Grades: {s['graded']}
+            Average GPA: {s['gpa']:.2f}
+            """
+        return ""
     
-    def grade_to_points(self, grade):
-        """Convert letter grade to grade points"""
-        grade_map = {
-            'A': 4.0, 'A-': 3.7, 'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7, 'D+': 1.3, 'D': 1.0,
-            'F': 0.0
-        }
-        return grade_map.get(str(grade).upper(), 0.0)
+    def show_text(self, out):
+        """Render a report's text view from its buffer (a list of strings)"""
+        self.report_text.preview_lines = PREVIEW_LINES if self.preview_var.get() else None
+        self.report_text.show(out)
     
-    def generate_top_performers(self):
-        """Generate report of top performing students"""
-        try:
-            query = """
-                SELECT s.studentID, s.firstName, s.lastName, s.major,
-                       AVG(CASE 
-                           WHEN g.grade = 'A' THEN 4.0
-                           WHEN g.grade = 'B' THEN 3.0
-                           WHEN g.grade = 'C' THEN 2.0
-                           WHEN g.grade = 'D' THEN 1.0
-                           ELSE 0
-                       END) as avg_gpa,
-                       COUNT(g.gradeID) as courses_taken
-                FROM tblStudent s
-                LEFT JOIN tblGrade g ON s.studentID = g.studentID
-                WHERE s.status = 'Active'
-                GROUP BY s.studentID, s.firstName, s.lastName, s.majorHAVING COUNT(g.gradeID) >= 1
-                ORDER BY avg_gpa DESC
-                LIMIT 10
-            """
-            rows = self.db.fetch_all(query)
-            
-            self.clear_treeview()
-            self.text_widget.delete(1.0, tk.END)
-            
-            self.tree["columns"] = ("Rank", "Student ID", "Name", "Major", "GPA", "Courses")
-            for col in self.tree["columns"]:
-                self.tree.heading(col, text=col)
-            
-            for i, row in enumerate(rows, 1):
-                self.tree.insert("", "end", values=(
-                    i, row.studentID, f"{row.firstName} {row.lastName}",
-                    row.major, f"{row.avg_gpa:.2f}", row.courses_taken
-                ))
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate top performers report:\n{str(e)}")
-            def generate_course_stats(self):
-                """Generate statistics for courses"""
-        # Similar structure to other reports
-        messagebox.showinfo("Coming Soon", "Course statistics feature coming soon!")
+    def normalize_gender(self, gender):
+        """MALE/FEMALE for the common spellings, otherwise the value upper-cased"""
+        return normalize_gender(gender)
     
-    def generate_at_risk_students(self):
-        """Identify students at risk (failing grades)"""
-        # Similar structure to other reports
-        messagebox.showinfo("Coming Soon", "At-risk students feature coming soon!")
+    def grade_to_points(self, grade):
+        """Convert letter grade to grade points"""
+        return gpa_engine.grade_points(grade)
     
     def export_to_text(self):
         """Export current report to text file"""
         try:
-            # Get text from text widget
-            content = self.text_widget.get(1.0, tk.END)
+            # Get text from text widget (all of it, even if only a preview is shown)
+            self.render_tab(TEXT_TAB)
+            content = self.report_text.content()
             if len(content.strip()) == 0:
                 messagebox.showwarning("No Data", "Generate a report first.")
                 return
@@ -506,9 +695,90 @@ class ReportGenerator:
         except Exception as e:
             messagebox.showerror("Export Error", f"Failed to export:\n{str(e)}")
     
+    def export_data(self):
+        """Stream the selected report's rows to CSV / JSON Lines / Parquet"""
+        report_type = self.report_var.get()
+        filters = self.report_filters(report_type)
+        if filters is None:
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("CSV (gzip)", "*.csv.gz"),
+                       ("JSON Lines", "*.jsonl"), ("JSON Lines (gzip)", "*.jsonl.gz"),
+                       ("Parquet", "*.parquet"), ("All files", "*.*")],
+            initialfile=f"{report_type}_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
+        )
+        if not filename:
+            return
+        try:
+            export.format_for(filename)
+        except ValueError as e:
+            messagebox.showerror("Export Error", str(e))
+            return
+        
+        definition = REPORTS[report_type]
+        
+        def work():
+            # A result the views already hold is written as is; otherwise the
+            # query's rows go straight from the cursor to the file, never all
+            # in memory (nor into the report cache)
+            result = report_model.results(self.db).peek(definition, filters)
+            if result is not None:
+                return export.write_rows(result.rows, filename, description=result.description)
+            query, params = definition.source(self.db, filters)
+            return export.export_query(self.db, query, filename, params)
+        
+        def on_done(count):
+            messagebox.showinfo("Success", f"Exported {count} row(s) to:\n{filename}")
+        
+        def on_error(e):
+            messagebox.showerror("Export Error", f"Failed to export:\n{str(e)}")
+        
+        self.loader.run(work, on_done, on_error)
+    
+    def batch_transcripts(self):
+        """Write the transcript of every student (or every active student) to a folder"""
+        if self.batch_loader.busy:
+            messagebox.showwarning("Batch Transcripts", "A batch is already running.")
+            return
+        folder = filedialog.askdirectory(title="Folder for the transcripts")
+        if not folder:
+            return
+        cohort = {"status": "Active"} if messagebox.askyesno(
+            "Batch Transcripts", "Only active students?") else None
+        combined = messagebox.askyesno(
+            "Batch Transcripts", "Write one combined file?\n(No = one file per student)")
+        
+        job = transcripts.TranscriptBatch(self.db, folder, combined=combined)
+        if job.has_previous_run() and not messagebox.askyesno(
+                "Batch Transcripts", "This folder has an unfinished batch.\n"
+                "Resume it? (No = start again)"):
+            job.restart()
+        
+        def on_progress(chunk):
+            done, total = chunk[-1]
+            self.batch_status.config(text=f"Transcripts: {done} of {total}")
+        
+        def on_done(count):
+            self.batch_status.config(text="")
+            message = f"Wrote {job.written} transcript(s) to:\n{folder}"
+            if job.skipped:
+                message += f"\n{job.skipped} already done by an earlier run"
+            messagebox.showinfo("Batch Transcripts", message)
+        
+        def on_error(e):
+            self.batch_status.config(text="")
+            messagebox.showerror("Batch Transcripts", f"Batch stopped:\n{str(e)}\n\n"
+                                 "Run it again on the same folder to resume.")
+        
+        self.batch_status.config(text="Transcripts: loading students...")
+        self.batch_loader.stream(lambda: job.run(cohort), on_progress, on_done, on_error)
+    
     def print_preview(self):
         """Show print preview (simplified)"""
-        content = self.text_widget.get(1.0, tk.END)
+        self.render_tab(TEXT_TAB)
+        content = self.report_text.content()
         if len(content.strip()) > 0:
             preview_window = tk.Toplevel(self.parent)
             preview_window.title("Print Preview")
@@ -531,8 +801,11 @@ class ReportGenerator:
     
     def clear_results(self):
         """Clear all results"""
+        self.cancel_report()
+        self.result = None
+        self.rendered = set()
         self.clear_treeview()
-        self.text_widget.delete(1.0, tk.END)
+        self.report_text.clear()
         self.stats_text.delete(1.0, tk.END)
     
     def clear_treeview(self):
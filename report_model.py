@@ -0,0 +1,171 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+
+import storage
+
+
+class ReportDefinition:
+    """
+    A report as data: the query it reads and the compute function that turns
+    the rows into a ReportResult. The GUI, the console and the exporters all
+    render from the result, so the numbers are worked out in one place.
+    """
+    def __init__(self, name, title, columns, query, compute, params=None):
+        """
+        :param name: Report type (part of the cache key)
+        :param title: Heading shown above the report
+        :param columns: (field, heading, format spec) for each result column;
+                        the spec (e.g. ".2f") is used when the value is displayed
+        :param query: SQL, or function(db, filters) -> SQL (e.g. to add TOP n)
+        :param compute: function(rows, filters, db) -> (result rows, summary dict)
+        :param params: Optional function(filters) -> query parameters
+        """
+        self.name = name
+        self.title = title
+        self.fields = tuple(c[0] for c in columns)
+        self.headings = tuple(c[1] for c in columns)
+        self.formats = tuple(c[2] for c in columns)
+        self.record = storage.record_class(self.fields)
+        self.query = query
+        self.compute = compute
+        self.params = params
+
+    def source(self, db, filters):
+        """(SQL, parameters) the report reads for these filters"""
+        query = self.query(db, filters) if callable(self.query) else self.query
+        params = self.params(filters) if self.params else None
+        return query, params
+
+    def run(self, db, filters):
+        """Query and compute (no caching - use results(db).get for that)"""
+        query, params = self.source(db, filters)
+        rows, summary = self.compute(db.iter_rows(query, params), filters, db)
+        return ReportResult(self, filters, [self.record._make(r) for r in rows], summary)
+
+
+class ReportResult:
+    """Rows (records with the definition's fields) and summary values of one report run"""
+    def __init__(self, definition, filters, rows, summary):
+        self.definition = definition
+        self.filters = filters
+        self.rows = rows
+        self.summary = summary
+        self.generated = datetime.now()
+        self.created = time.monotonic()
+
+    @property
+    def title(self):
+        return self.definition.title
+
+    @property
+    def headings(self):
+        return self.definition.headings
+
+    @property
+    def description(self):
+        """Columns as a cursor description (name, type code), e.g. for export headers"""
+        return [(field, None) for field in self.definition.fields]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def table(self):
+        """
+        The result as a plain table (picklable - no definition or functions),
+        e.g. to send it back from a worker process
+        """
+        return {"name": self.definition.name, "fields": self.definition.fields,
+                "headings": self.definition.headings, "rows": [tuple(r) for r in self.rows],
+                "summary": self.summary, "generated": self.generated}
+
+    @classmethod
+    def from_table(cls, definition, filters, table):
+        """Rebuild a result of definition from table()"""
+        result = cls(definition, filters, [definition.record._make(r) for r in table["rows"]],
+                     table["summary"])
+        result.generated = table["generated"]
+        return result
+
+    def display(self, row):
+        """Row values as text for table views (None shows as empty)"""
+        values = []
+        for value, spec in zip(row, self.definition.formats):
+            if value is None:
+                values.append("")
+            elif spec:
+                try:
+                    values.append(format(value, spec))
+                except (TypeError, ValueError):  # e.g. free text in a date column
+                    values.append(str(value))
+            else:
+                values.append(value)
+        return tuple(values)
+
+
+class ReportCache:
+    """
+    Report results keyed by (report type, filters, data version). Any write
+    through the connection bumps db.data_version, so a cached result is only
+    reused while the data it was computed from is unchanged.
+    """
+    def __init__(self, db, ttl=300, max_size=16):
+        """
+        :param db: DatabaseConnection the reports read
+        :param ttl: Seconds a result is kept (catches writes by other programs)
+        :param max_size: Results kept (least recently used are dropped)
+        """
+        self.db = db
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+
+    def peek(self, definition, filters=None):
+        """Cached result of a report, or None (nothing is computed)"""
+        key = (definition.name, tuple(sorted(dict(filters or {}).items())), self.db.data_version)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None and time.monotonic() - result.created <= self.ttl:
+                self._results.move_to_end(key)
+                return result
+        return None
+
+    def get(self, definition, filters=None, run=None):
+        """
+        Cached result of a report, computed on a miss
+        :param run: Optional function(definition, filters) -> ReportResult used on
+                    a miss instead of running it here (e.g. ReportService.run)
+        """
+        filters = dict(filters or {})
+        key = (definition.name, tuple(sorted(filters.items())), self.db.data_version)
+        result = self.peek(definition, filters)
+        if result is not None:
+            return result
+        # Computed outside the lock so other reports are not held up
+        result = run(definition, filters) if run else definition.run(self.db, filters)
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+        return result
+
+    def invalidate(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._results.clear()
+
+
+# One cache per database connection, shared by every report view
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+def results(db):
+    """Shared report cache for this database connection"""
+    with _caches_lock:
+        if db not in _caches:
+            _caches[db] = ReportCache(db)
+        return _caches[db]
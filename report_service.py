@@ -0,0 +1,187 @@
+import contextlib
+import importlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import report_model
+
+# Seconds a report may run before it is stopped
+DEFAULT_TIMEOUT = 300
+
+
+class ReportTimeout(Exception):
+    """A report did not finish within its timeout (it has been cancelled)"""
+
+
+# ========== WORKER PROCESS ==========
+# Every worker opens its own connection to the same database; the report is
+# looked up by name in the REPORTS dict of the module that defines it, so
+# only (module, name, filters) and the resulting table cross processes
+
+_db = None
+
+def _init_worker(db_class, db_path, backend):
+    global _db
+    with contextlib.redirect_stdout(io.StringIO()):  # no "connected" line per worker
+        # Two connections: a compute function may query while iter_rows is open
+        _db = db_class(db_path, backend, pool_size=2)
+
+def _run_report(module, name, filters):
+    definition = importlib.import_module(module).REPORTS[name]
+    return definition.run(_db, filters).table()
+
+
+# ========== SERVICE ==========
+
+class ReportJob:
+    """A report submitted to a ReportService"""
+    def __init__(self, service, definition, filters, timeout):
+        self.service = service
+        self.definition = definition
+        self.filters = filters
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.cancelled = False
+        self._future = None
+
+    def done(self):
+        return self.cancelled or self._future.done()
+
+    def cancel(self):
+        """
+        Stop the report: a queued one is dropped, a running one is stopped
+        with its worker process (left to finish unseen when other reports
+        share the pool at that moment)
+        """
+        if self.cancelled or self._future.done():
+            return
+        self.cancelled = True
+        if not self._future.cancel():
+            self.service._stop(self)
+
+    def result(self):
+        """
+        Wait for the ReportResult (blocks the calling thread)
+        :raises ReportTimeout: past the job's deadline (the job is cancelled)
+        :raises CancelledError: the job was cancelled
+        """
+        while True:
+            if self.cancelled:
+                raise CancelledError()
+            future = self._future
+            wait = None
+            if self.deadline is not None:
+                wait = max(self.deadline - time.monotonic(), 0)
+            try:
+                table = future.result(wait)
+            except TimeoutError:
+                self.cancel()
+                raise ReportTimeout(f"{self.definition.title} did not finish in time")
+            except (BrokenProcessPool, CancelledError):
+                if self._future is not future or self.cancelled:
+                    continue  # resubmitted after another job stopped the pool, or cancelled
+                raise
+            return report_model.ReportResult.from_table(self.definition, self.filters, table)
+
+
+class ReportService:
+    """
+    Runs report definitions in a pool of worker processes, so heavy reports
+    use every core and never hold up the UI thread or the console prompt.
+    Jobs can be cancelled, time out, and come back as tables that are
+    rebuilt into ReportResults for the caller.
+    """
+    def __init__(self, db, workers=None, timeout=DEFAULT_TIMEOUT):
+        """
+        :param db: DatabaseConnection whose database the workers open
+        :param workers: Worker processes (default: one per CPU, at most 4)
+        :param timeout: Default seconds per report (None = no limit)
+        """
+        self.db_args = (type(db), db.db_path, db.backend.name)
+        self.workers = workers or min(os.cpu_count() or 1, 4)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pool = None
+        self._jobs = []
+
+    def submit(self, definition, filters=None, timeout=None):
+        """
+        Queue a report and return its ReportJob at once
+        :param definition: ReportDefinition listed in its module's REPORTS dict
+        :param timeout: Seconds for this report (default: the service timeout)
+        """
+        job = ReportJob(self, definition, dict(filters or {}), timeout or self.timeout)
+        with self._lock:
+            self._jobs = [j for j in self._jobs if not j.done()]
+            self._jobs.append(job)
+            self._submit(job)
+        return job
+
+    def run(self, definition, filters=None, timeout=None):
+        """Run a report and wait for its result (an interrupt cancels it)"""
+        job = self.submit(definition, filters, timeout)
+        try:
+            return job.result()
+        except BaseException:
+            job.cancel()
+            raise
+
+    def shutdown(self):
+        """Cancel every job and stop the worker processes"""
+        with self._lock:
+            for job in self._jobs:
+                job.cancelled = True
+            self._jobs = []
+            if self._pool is not None:
+                self._terminate(self._pool, wait=True)
+                self._pool = None
+
+    def _submit(self, job):
+        if self._pool is None:
+            # Spawned workers: forking a process that runs Tk and worker threads is unsafe
+            self._pool = ProcessPoolExecutor(self.workers, multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker, initargs=self.db_args)
+        job._future = self._pool.submit(_run_report, job.definition.compute.__module__,
+                                        job.definition.name, job.filters)
+
+    def _stop(self, job):
+        with self._lock:
+            others = [j for j in self._jobs
+                      if j is not job and not j.done() and j._future.running()]
+            if others:
+                return  # can't stop one worker of a pool - its result is dropped
+            # Start a new pool for the queued jobs, then stop the old one's workers
+            old, self._pool = self._pool, None
+            for j in self._jobs:
+                if j is not job and not j.done():
+                    self._submit(j)
+            self._terminate(old)
+
+    def _terminate(self, pool, wait=False):
+        # ProcessPoolExecutor has no way to stop a running task, so its worker
+        # processes are terminated (_processes is the pid -> Process map)
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        if wait:
+            pool.shutdown(wait=True, cancel_futures=True)
+            return
+        # Collecting the workers takes a moment - not on the caller's (Tk) thread
+        threading.Thread(target=pool.shutdown, kwargs={"wait": True, "cancel_futures": True},
+                         daemon=True).start()
+
+
+# One service per database connection, started on first use
+_services = weakref.WeakKeyDictionary()
+_services_lock = threading.Lock()
+
+def service(db):
+    """Shared report service for this database connection"""
+    with _services_lock:
+        if db not in _services:
+            _services[db] = ReportService(db)
+        return _services[db]
@@ -0,0 +1,79 @@
+from array import array
+
+
+class SearchIndex:
+    """
+    In-memory substring index for live search. Each entry is a key plus its
+    searchable text; search() returns the keys of matching entries in the
+    order they were added. Terms of three or more characters are looked up
+    through a trigram index, shorter ones by scanning the lowercased texts.
+    """
+    def __init__(self):
+        self.keys = []
+        self.texts = []
+        self.grams = {}  # trigram -> array of entry positions (ascending)
+        self._last_term = None
+        self._last_hits = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def build(self, entries):
+        """Index (key, text) pairs, replacing anything indexed before"""
+        self.keys = []
+        self.texts = []
+        self.grams = {}
+        for key, text in entries:
+            self.add(key, text)
+
+    def add(self, key, text):
+        """Append one entry"""
+        position = len(self.keys)
+        text = text.lower()
+        self.keys.append(key)
+        self.texts.append(text)
+        grams = self.grams
+        for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            postings = grams.get(gram)
+            if postings is None:
+                postings = grams[gram] = array("I")
+            postings.append(position)
+        self._last_term = None
+
+    def search(self, term):
+        """Keys whose text contains term (case-insensitive)"""
+        return [self.keys[p] for p in self.positions(term)]
+
+    def positions(self, term):
+        """Entry positions whose text contains term, ascending"""
+        term = term.lower()
+        if not term:
+            return list(range(len(self.keys)))
+
+        if self._last_term and term.startswith(self._last_term):
+            # Typing another character can only narrow the previous result
+            candidates = self._last_hits
+        elif len(term) >= 3:
+            candidates = self._trigram_candidates(term)
+        else:
+            candidates = range(len(self.texts))
+
+        texts = self.texts
+        hits = [p for p in candidates if term in texts[p]]
+        self._last_term, self._last_hits = term, hits
+        return hits
+
+    def _trigram_candidates(self, term):
+        postings = []
+        for gram in {term[i:i + 3] for i in range(len(term) - 2)}:
+            found = self.grams.get(gram)
+            if found is None:
+                return []
+            postings.append(found)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            candidates.intersection_update(other)
+            if not candidates:
+                return []
+        return sorted(candidates)
@@ -0,0 +1,499 @@
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime
+
+try:
+    import pyodbc
+except ImportError:  # Only the Access backend needs pyodbc
+    pyodbc = None
+
+# Default locations for each backend (override with GRADE_DB_PATH)
+DEFAULT_ACCESS_PATH = r"D:\Documents\DBMS\Assignment-Python.accdb"
+DEFAULT_SQLITE_PATH = "grade_system.db"
+
+# Environment variables used to pick the backend without code changes
+BACKEND_ENV = "GRADE_DB_BACKEND"
+PATH_ENV = "GRADE_DB_PATH"
+
+
+# ========== ROW MAPPING ==========
+
+_record_classes = {}
+
+def record_class(columns):
+    """Return a cached namedtuple class for a tuple of column names"""
+    cls = _record_classes.get(columns)
+    if cls is None:
+        cls = namedtuple("Record", columns, rename=True)
+        # The classes are made at run time, so records pickle as (columns, values)
+        # and are rebuilt from this cache (e.g. by a report worker process)
+        cls.__reduce__ = lambda self, columns=columns: (_rebuild_record, (columns, tuple(self)))
+        _record_classes[columns] = cls
+    return cls
+
+def _rebuild_record(columns, values):
+    return record_class(columns)._make(values)
+
+def make_records(description, rows):
+    """Map driver rows to the cached record class for this result shape"""
+    cls = record_class(tuple(c[0] for c in description))
+    if rows and type(rows[0]) is cls:
+        return rows  # already mapped by the connection's row factory
+    return list(map(cls._make, rows))
+
+def record_factory(cursor, row):
+    """sqlite3 row factory giving pyodbc-style rows (row[0] and row.name)"""
+    columns = tuple(c[0] for c in cursor.description)
+    return record_class(columns)._make(row)
+
+
+# ========== SQLITE TYPE CONVERSION ==========
+
+def _convert_date(value):
+    """Parse DATE columns, keeping free-text values entered by users"""
+    text = value.decode()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return text
+
+def _convert_datetime(value):
+    """Parse DATETIME columns, keeping free-text values entered by users"""
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+
+# ========== BACKENDS ==========
+
+# Leading SELECT (and DISTINCT) of a query, where Access puts TOP n
+_SELECT = re.compile(r"^\s*SELECT\s+(DISTINCT\s+)?", re.IGNORECASE)
+
+class AccessBackend:
+    """Microsoft Access database through the ODBC driver (Windows only)"""
+    name = "access"
+    # The Access driver does not support ODBC parameter arrays
+    fast_executemany = False
+
+    def __init__(self, db_path=None, schema=None):
+        self.db_path = db_path or DEFAULT_ACCESS_PATH
+        self.conn_string = (
+            r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
+            f"DBQ={self.db_path};"
+        )
+
+    def connect(self):
+        """Open a new DB-API connection"""
+        if pyodbc is None:
+            raise RuntimeError("pyodbc is not installed - the Access backend is unavailable")
+        return pyodbc.connect(self.conn_string)
+
+    def setup(self, conn):
+        """Tables are managed inside the Access file itself"""
+        pass
+
+    def top_n(self, query, n):
+        """Limit a SELECT to its first n rows (Access: SELECT TOP n ...)"""
+        return _SELECT.sub(lambda m: f"{m.group(0)}TOP {int(n)} ", query, count=1)
+
+
+class SQLiteBackend:
+    """Embedded SQLite database (runs anywhere, used for servers and CI)"""
+    name = "sqlite"
+    # sqlite3's executemany already binds each row to one prepared statement
+    fast_executemany = False
+
+    def __init__(self, db_path=None, schema=None):
+        self.db_path = db_path or DEFAULT_SQLITE_PATH
+        self.schema = schema or []
+
+    def connect(self):
+        """Open a new DB-API connection"""
+        conn = sqlite3.connect(self.db_path,
+                               detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=False,
+                               cached_statements=256)
+        conn.row_factory = record_factory
+        # WAL lets readers run while a writer commits
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def setup(self, conn):
+        """Create tables and indexes that do not exist yet"""
+        for statement in self.schema:
+            conn.execute(statement)
+        conn.commit()
+
+    def top_n(self, query, n):
+        """Limit a SELECT to its first n rows (SQLite: ... LIMIT n)"""
+        return f"{query.rstrip().rstrip(';')}\nLIMIT {int(n)}"
+
+
+BACKENDS = {
+    AccessBackend.name: AccessBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+def get_backend(name=None, db_path=None, schema=None):
+    """
+    Build the configured storage backend
+    :param name: "access" or "sqlite" (default: $GRADE_DB_BACKEND, then "access")
+    :param db_path: Database file (default: $GRADE_DB_PATH, then the backend default)
+    :param schema: CREATE statements run by backends that manage their own tables
+    """
+    name = (name or os.environ.get(BACKEND_ENV) or AccessBackend.name).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown database backend: {name}")
+    db_path = db_path or os.environ.get(PATH_ENV)
+    return BACKENDS[name](db_path, schema)
+
+
+# ========== PREPARED STATEMENTS ==========
+
+class StatementStats:
+    """Hit/miss counters per SQL statement, shared by every pooled connection"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, query, hit):
+        key = " ".join(query.split())
+        with self._lock:
+            entry = self.counts.setdefault(key, [0, 0])
+            if hit:
+                entry[0] += 1
+                self.hits += 1
+            else:
+                entry[1] += 1
+                self.misses += 1
+
+    def top(self, limit=10):
+        """Most executed statements as (sql, hits, misses), busiest first"""
+        with self._lock:
+            items = [(sql, h, m) for sql, (h, m) in self.counts.items()]
+        items.sort(key=lambda item: item[1] + item[2], reverse=True)
+        return items[:limit]
+
+
+class StatementCache:
+    """
+    LRU of prepared statements for one connection, keyed by SQL text.
+    Each statement keeps its own cursor; executing the same SQL again on that
+    cursor lets the driver reuse the prepared statement instead of parsing
+    and preparing it again.
+    """
+    def __init__(self, raw, capacity, stats):
+        self.raw = raw
+        self.capacity = capacity
+        self.stats = stats
+        self._cursors = OrderedDict()
+
+    def cursor(self, query):
+        """Cursor prepared for this SQL text"""
+        cursor = self._cursors.get(query)
+        if cursor is not None:
+            self._cursors.move_to_end(query)
+            self.stats.record(query, hit=True)
+            return cursor
+        self.stats.record(query, hit=False)
+        cursor = self.raw.cursor()
+        self._cursors[query] = cursor
+        if len(self._cursors) > self.capacity:
+            _, oldest = self._cursors.popitem(last=False)
+            self._close(oldest)
+        return cursor
+
+    def discard(self, query):
+        """Forget a statement whose cursor failed"""
+        cursor = self._cursors.pop(query, None)
+        if cursor is not None:
+            self._close(cursor)
+
+    def _close(self, cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+# ========== CONNECTION POOL ==========
+
+class PooledConnection:
+    """A DB-API connection owned by a ConnectionPool"""
+    def __init__(self, raw, statements):
+        self.raw = raw
+        self.statements = statements
+        self.last_used = time.monotonic()
+
+    def __getattr__(self, name):
+        # cursor(), commit(), rollback(), ... go straight to the driver
+        return getattr(self.raw, name)
+
+
+class ConnectionPool:
+    """Bounded pool of connections with per-thread pinning and health checks"""
+    def __init__(self, backend, size=4, timeout=30, idle_check=60, statement_cache_size=64):
+        """
+        :param backend: Storage backend that opens the connections
+        :param size: Maximum number of open connections
+        :param timeout: Seconds to wait for a free connection
+        :param idle_check: Ping connections idle for longer than this (seconds)
+        :param statement_cache_size: Prepared statements kept per connection
+        """
+        self.backend = backend
+        self.size = size
+        self.statement_cache_size = statement_cache_size
+        self.statement_stats = StatementStats()
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+        self.closed = False
+
+    def checkout(self):
+        """Take a healthy connection, opening a new one if none is idle"""
+        if self.closed:
+            raise RuntimeError("Connection pool is closed")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No database connection free after {self.timeout}s")
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._open()
+                if time.monotonic() - conn.last_used < self.idle_check or self.ping(conn):
+                    return conn
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, conn, broken=False):
+        """Return a connection; broken ones are closed instead of reused"""
+        if broken or self.closed:
+            self._discard(conn)
+        else:
+            conn.last_used = time.monotonic()
+            self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def lease(self):
+        """Use the thread's pinned connection, or check one out for a with-block"""
+        conn = self.pinned()
+        if conn is not None:
+            yield conn
+            return
+        with self.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with-block"""
+        conn = self.checkout()
+        broken = False
+        try:
+            yield conn
+        except Exception:
+            broken = not self.ping(conn)
+            raise
+        finally:
+            self.checkin(conn, broken)
+
+    def ping(self, conn):
+        """Health check - True if the connection still answers"""
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _open(self):
+        raw = self.backend.connect()
+        statements = StatementCache(raw, self.statement_cache_size, self.statement_stats)
+        return PooledConnection(raw, statements)
+
+    def _discard(self, conn):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+
+    # ---------- per-thread connections ----------
+
+    def pinned(self):
+        """Connection pinned to the calling thread, or None"""
+        return getattr(self._local, "conn", None)
+
+    def pin(self):
+        """Pin a connection to the calling thread until unpin()"""
+        conn = self.pinned()
+        if conn is None:
+            conn = self.checkout()
+            self._local.conn = conn
+            self._local.cursor = None
+            self._local.depth = 0
+        return conn
+
+    def thread_cursor(self):
+        """Cursor owned by the calling thread (on its pinned connection)"""
+        conn = self.pin()
+        if self._local.cursor is None:
+            self._local.cursor = conn.cursor()
+        return self._local.cursor
+
+    def unpin(self, broken=False):
+        """Give the calling thread's pinned connection back to the pool"""
+        conn = self.pinned()
+        if conn is None:
+            return
+        if self._local.cursor is not None:
+            try:
+                self._local.cursor.close()
+            except Exception:
+                pass
+        self._local.conn = None
+        self._local.cursor = None
+        self.checkin(conn, broken)
+
+    def in_transaction(self):
+        """True inside a transaction() block on the calling thread"""
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextmanager
+    def transaction(self):
+        """
+        Pin a connection and commit once when the outermost block exits.
+        Any exception rolls the whole transaction back.
+        """
+        owner = self.pinned() is None
+        conn = self.pin()
+        self._local.depth += 1
+        try:
+            yield conn
+            if self._local.depth == 1:
+                conn.commit()
+        except Exception:
+            if self._local.depth == 1:
+                conn.rollback()
+            raise
+        finally:
+            self._local.depth -= 1
+            if owner:
+                self.unpin(broken=not self.ping(conn))
+
+    def run(self, work):
+        """
+        Run work(conn) on the thread's pinned connection or a checked-out one.
+        A connection that fails its health check afterwards is replaced and
+        the work retried once.
+        """
+        for attempt in (1, 2):
+            conn = self.pinned()
+            pinned = conn is not None
+            if not pinned:
+                conn = self.checkout()
+            broken = False
+            try:
+                return work(conn)
+            except Exception:
+                broken = not self.ping(conn)
+                # Never replay half a transaction on a fresh connection
+                if not broken or attempt == 2 or self.in_transaction():
+                    raise
+                print("Database connection lost - reconnecting...", file=sys.stderr)
+            finally:
+                if pinned and broken:
+                    self.unpin(broken=True)
+                elif not pinned:
+                    self.checkin(conn, broken)
+
+    def close(self):
+        """Close this thread's connection and every idle one"""
+        self.unpin()
+        self.closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+# ========== BATCHED WRITES ==========
+
+class BatchResult:
+    """Outcome of a batched write: rows written plus (row number, row, error) per rejected row"""
+    def __init__(self):
+        self.succeeded = 0
+        self.failed = []
+
+    @property
+    def total(self):
+        return self.succeeded + len(self.failed)
+
+    def __repr__(self):
+        return f"<BatchResult {self.succeeded} written, {len(self.failed)} failed>"
+
+
+def chunked(rows, size):
+    """Split any iterable into lists of at most size rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_batch(conn, query, chunk, start, result, commit=True, fast=False):
+    """
+    Write one chunk with executemany and commit it. If the chunk fails it is
+    rolled back and replayed row by row so only the bad rows are rejected.
+    Inside an outer transaction (commit=False) a failing chunk is re-raised.
+    """
+    cursor = conn.cursor()
+    try:
+        if fast:
+            cursor.fast_executemany = True
+        try:
+            cursor.executemany(query, chunk)
+            if commit:
+                conn.commit()
+            result.succeeded += len(chunk)
+            return
+        except Exception:
+            if not commit:
+                raise
+            conn.rollback()
+
+        for offset, row in enumerate(chunk):
+            try:
+                cursor.execute(query, row)
+                result.succeeded += 1
+            except Exception as e:
+                result.failed.append((start + offset, row, str(e)))
+        conn.commit()
+    finally:
+        cursor.close()
@@ -1,12 +1,54 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from tkinter import font
+import background_loader
+import bulk_import
+import dashboard
+import entity_cache
+import search_index
+import table_sort
+import virtual_tree
+
+# Above this many students the table switches to a virtual list that only
+# creates tree items for the visible rows and pages data in by student ID
+VIRTUAL_THRESHOLD = 5000
+
+# Quick search waits this long after the last keystroke before filtering
+SEARCH_DELAY_MS = 150
+
+# Table columns and the database columns used to sort them in virtual mode
+SORT_COLUMNS = {
+    "ID": "studentID", "First Name": "firstName", "Last Name": "lastName",
+    "Gender": "gender", "DOB": "dateOfbirth", "Contact": "contact",
+    "Address": "address", "Major": "major", "Status": "status"
+}
+
+# CSV import: tblStudent columns (the table headings work as CSV headers too)
+IMPORT_SPEC = bulk_import.ImportSpec("tblStudent", [
+    bulk_import.Column("firstName", required=True),
+    bulk_import.Column("lastName", required=True),
+    bulk_import.Column("gender", bulk_import.gender),
+    bulk_import.Column("dateOfbirth", bulk_import.date_value, aliases=("DOB", "Birth Date")),
+    bulk_import.Column("contact", aliases=("Phone", "Email")),
+    bulk_import.Column("address"),
+    bulk_import.Column("major"),
+    bulk_import.Column("status", bulk_import.one_of("Active", "Inactive"), default="Active"),
+])
 
 class StudentManager:
     def __init__(self, parent_frame, db_connection):
         self.parent = parent_frame
         self.db = db_connection
+        self.students = entity_cache.students(db_connection)  # Shared student records
+        self.dashboard = dashboard.snapshot(db_connection)  # Reports tab counters
         self.all_items_cache = []  # Keep track of all tree items
+        self.virtual = None  # VirtualTreeview while in virtual list mode
+        self.virtual_all_keys = []  # Every student ID (virtual mode)
+        self.virtual_rank = None  # Student ID -> position in virtual_all_keys
+        self.search_index = None  # SearchIndex over the loaded students
+        self.index_job = None  # loader generation building the virtual mode index
+        self.visible_items = []  # Tree items currently attached (table mode)
+        self.search_job = None  # Pending debounced search
         self.create_widgets()
     
     def create_widgets(self):
@@ -41,8 +83,10 @@ class StudentManager:
                  bg="#e74c3c", fg="white", **btn_style).grid(row=0, column=3, padx=2)
         tk.Button(btn_frame, text="Sort ID", command=self.sort_by_id,
                  bg="#9b59b6", fg="white", **btn_style).grid(row=0, column=4, padx=2)
-        tk.Button(btn_frame, text="Refresh", command=self.load_all_students,
+        tk.Button(btn_frame, text="Refresh", command=self.refresh,
                  bg="#3498db", fg="white", **btn_style).grid(row=0, column=5, padx=2)
+        tk.Button(btn_frame, text="Import CSV", command=self.import_csv,
+                 bg="#16a085", fg="white", **btn_style).grid(row=0, column=6, padx=2)
         
         # Search entry
         search_frame = tk.Frame(self.parent)
@@ -68,7 +112,7 @@ class StudentManager:
                        background="#ecf0f1")
         
         # Create vertical scrollbar
-        tree_scroll_y = tk.Scrollbar(table_frame)
+        self.tree_scroll_y = tree_scroll_y = tk.Scrollbar(table_frame)
         tree_scroll_y.pack(side="right", fill="y")
         
         # Create horizontal scrollbar
@@ -101,6 +145,10 @@ class StudentManager:
         for col in self.tree["columns"]:
             self.tree.column(col, width=column_widths[col], minwidth=50)
             self.tree.heading(col, text=col, anchor="center")
+        
+        # Click a heading to sort by that column
+        self.sorter = table_sort.TableSorter(self.tree, on_sorted=self.on_sorted,
+                                             command=self.sort_column)
                 
                 # Pack treeview
         self.tree.pack(fill="both", expand=True)
@@ -118,64 +166,174 @@ class StudentManager:
         self.status_label.pack(side="left", padx=10)
         
         # ========== LOAD INITIAL DATA ==========
+        self.loader = background_loader.BackgroundLoader(self.parent, self.db)
         self.load_all_students()
     
-    def load_all_students(self):
-        """Load all students into the Treeview"""
+    def load_all_students(self, then=None):
+        """
+        Load all students into the Treeview. The query and formatting run on
+        a worker thread; rows are inserted in chunks as they arrive.
+        :param then: Called once the table is filled
+        """
         # Clear existing items
+        self.loader.cancel()
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         # Clear cache and selection
         self.all_items_cache = []
+        self.visible_items = []
+        self.search_index = None
+        self.sorter.clear()
         self.tree.selection_remove(self.tree.selection())
         
-        # Fetch from database
-        try:
-            query = """
-                SELECT studentID, firstName, lastName, gender, dateOfbirth, 
-                    contact, address, major, status
-                FROM tblStudent
-                ORDER BY lastName, firstName
-            """
-            rows = self.db.fetch_all(query)
-            
-            if not rows:
+        self.update_status("Loading students...")
+        self.loader.run(self.count_students,
+                        lambda count: self.on_student_count(count, then),
+                        self.on_load_error)
+    
+    def count_students(self):
+        """Number of students (worker thread)"""
+        result = self.db.fetch_one("SELECT COUNT(*) FROM tblStudent")
+        return result[0] if result else 0
+    
+    def on_student_count(self, count, then):
+        """Pick the table mode for this many students and start streaming rows"""
+        if count > VIRTUAL_THRESHOLD:
+            self.load_virtual_students(then)
+            return
+        if self.virtual:
+            self.virtual.detach()
+            self.virtual = None
+        
+        def produce():
+            # Fetch from the shared cache (hits the database only on first use)
+            rows = sorted(self.students.all(),
+                          key=lambda r: (r.lastName or "", r.firstName or ""))
+            for row in rows:
+                yield self.format_row(row), self.search_text(row)
+        
+        def on_chunk(rows):
+            # Insert into treeview, indexing each row for quick search
+            for values, text in rows:
+                item_id = self.tree.insert("", "end", values=values)
+                self.all_items_cache.append(item_id)
+                self.visible_items.append(item_id)
+                self.search_index.add(item_id, text)
+                self.sorter.add(item_id, values)
+            self.update_status(f"Loading students... {len(self.all_items_cache)} of {count}")
+        
+        def on_done(total):
+            if not total:
                 # Show empty message
                 item_id = self.tree.insert("", "end", values=("No data", "", "", "", "", "", "", "", ""))
                 self.all_items_cache.append(item_id)
+                self.search_index = None
                 self.update_status("No students found in database")
-                return
-            
-            # Insert into treeview
-            for row in rows:
-                # Format date
-                dob = ""
-                if row.dateOfbirth:
-                    if hasattr(row.dateOfbirth, 'strftime'):
-                        dob = row.dateOfbirth.strftime("%Y-%m-%d")
-                    else:
-                        dob = str(row.dateOfbirth)
-                
-                item_id = self.tree.insert("", "end", values=(
-                    row.studentID, 
-                    row.firstName or "",
-                    row.lastName or "",
-                    row.gender or "",
-                    dob,
-                    row.contact or "",
-                    row.address or "",
-                    row.major or "",
-                    row.status or ""
-                ))
-                self.all_items_cache.append(item_id)
-            
-            # Update status
-            self.update_status(f"Loaded {len(rows)} student(s)")
-            
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Failed to load students:\n{str(e)}")
-            self.update_status("Error loading students", error=True)
+            else:
+                self.update_status(f"Loaded {total} student(s)")
+                # Keep an active sort and quick search applied after reloading
+                self.sorter.resort()
+                if self.search_var.get():
+                    self.apply_search()
+            if then:
+                then()
+        
+        self.search_index = search_index.SearchIndex()
+        self.loader.stream(produce, on_chunk, on_done, self.on_load_error)
+    
+    def on_load_error(self, error):
+        messagebox.showerror("Database Error", f"Failed to load students:\n{str(error)}")
+        self.update_status("Error loading students", error=True)
+    
+    def format_row(self, row):
+        """Treeview values for a student record"""
+        # Format date
+        dob = ""
+        if row.dateOfbirth:
+            if hasattr(row.dateOfbirth, 'strftime'):
+                dob = row.dateOfbirth.strftime("%Y-%m-%d")
+            else:
+                dob = str(row.dateOfbirth)
+        
+        return (
+            row.studentID, 
+            row.firstName or "",
+            row.lastName or "",
+            row.gender or "",
+            dob,
+            row.contact or "",
+            row.address or "",
+            row.major or "",
+            row.status or ""
+        )
+    
+    def search_text(self, row):
+        """Text matched by quick search: ID, name, major, contact and status"""
+        fields = (row.studentID, row.firstName, row.lastName,
+                  row.major, row.contact, row.status)
+        return " ".join(str(v) for v in fields if v)
+    
+    # ========== VIRTUAL LIST MODE ==========
+    
+    def load_virtual_students(self, then=None, keep_position=True):
+        """Show a large table as a virtual list in the current sort order"""
+        # The database sorts the keys (ID order unless a heading was clicked)
+        order = "studentID"
+        if self.sorter.column is not None:
+            direction = " DESC" if self.sorter.descending else ""
+            order = f"{SORT_COLUMNS[self.sorter.column]}{direction}, studentID"
+        
+        def load_keys():
+            # Only the keys are loaded up front; rows are fetched per page
+            return [row[0] for row in self.db.iter_rows(
+                f"SELECT studentID FROM tblStudent ORDER BY {order}", batch_size=5000)]
+        
+        def on_done(keys):
+            self.virtual_all_keys = keys
+            self.virtual_rank = None
+            if self.virtual is None:
+                # Pages are fetched on their own worker thread, off the Tk thread
+                self.virtual = virtual_tree.VirtualTreeview(
+                    self.tree, self.tree_scroll_y, self.fetch_student_page,
+                    loader=background_loader.BackgroundLoader(self.parent, self.db),
+                    on_error=self.on_page_error)
+            self.virtual.set_keys(self.virtual_all_keys, keep_position=keep_position)
+            sorted_by = self.sorter.column or "ID"
+            self.update_status(f"Loaded {len(self.virtual_all_keys)} student(s) - "
+                               f"virtual list ordered by {sorted_by}")
+            if self.search_var.get():
+                self.apply_search()
+            if then:
+                then()
+        
+        self.update_status("Loading student IDs...")
+        self.loader.run(load_keys, on_done, self.on_load_error)
+    
+    def fetch_student_page(self, keys):
+        """Treeview values for a page of student IDs (None for missing rows; worker thread)"""
+        if not keys:
+            return []
+        low, high = min(keys), max(keys)
+        if high - low < 2 * len(keys):
+            # Dense run of IDs: keyset range scan on the primary key
+            query = entity_cache.STUDENT_QUERY + " WHERE studentID >= ? AND studentID <= ?"
+            rows = self.db.iter_rows(query, (low, high))
+        else:
+            placeholders = ", ".join("?" * len(keys))
+            query = entity_cache.STUDENT_QUERY + f" WHERE studentID IN ({placeholders})"
+            rows = self.db.iter_rows(query, list(keys))
+        by_id = {row.studentID: row for row in rows}
+        return [self.format_row(by_id[key]) if key in by_id else None for key in keys]
+    
+    def on_page_error(self, error):
+        self.update_status(f"Error loading students: {error}", error=True)
+    
+    def refresh(self):
+        """Reload students from the database, bypassing the cache"""
+        self.students.invalidate()
+        self.dashboard.invalidate()
+        self.load_all_students()
     
     def update_status(self, message, error=False):
         """Update status bar"""
@@ -184,52 +342,126 @@ class StudentManager:
     
     def sort_by_id(self):
         """Sort students by ID (small to big)"""
+        self.sort_column("ID")
+    
+    def sort_column(self, column, descending=False):
+        """Sort the table by a column (heading click)"""
         try:
-            items_data = []
-            for item_id in self.all_items_cache:
-                values = self.tree.item(item_id)["values"]
-                if values and values[0] != "No data":
-                    try:
-                        student_id = int(values[0])
-                        items_data.append((student_id, item_id, values))
-                    except ValueError:
-                        pass
-            
-            items_data.sort(key=lambda x: x[0])
-            
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            for _, item_id, values in items_data:
-                self.tree.insert("", "end", values=values)
+            direction = "descending" if descending else "ascending"
+            if self.virtual:
+                # Too many rows to hold - the database sorts the keys
+                self.sorter.mark(column, descending)
+                self.load_virtual_students(keep_position=False)
+                return
+            if self.search_index is None:  # nothing loaded
+                return
             
-            self.update_status("Sorted by ID (ascending)")
+            self.sorter.sort_by(column, descending)
+            self.update_status(f"Sorted by {column} ({direction})")
         except Exception as e:
             messagebox.showerror("Sort Error", f"Failed to sort: {str(e)}")
     
+    def on_sorted(self, order):
+        """Keep the item lists in the new sort order"""
+        self.all_items_cache = order
+        self.visible_items = list(self.tree.get_children())
+    
     def on_search_change(self, *args):
-        """Handle search as user types"""
-        search_term = self.search_var.get().lower()
+        """Handle search as user types (filters once typing pauses)"""
+        if self.search_job is not None:
+            self.parent.after_cancel(self.search_job)
+        self.search_job = self.parent.after(SEARCH_DELAY_MS, self.apply_search)
+    
+    def apply_search(self):
+        """Filter the table by the quick search term"""
+        self.search_job = None
+        search_term = self.search_var.get().strip()
         
-        # Detach all items first
-        for item in self.all_items_cache:
-            self.tree.detach(item)
+        if self.virtual:
+            self.filter_virtual_students(search_term)
+            return
+        if self.search_index is None:
+            return
         
+        matches = self.sorter.arrange(self.search_index.search(search_term))
+        self.show_items(matches)
+        if search_term:
+            self.update_status(f"{len(matches)} student(s) match '{search_term}'")
+        else:
+            self.update_status(f"Showing all {len(matches)} student(s)")
+    
+    def show_items(self, items):
+        """Attach exactly these items, in this order, touching only rows that change"""
+        if items == self.visible_items:
+            return
+        wanted = set(items)
+        removed = [item for item in self.visible_items if item not in wanted]
+        shown = set(self.visible_items)
+        added = [(index, item) for index, item in enumerate(items) if item not in shown]
+        
+        if len(removed) + len(added) > len(items) // 2:
+            # Most rows change - one call replaces the whole list
+            self.tree.set_children("", *items)
+        else:
+            if removed:
+                self.tree.detach(*removed)
+            # Remaining rows keep their relative order, so moving each new
+            # row to its final position (in ascending order) rebuilds the list
+            for index, item in added:
+                self.tree.move(item, "", index)
+        self.visible_items = list(items)
+    
+    def filter_virtual_students(self, search_term):
+        """Quick search in virtual mode over an index of the whole table"""
         if not search_term:
-            # If search is empty, reattach all items
-            for item in self.all_items_cache:
-                self.tree.reattach(item, '', 'end')
+            self.virtual.set_keys(self.virtual_all_keys)
+            self.update_status(f"Showing all {len(self.virtual_all_keys)} student(s)")
             return
-        
-        # Reattach only matching items
-        for item in self.all_items_cache:
-            values = self.tree.item(item)["values"]
-            # Convert all values to string for searching
-            all_text = " ".join(str(v) for v in values).lower()
-            
-            if search_term in all_text:
-                self.tree.reattach(item, '', 'end')
-            
+        if self.search_index is None:
+            # Built on first use, on the worker thread; the search runs when it is ready
+            self.update_status("Indexing students for search...")
+            if not self.loader.busy:
+                self.index_virtual_students()
+            elif self.loader.generation != self.index_job:
+                # Another load is running - try again once it has finished
+                self.search_job = self.parent.after(SEARCH_DELAY_MS, self.apply_search)
+            return
+        keys = self.search_index.search(search_term)
+        if self.sorter.column is not None:
+            # The index lists IDs in ID order - follow the table's sort instead
+            if self.virtual_rank is None:
+                self.virtual_rank = {key: i for i, key in enumerate(self.virtual_all_keys)}
+            rank = self.virtual_rank
+            keys.sort(key=lambda key: rank.get(key, len(rank)))
+        self.virtual.set_keys(keys)
+        self.update_status(f"{len(keys)} student(s) match '{search_term}'")
+    
+    def index_virtual_students(self):
+        """Build the quick search index over the whole table (virtual mode)"""
+        query = """
+            SELECT studentID, firstName, lastName, major, contact, status
+            FROM tblStudent ORDER BY studentID
+        """
+        
+        def build():
+            # Only the searchable columns are read
+            index = search_index.SearchIndex()
+            index.build((row.studentID, self.search_text(row))
+                        for row in self.db.iter_rows(query, batch_size=5000))
+            return index
+        
+        def on_done(index):
+            self.search_index = index
+            if self.virtual:
+                self.apply_search()  # with the term typed by now
+        
+        def on_error(e):
+            self.update_status("Search failed", error=True)
+            messagebox.showerror("Error", f"Failed to index students: {str(e)}")
+        
+        self.loader.run(build, on_done, on_error)
+        self.index_job = self.loader.generation  # tells this job from other loads
+    
     def on_tree_double_click(self, event):
         """When user double-clicks a row"""
         selection = self.tree.selection()
@@ -243,12 +475,7 @@ class StudentManager:
     def show_student_details(self, student_id):
         """Show student details in a message box"""
         try:
-            query = """
-                SELECT studentID, firstName, lastName, gender, dateOfbirth, 
-                       contact, address, major, status
-                FROM tblStudent WHERE studentID=?
-            """
-            row = self.db.fetch_one(query, (student_id,))
+            row = self.students.get(student_id)
             
             if row:
                 # Format details
@@ -480,6 +707,8 @@ class StudentManager:
             )
             
             if self.db.execute_query(query, values):
+                self.students.note_insert()
+                self.dashboard.invalidate()
                 messagebox.showinfo("Success", "Student added successfully!")
                 self.update_status("Student added successfully")
             else:
@@ -510,6 +739,8 @@ class StudentManager:
             )
             
             if self.db.execute_query(query, values):
+                self.students.refresh(student_id)
+                self.dashboard.invalidate()
                 messagebox.showinfo("Success", "Student updated successfully!")
                 self.update_status("Student updated successfully")
             else:
@@ -518,11 +749,37 @@ class StudentManager:
         except Exception as e:
             messagebox.showerror("Database Error", str(e))
     
+    def import_csv(self):
+        """Bulk-load students from a CSV file (bad rows go to a rejects file)"""
+        path = filedialog.askopenfilename(title="Import Students",
+                                          filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        
+        def work():
+            result = bulk_import.import_csv(self.db, IMPORT_SPEC, path)
+            self.students.note_insert()
+            self.dashboard.invalidate()
+            return result
+        
+        def on_done(result):
+            messagebox.showinfo("Import Finished", result.summary())
+            self.load_all_students()
+        
+        def on_error(e):
+            messagebox.showerror("Import Error", f"Failed to import students:\n{str(e)}")
+            self.update_status("Import failed", error=True)
+        
+        self.update_status("Importing students...")
+        self.loader.run(work, on_done, on_error)
+    
     def delete_student(self, student_id):
         """Delete a student by ID"""
         try:
             query = "DELETE FROM tblStudent WHERE studentID=?"
             if self.db.execute_query(query, (student_id,)):
+                self.students.invalidate(student_id)
+                self.dashboard.invalidate()
                 messagebox.showinfo("Success", "Student deleted successfully!")
                 self.update_status("Student deleted successfully")
                 self.load_all_students()  # Refresh
@@ -534,12 +791,7 @@ class StudentManager:
     def search_student_by_id(self, student_id):
         """Search for a student by ID"""
         try:
-            query = """
-                SELECT studentID, firstName, lastName, gender, dateOfbirth, 
-                       contact, address, major, status
-                FROM tblStudent WHERE studentID=?
-                """
-            row = self.db.fetch_one(query, (student_id,))
+            row = self.students.get(student_id)
             
             if row:
                 return (f"ID: {row.studentID}\n"
@@ -576,20 +828,25 @@ class StudentManager:
             for item in self.tree.get_children():
                 self.tree.item(item, tags=())
             
-            # Show all rows first
-            self.load_all_students()
-            
-            # Highlight matches
-            for row in rows:
-                for item in self.tree.get_children():
-                    values = self.tree.item(item)["values"]
-                    if values and values[0] == row.studentID:
-                        self.tree.selection_add(item)
-                        self.tree.see(item)  # Scroll to item
-                        break
+            def highlight():
+                if self.virtual:
+                    # Only the visible window exists - jump to the first match
+                    self.virtual.scroll_to_key(rows[0].studentID)
+                else:
+                    # Highlight matches
+                    for row in rows:
+                        for item in self.tree.get_children():
+                            values = self.tree.item(item)["values"]
+                            if values and values[0] == row.studentID:
+                                self.tree.selection_add(item)
+                                self.tree.see(item)  # Scroll to item
+                                break
+                
+                messagebox.showinfo("Search Results", 
+                                  f"Found {len(rows)} student(s) matching '{name}'")
             
-            messagebox.showinfo("Search Results", 
-                              f"Found {len(rows)} student(s) matching '{name}'")
+            # Show all rows first
+            self.load_all_students(then=highlight)
             
         except Exception as e:
             messagebox.showerror("Database Error", str(e))
@@ -0,0 +1,103 @@
+def sort_key(value):
+    """Order numbers numerically and text case-insensitively (numbers first)"""
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    text = str(value)
+    try:
+        return (0, float(text), "")
+    except ValueError:
+        return (1, 0, text.lower())
+
+
+class TableSorter:
+    """
+    Sortable column headings for a ttk.Treeview. Row values are registered
+    with add() as items are inserted, so sorting never reads the tree back;
+    the sorted order of each column is computed once and reused until rows
+    change, and applying it only reorders the existing items.
+    """
+    def __init__(self, tree, on_sorted=None, command=None):
+        """
+        :param tree: Treeview whose headings become clickable
+        :param on_sorted: Called with the new order of all items after a sort
+        :param command: Replaces the default sort for heading clicks,
+                        called as command(column, descending)
+        """
+        self.tree = tree
+        self.on_sorted = on_sorted
+        self.command = command
+        self.values = {}  # item -> values tuple
+        self.orders = {}  # column -> items sorted ascending
+        self.column = None
+        self.descending = False
+        self.columns = list(tree["columns"])
+        self.titles = {col: tree.heading(col, "text") for col in self.columns}
+        for col in self.columns:
+            tree.heading(col, command=lambda c=col: self.on_heading(c))
+
+    def add(self, item, values):
+        """Register the values of an inserted item"""
+        self.values[item] = values
+        self.orders.clear()
+
+    def clear(self):
+        """Forget all items (the table is being reloaded)"""
+        self.values.clear()
+        self.orders.clear()
+
+    def on_heading(self, column):
+        # Clicking the sorted column again reverses it
+        descending = not self.descending if column == self.column else False
+        if self.command:
+            self.command(column, descending)
+        else:
+            self.sort_by(column, descending)
+
+    def order(self, column, descending=False):
+        """Every registered item, sorted by a column"""
+        ascending = self.orders.get(column)
+        if ascending is None:
+            index = self.columns.index(column)
+            values = self.values
+            ascending = sorted(values, key=lambda item: sort_key(values[item][index]))
+            self.orders[column] = ascending
+        return ascending[::-1] if descending else ascending
+
+    def sort_by(self, column, descending=False):
+        """Reorder the attached items by a column; returns the order of all items"""
+        order = self.order(column, descending)
+        attached = set(self.tree.get_children())
+        # One call moves every attached item into place (detached ones stay detached)
+        self.tree.set_children("", *[item for item in order if item in attached])
+        self.mark(column, descending)
+        if self.on_sorted:
+            self.on_sorted(order)
+        return order
+
+    def resort(self):
+        """Apply the current sort again after rows were reloaded"""
+        if self.column is not None and self.values:
+            self.sort_by(self.column, self.descending)
+
+    def arrange(self, items):
+        """Put a subset of items into the current sort order"""
+        if self.column is None:
+            return items
+        wanted = set(items)
+        return [item for item in self.order(self.column, self.descending) if item in wanted]
+
+    def mark(self, column, descending):
+        """Show the sort direction on the heading"""
+        self.column, self.descending = column, descending
+        for col in self.columns:
+            title = self.titles[col]
+            if col == column:
+                title += " ▼" if descending else " ▲"
+            self.tree.heading(col, text=title)
+
+    def unmark(self):
+        """Clear the sort indicator (rows are back in their loaded order)"""
+        self.column = None
+        self.descending = False
+        for col in self.columns:
+            self.tree.heading(col, text=self.titles[col])
@@ -0,0 +1,105 @@
+import tkinter as tk
+
+
+class TextRenderer:
+    """
+    Fills a Text widget with a whole report: the text is built as one buffer
+    and inserted in large chunks scheduled with after(), so a long report
+    never freezes the window. The widget is read-only while it fills.
+    With preview_lines set only the first lines are shown, followed by links
+    that load the next lines or the rest.
+    """
+    def __init__(self, widget, chunk_lines=2000, preview_lines=None):
+        """
+        :param widget: tk.Text to fill
+        :param chunk_lines: Lines inserted per main-loop callback
+        :param preview_lines: Lines shown before "show more" (None = everything)
+        """
+        self.widget = widget
+        self.chunk_lines = chunk_lines
+        self.preview_lines = preview_lines
+        self.lines = []  # every line of the current text
+        self.shown = 0   # lines inserted so far
+        self.limit = 0   # lines to insert before offering more
+        self._job = None
+
+        widget.tag_configure("more_link", foreground="#2980b9", underline=True)
+        widget.tag_bind("more_next", "<Button-1>", lambda e: self.show_more())
+        widget.tag_bind("more_all", "<Button-1>", lambda e: self.show_more(everything=True))
+        widget.tag_bind("more_link", "<Enter>", lambda e: widget.config(cursor="hand2"))
+        widget.tag_bind("more_link", "<Leave>", lambda e: widget.config(cursor=""))
+
+    @property
+    def complete(self):
+        """True when every line is in the widget"""
+        return self.shown >= len(self.lines)
+
+    def show(self, text):
+        """Replace the widget content with text (a string or a list of strings)"""
+        self.cancel()
+        if not isinstance(text, str):
+            text = "".join(text)
+        self.lines = text.splitlines(keepends=True)
+        self.shown = 0
+        self.limit = len(self.lines)
+        if self.preview_lines:
+            self.limit = min(self.preview_lines, self.limit)
+        self.widget.config(state="normal")
+        self.widget.delete("1.0", tk.END)
+        self._fill()
+
+    def clear(self):
+        self.show("")
+
+    def show_more(self, everything=False):
+        """Insert the next preview_lines lines (or all of the rest)"""
+        if self._job is not None or self.complete:
+            return
+        self.widget.config(state="normal")
+        self.widget.delete("more_mark.first", "more_mark.last")
+        if everything or not self.preview_lines:
+            self.limit = len(self.lines)
+        else:
+            self.limit = min(self.limit + self.preview_lines, len(self.lines))
+        self._fill()
+
+    def content(self):
+        """The full text (the widget may still show only part of it)"""
+        if not self.complete:
+            return "".join(self.lines)
+        return self.widget.get("1.0", tk.END)
+
+    def cancel(self):
+        """Stop filling (the lines inserted so far stay)"""
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except tk.TclError:
+                pass
+            self._job = None
+
+    def _fill(self):
+        self._job = None
+        end = min(self.shown + self.chunk_lines, self.limit)
+        try:
+            self.widget.config(state="normal")
+            if end > self.shown:
+                # One insert per chunk - Tk lays the text out once per call
+                self.widget.insert(tk.END, "".join(self.lines[self.shown:end]))
+                self.shown = end
+            if self.shown < self.limit:
+                self.widget.config(state="disabled")
+                self._job = self.widget.after(1, self._fill)
+                return
+            if not self.complete:
+                self._add_more_links()
+        except tk.TclError:  # widget was destroyed
+            self._job = None
+
+    def _add_more_links(self):
+        remaining = len(self.lines) - self.shown
+        step = min(self.preview_lines or remaining, remaining)
+        self.widget.insert(tk.END, f"\n... {remaining} more line(s)  ", "more_mark")
+        self.widget.insert(tk.END, f"[show next {step}]", ("more_mark", "more_link", "more_next"))
+        self.widget.insert(tk.END, "  ", "more_mark")
+        self.widget.insert(tk.END, "[show all]", ("more_mark", "more_link", "more_all"))
@@ -0,0 +1,290 @@
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import aggregation
+import gpa_engine
+
+# Set-based queries (GUI schema): the whole cohort, then every grade of the
+# cohort in one pass ordered by student - {where} takes the cohort filter on s
+STUDENTS_QUERY = """
+    SELECT s.studentID, s.firstName, s.lastName, s.major, s.status
+    FROM tblStudent s{where}
+    ORDER BY s.studentID
+"""
+
+GRADES_QUERY = """
+    SELECT g.studentID, c.courseCode, c.courseName, c.credits, g.grade, g.semester
+    FROM (tblGrade g
+          INNER JOIN tblCourse c ON g.courseID = c.courseID)
+          INNER JOIN tblStudent s ON g.studentID = s.studentID{where}
+    ORDER BY g.studentID, g.semester, c.courseCode
+"""
+
+# Completed student IDs, one per line, so an interrupted run can resume. In
+# combined mode each chunk's IDs are followed by "@<size of transcripts.txt>",
+# and a resumed run cuts the file back to the last recorded size
+MANIFEST = "transcripts.done"
+COMBINED_FILE = "transcripts.txt"
+
+
+# ========== TRANSCRIPT LAYOUT (GUI schema) ==========
+
+def summarize(courses):
+    """
+    Credits attempted / earned, credit-weighted GPA and grade counts of
+    (courseCode, courseName, credits, grade, semester) rows
+    """
+    def credits(c):
+        return float(c[2] or 0)
+
+    def earned(c):
+        return credits(c) if gpa_engine.grade_points(c[3]) > 0 else None
+
+    agg = (aggregation.Aggregator()
+           .measure("attempted", credits)
+           .measure("earned", earned)
+           .measure("gpa", lambda c: gpa_engine.grade_points(c[3]), weight=credits)
+           .count_by("grade", lambda c: c[3] or "No Grade")
+           .consume(courses))
+    return {"courses": agg.rows,
+            "attempted": agg.stats["attempted"].total,
+            "earned": agg.stats["earned"].total,
+            "gpa": agg.stats["gpa"].mean or 0,
+            "grades": agg.counts["grade"]}
+
+
+def format_transcript(student, courses, generated, summary=None):
+    """
+    Official transcript text for one student
+    :param student: dict with studentID, firstName, lastName, major, status
+    :param courses: (courseCode, courseName, credits, grade, semester) rows
+    :param generated: Timestamp text printed at the bottom
+    :param summary: summarize(courses), if already computed
+    """
+    s = summary or summarize(courses)
+    out = [f"""
+            OFFICIAL TRANSCRIPT
+            {'='*50}
+            Student: {student['firstName']} {student['lastName']}
+            Student ID: {student['studentID']}
+            Major: {student['major']}
+            Status: {student['status']}
+
+            {'='*50}
+            COURSE HISTORY
+            {'='*50}
+            """]
+    for code, name, credits, grade, semester in courses:
+        out.append(f"{code or '':10} {name or '':30} {credits or 0:3} "
+                   f"credits  {grade or '':5}  {semester or ''}\n")
+    out.append(f"""
+            {'='*50}
+            ACADEMIC SUMMARY
+            {'='*50}
+            Total Courses: {s['courses']}
+            Total Credits Attempted: {s['attempted']}
+            Total Credits Earned: {s['earned']}
+            Grade Point Average (GPA): {s['gpa']:.2f}
+
+            Generated: {generated}
+            """)
+    return "".join(out)
+
+
+# ========== BATCH JOB ==========
+
+def _format_chunk(format_fn, items, out_dir, generated):
+    """
+    Process-pool worker: format a chunk of students. With out_dir each
+    transcript is written to its own file, otherwise the texts are returned.
+    """
+    done = []
+    for student, courses in items:
+        text = format_fn(student, courses, generated)
+        if out_dir is None:
+            done.append((student["studentID"], text))
+            continue
+        path = os.path.join(out_dir, f"transcript_{student['studentID']}.txt")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(path + ".tmp", path)  # never leave half a transcript behind
+        done.append((student["studentID"], None))
+    return done
+
+
+class TranscriptBatch:
+    """
+    Transcripts for a whole cohort: every student and grade is read with two
+    set-based queries, grouped in memory, and formatted in a process pool.
+    Finished student IDs are recorded in a manifest, so running the same job
+    again resumes where an interrupted run stopped.
+    """
+    def __init__(self, db, out_dir, combined=False, workers=None, chunk_size=200,
+                 format_fn=format_transcript, students_query=STUDENTS_QUERY,
+                 grades_query=GRADES_QUERY):
+        """
+        :param db: DatabaseConnection to read from
+        :param out_dir: Directory for the transcripts and the manifest
+        :param combined: One transcripts.txt instead of a file per student
+        :param workers: Formatting processes (default: one per CPU)
+        :param chunk_size: Students sent to a worker at a time
+        :param format_fn: Module-level function(student dict, course rows, generated) -> text
+        :param students_query: Cohort query (first column studentID, {where} placeholder)
+        :param grades_query: Grades query ordered by studentID (first column studentID)
+        """
+        self.db = db
+        self.out_dir = out_dir
+        self.combined = combined
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.format_fn = format_fn
+        self.students_query = students_query
+        self.grades_query = grades_query
+        self.manifest_path = os.path.join(out_dir, MANIFEST)
+        self.total = 0
+        self.written = 0
+        self.skipped = 0
+
+    def has_previous_run(self):
+        """True when the output directory holds a manifest from an earlier run"""
+        return os.path.exists(self.manifest_path)
+
+    def completed(self):
+        """Student IDs finished by earlier runs"""
+        return self.read_manifest()[0]
+
+    def read_manifest(self):
+        """
+        (finished student IDs, size of the combined file they fill - None
+        when the manifest records no size, i.e. a file per student)
+        """
+        if not self.has_previous_run():
+            return set(), None
+        done, pending, size = set(), [], None
+        with open(self.manifest_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # cut off by a crash
+                line = line.strip()
+                if line.isdigit():
+                    pending.append(int(line))
+                elif line.startswith("@") and line[1:].isdigit():
+                    # The chunk is complete up to here
+                    done.update(pending)
+                    pending = []
+                    size = int(line[1:])
+        if size is None:
+            done.update(pending)
+        return done, size
+
+    def restart(self):
+        """Forget earlier runs (their files are overwritten)"""
+        for name in (MANIFEST, COMBINED_FILE):
+            path = os.path.join(self.out_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def load(self, cohort=None):
+        """
+        (student dict, course rows) for every student of the cohort, in
+        student ID order - two queries whatever the cohort size
+        :param cohort: {column of tblStudent: value}, e.g. {"status": "Active"}
+        """
+        where, params = self.cohort_filter(cohort)
+        students = [dict(zip(row._fields, row))
+                    for row in self.db.iter_rows(self.students_query.format(where=where), params)]
+        courses = {}
+        for row in self.db.iter_rows(self.grades_query.format(where=where), params, batch_size=5000):
+            courses.setdefault(row[0], []).append(tuple(row[1:]))
+        return [(s, courses.get(s["studentID"], [])) for s in students]
+
+    def cohort_filter(self, cohort):
+        if not cohort:
+            return "", None
+        for column in cohort:
+            if not re.fullmatch(r"\w+", column):
+                raise ValueError(f"Invalid cohort column: {column}")
+        where = " WHERE " + " AND ".join(f"s.{column} = ?" for column in cohort)
+        return where, tuple(cohort.values())
+
+    def run(self, cohort=None):
+        """
+        Generate the transcripts, yielding (done, total) after each chunk.
+        Closing the generator (or an error) stops the pool; the manifest
+        keeps what was finished.
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        finished, size = self.read_manifest()
+        items = self.load(cohort)
+        todo = [item for item in items if item[0]["studentID"] not in finished]
+        # Only this cohort's finished students (the manifest may list others)
+        self.skipped = len(items) - len(todo)
+        self.total = len(todo) + self.skipped
+        self.written = 0
+        yield self.skipped, self.total
+        if not todo:
+            return
+
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+        out_dir = None if self.combined else self.out_dir
+        chunks = [todo[i:i + self.chunk_size] for i in range(0, len(todo), self.chunk_size)]
+
+        with open(self.manifest_path, "a", encoding="utf-8") as manifest:
+            combined = None
+            if self.combined:
+                combined = self._open_combined(size, manifest)
+            try:
+                if len(chunks) == 1 or self.workers == 1:
+                    # Not worth starting processes
+                    for chunk in chunks:
+                        self._record(_format_chunk(self.format_fn, chunk, out_dir, generated),
+                                     manifest, combined)
+                        yield self.skipped + self.written, self.total
+                    return
+
+                # Spawned workers: forking a process that runs Tk and worker threads is unsafe
+                pool = ProcessPoolExecutor(max_workers=self.workers,
+                                           mp_context=multiprocessing.get_context("spawn"))
+                try:
+                    # A few chunks in flight per worker; results are taken in
+                    # order so the combined file keeps student ID order
+                    pending = deque()
+                    for chunk in chunks:
+                        pending.append(pool.submit(_format_chunk, self.format_fn, chunk, out_dir, generated))
+                        if len(pending) >= self.workers * 2:
+                            self._record(pending.popleft().result(), manifest, combined)
+                            yield self.skipped + self.written, self.total
+                    while pending:
+                        self._record(pending.popleft().result(), manifest, combined)
+                        yield self.skipped + self.written, self.total
+                finally:
+                    pool.shutdown(wait=True, cancel_futures=True)
+            finally:
+                if combined is not None:
+                    combined.close()
+
+    def _open_combined(self, size, manifest):
+        # Drop transcripts written after the last recorded chunk (a crash
+        # between the two files), so a resumed run does not repeat them
+        path = os.path.join(self.out_dir, COMBINED_FILE)
+        combined = open(path, "a", encoding="utf-8")
+        if size is None:
+            size = 0
+            manifest.write("@0\n")
+            manifest.flush()
+        combined.truncate(min(size, os.path.getsize(path)))
+        return combined
+
+    def _record(self, done, manifest, combined):
+        ids = "".join(f"{student_id}\n" for student_id, _ in done)
+        if combined is not None:
+            combined.writelines(text + "\f\n" for _, text in done)  # page break between students
+            combined.flush()
+            ids += f"@{os.fstat(combined.fileno()).st_size}\n"
+        manifest.write(ids)
+        manifest.flush()
+        self.written += len(done)
@@ -0,0 +1,257 @@
+from collections import OrderedDict
+
+# row() result for a row whose page is still being fetched
+PENDING = object()
+
+
+class VirtualTreeview:
+    """
+    Virtual list mode for a ttk.Treeview: only the visible window of rows
+    exists as tree items. Rows are addressed by key and fetched a page at a
+    time through fetch_rows(keys) -> list of value tuples (None for missing).
+    With a BackgroundLoader the pages are fetched on its worker thread and
+    rows show as loading until their page arrives.
+    """
+    def __init__(self, tree, scrollbar, fetch_rows, key_index=0,
+                 page_size=100, overscan=20, max_pages=50, row_height=25,
+                 loader=None, on_error=None):
+        """
+        :param tree: Treeview to drive (its own scrolling is taken over)
+        :param scrollbar: Vertical tk.Scrollbar next to the tree
+        :param fetch_rows: Callback loading the rows for a list of keys
+        :param key_index: Position of the key in each row's values
+        :param page_size: Rows fetched per database round-trip
+        :param overscan: Rows prefetched beyond the visible window
+        :param max_pages: Pages kept in memory (least recently used are dropped)
+        :param loader: BackgroundLoader running fetch_rows (None = fetch on the Tk thread)
+        :param on_error: Called with the exception when a background fetch fails
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch_rows = fetch_rows
+        self.key_index = key_index
+        self.page_size = page_size
+        self.overscan = overscan
+        self.max_pages = max_pages
+        self.row_height = row_height
+        self.loader = loader
+        self.on_error = on_error
+
+        self.keys = []
+        self.start = 0
+        self.items = []             # tree items reused for the window rows
+        self.pages = OrderedDict()  # page number -> list of value tuples
+        self.loading = None         # page number the loader is fetching
+        self.selected_key = None
+        self.window_size = int(tree.cget("height"))
+
+        # Take over scrolling from the tree
+        self.tree.configure(yscrollcommand="")
+        self.scrollbar.config(command=self.on_scroll)
+        self._bindings = [
+            ("<MouseWheel>", self.tree.bind("<MouseWheel>", self.on_wheel, add="+")),
+            ("<Button-4>", self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-3), add="+")),
+            ("<Button-5>", self.tree.bind("<Button-5>", lambda e: self.scroll_rows(3), add="+")),
+            ("<Up>", self.tree.bind("<Up>", lambda e: self.on_arrow(-1), add="+")),
+            ("<Down>", self.tree.bind("<Down>", lambda e: self.on_arrow(1), add="+")),
+            ("<Prior>", self.tree.bind("<Prior>", lambda e: self.scroll_rows(-self.window_size), add="+")),
+            ("<Next>", self.tree.bind("<Next>", lambda e: self.scroll_rows(self.window_size), add="+")),
+            ("<Configure>", self.tree.bind("<Configure>", self.on_resize, add="+")),
+            ("<<TreeviewSelect>>", self.tree.bind("<<TreeviewSelect>>", self.on_select, add="+")),
+        ]
+
+    def detach(self):
+        """Give scrolling back to the tree (leaving virtual mode)"""
+        for sequence, funcid in self._bindings:
+            self.tree.unbind(sequence, funcid)
+        self.cancel_fetch()
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.config(command=self.tree.yview)
+        self.pages.clear()
+        self.items = []
+
+    # ---------- data ----------
+
+    def set_keys(self, keys, keep_position=False):
+        """Show a new list of keys; cached pages are dropped"""
+        self.keys = list(keys)
+        self.cancel_fetch()
+        self.pages.clear()
+        if not keep_position:
+            self.start = 0
+        # Items may have been deleted by the owner (e.g. when reloading)
+        self.items = [item for item in self.items if self.tree.exists(item)]
+        self.render()
+
+    def invalidate(self):
+        """Drop cached pages so rows are fetched again"""
+        self.cancel_fetch()
+        self.pages.clear()
+        self.render()
+
+    def row(self, index):
+        """
+        Value tuple of the row at a position in the key list (None when the
+        row was deleted, PENDING while its page is loading in the background)
+        """
+        page_no = index // self.page_size
+        page = self.pages.get(page_no)
+        if page is None:
+            if self.loader is not None:
+                return PENDING
+            page = self.store(page_no, self.fetch_rows(self.page_keys(page_no)))
+        else:
+            self.pages.move_to_end(page_no)
+        return page[index % self.page_size]
+
+    def page_keys(self, page_no):
+        first = page_no * self.page_size
+        return self.keys[first:first + self.page_size]
+
+    def store(self, page_no, page):
+        self.pages[page_no] = page
+        while len(self.pages) > self.max_pages:
+            self.pages.popitem(last=False)
+        return page
+
+    def request(self, page_nos):
+        """Fetch the first missing page of page_nos in the background"""
+        missing = [p for p in page_nos if p not in self.pages]
+        if not missing or self.loading in missing:
+            return  # nothing to do, or the page is already on its way
+        page_no = missing[0]
+        keys = self.page_keys(page_no)
+        self.loading = page_no
+        # Starting a job cancels the loader's previous one (a page scrolled past)
+        self.loader.run(lambda: self.fetch_rows(keys),
+                        lambda page: self.on_page(page_no, page), self.on_fetch_error)
+
+    def cancel_fetch(self):
+        if self.loader is not None:
+            self.loader.cancel()
+        self.loading = None
+
+    def on_page(self, page_no, page):
+        self.loading = None
+        self.store(page_no, page)
+        self.render()  # shows the rows and asks for the next missing page
+
+    def on_fetch_error(self, error):
+        # Not retried until the next scroll, so a broken query cannot spin
+        self.loading = None
+        if self.on_error:
+            self.on_error(error)
+
+    # ---------- drawing ----------
+
+    def render(self):
+        """Materialize the rows of the current window"""
+        total = len(self.keys)
+        self.start = max(0, min(self.start, total - self.window_size))
+        end = min(total, self.start + self.window_size)
+
+        rows = []
+        for index in range(self.start, end):
+            values = self.row(index)
+            if values is PENDING:
+                values = (self.keys[index],) + ("Loading...",)
+            elif values is None:  # deleted since the key list was loaded
+                values = (self.keys[index],) + ("(deleted)",)
+            rows.append(values)
+
+        while len(self.items) < len(rows):
+            self.items.append(self.tree.insert("", "end", values=()))
+        shown = self.items[:len(rows)]
+        for item, values in zip(shown, rows):
+            self.tree.item(item, values=values)
+        self.tree.set_children("", *shown)
+
+        selected = [item for item, values in zip(shown, rows)
+                    if values[self.key_index] == self.selected_key]
+        self.tree.selection_set(selected)
+
+        if total:
+            self.scrollbar.set(self.start / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+        # Overscan: load the neighbouring rows before the user reaches them
+        ahead = [index for index in (end + self.overscan, self.start - self.overscan)
+                 if 0 <= index < total]
+        if self.loader is None:
+            for index in ahead:
+                self.row(index)
+        elif total:
+            # The window's own pages first, then the overscan ones
+            visible = range(self.start // self.page_size, (end - 1) // self.page_size + 1)
+            self.request(list(visible) + [index // self.page_size for index in ahead])
+
+    # ---------- navigation ----------
+
+    def scroll_rows(self, delta):
+        self.start += delta
+        self.render()
+        return "break"
+
+    def scroll_to_index(self, index):
+        """Bring a position into view (centred) and select it"""
+        if not 0 <= index < len(self.keys):
+            return
+        self.selected_key = self.keys[index]
+        self.start = index - self.window_size // 2
+        self.render()
+
+    def scroll_to_key(self, key):
+        """Bring a key into view and select it; False if it is not listed"""
+        try:
+            index = self.keys.index(key)
+        except ValueError:
+            return False
+        self.scroll_to_index(index)
+        return True
+
+    # ---------- events ----------
+
+    def on_scroll(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, what)"""
+        if args[0] == "moveto":
+            self.start = int(float(args[1]) * len(self.keys))
+        elif args[0] == "scroll":
+            step = self.window_size if args[2] == "pages" else 1
+            self.start += int(args[1]) * step
+        self.render()
+
+    def on_wheel(self, event):
+        return self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def on_arrow(self, delta):
+        """Move the selection, scrolling the window at its edges"""
+        if self.selected_key is None:
+            return None
+        try:
+            index = self.keys.index(self.selected_key)
+        except ValueError:
+            return None
+        index += delta
+        if not 0 <= index < len(self.keys):
+            return "break"
+        self.selected_key = self.keys[index]
+        if index < self.start:
+            self.start = index
+        elif index >= self.start + self.window_size:
+            self.start = index - self.window_size + 1
+        self.render()
+        return "break"
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            values = self.tree.item(selection[0])["values"]
+            if values:
+                self.selected_key = values[self.key_index]
+
+    def on_resize(self, event):
+        size = max(1, (event.height - self.row_height) // self.row_height)
+        if size != self.window_size:
+            self.window_size = size
+            self.render()